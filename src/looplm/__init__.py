@@ -1,8 +1,43 @@
 # src/looplm/__init__.py
 """looplm - LLMs on the command line"""
+
 __version__ = "0.3.1"
 
-from .commands import *
-from .config.manager import *
-from .config.providers import *
-from .conversation.handler import *
+import importlib
+
+# Public names and the modules that define them. Submodules are imported on
+# first attribute access so `import looplm` doesn't pull in litellm and co.
+_LAZY_ATTRS = {
+    "CommandProcessor": "looplm.commands",
+    "ProcessingResult": "looplm.commands",
+    "ProcessedText": "looplm.commands",
+    "CommandRegistry": "looplm.commands",
+    "CommandManager": "looplm.commands",
+    "default_manager": "looplm.commands",
+    "FileProcessor": "looplm.commands",
+    "FolderProcessor": "looplm.commands",
+    "GithubProcessor": "looplm.commands",
+    "ShellCommandProcessor": "looplm.commands",
+    "ImageProcessor": "looplm.commands",
+    "PDFProcessor": "looplm.commands",
+    "ConfigManager": "looplm.config.manager",
+    "ProviderType": "looplm.config.providers",
+    "ProviderConfig": "looplm.config.providers",
+    "PROVIDER_CONFIGS": "looplm.config.providers",
+    "ConversationHandler": "looplm.conversation.handler",
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(_LAZY_ATTRS[name])
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -6,18 +6,116 @@ which summarizes conversations to reduce token usage while preserving
 the complete conversation history.
 """
 
+import hashlib
 import logging
-from typing import Dict, List, Tuple
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
 from litellm import completion
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from ..config.providers import ProviderType
 from .prompt_manager import PromptManager
-from .session import ChatSession
+from .session import ChatSession, Message
+
+try:
+    from llmlingua import PromptCompressor
+except ImportError:
+    # Fallback to LLM-based summarization if llmlingua is not available
+    PromptCompressor = None
 
 logger = logging.getLogger(__name__)
 
+# LLMLingua-2 settings for local token-level compression
+LLMLINGUA_MODEL = "microsoft/llmlingua-2-xlm-roberta-large-meetingbank"
+LLMLINGUA_RATE = 0.33
+LLMLINGUA_FORCE_TOKENS = ["\n", "```"]
+
+# Number of compressed messages kept between /compact calls
+COMPRESSED_CACHE_SIZE = 128
+
+# System prompt for the compact call when the session has none
+DEFAULT_SYSTEM_PROMPT = "You are LoopLM, a helpful assistant."
+
+# Earlier segments are sent as labelled context, and the compact prompt is
+# narrowed to the new messages so the model doesn't restate them
+EARLIER_SUMMARY_LABEL = "Summary of the earlier conversation, already compacted:"
+NEW_SEGMENT_INSTRUCTION = (
+    "Summarize only the messages after the earlier summary. Don't repeat "
+    "anything the earlier summary already covers."
+)
+
+# Rough estimation: 4 chars per token
+CHARS_PER_TOKEN = 4
+
+# Structured sections in LLM summary responses
+_SUMMARY_RE = re.compile(r"<summary>\s*(.*?)\s*</summary>", re.DOTALL | re.IGNORECASE)
+_ANALYSIS_RE = re.compile(r"<analysis>.*?</analysis>\s*", re.DOTALL | re.IGNORECASE)
+_HAS_SUMMARY_TAG_RE = re.compile(r"</?summary>", re.IGNORECASE)
+_HAS_ANALYSIS_TAG_RE = re.compile(r"<analysis>", re.IGNORECASE)
+
+
+def _estimate_tokens(content) -> int:
+    """Estimate the token count of message content
+
+    Args:
+        content: String content or structured content (list of parts)
+
+    Returns:
+        Estimated number of tokens
+    """
+    if isinstance(content, str):
+        return len(content) // CHARS_PER_TOKEN
+    if isinstance(content, list):
+        return (
+            sum(
+                len(part.get("text") or "")
+                for part in content
+                if isinstance(part, dict) and part.get("type") == "text"
+            )
+            // CHARS_PER_TOKEN
+        )
+    return 0
+
+
+def _message_tokens(msg: Message) -> int:
+    """Get the token count of a message, estimating it once if unknown
+
+    Args:
+        msg: Message to count
+
+    Returns:
+        Reported token usage, or the cached estimate
+    """
+    if msg.token_usage:
+        return msg.token_usage.total_tokens
+    if msg._token_estimate is None:
+        msg._token_estimate = _estimate_tokens(msg.content)
+    return msg._token_estimate
+
+
+def _segment_messages(messages: List[Message]) -> List[List[Message]]:
+    """Split messages into conversation segments
+
+    A segment starts at each user message and holds the assistant and tool
+    messages that answer it.
+
+    Args:
+        messages: Non-system messages in order
+
+    Returns:
+        List of segments, oldest first
+    """
+    segments: List[List[Message]] = []
+    for msg in messages:
+        if msg.role == "user" or not segments:
+            segments.append([msg])
+        else:
+            segments[-1].append(msg)
+    return segments
+
 
 class CompactError(Exception):
     """Custom exception for compact-related errors"""
@@ -35,12 +133,37 @@ class CompactHandler:
         """
         self.console = console
         self.prompt_manager = prompt_manager
+        # Local compressor is loaded on first use; the model is large
+        self._compressor = None
+        self._compressed_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        # Resolved model names keyed by (provider, custom_provider, model)
+        self._resolved_models: Dict[Tuple, str] = {}
+        # Prompts are loaded once by the prompt manager, so look this up once
+        self._compact_prompt = self._load_compact_prompt()
 
-    def can_compact(self, session: ChatSession) -> Tuple[bool, str]:
+    def _load_compact_prompt(self) -> str:
+        """Get the compact prompt, falling back to a generic one
+
+        Returns:
+            Compact prompt text
+        """
+        try:
+            return self.prompt_manager.get_prompt("compact")
+        except (KeyError, AttributeError):
+            # Fallback if compact prompt is not found
+            logger.warning("Compact prompt not found, using fallback")
+            return "Please provide a comprehensive summary of this conversation."
+
+    def can_compact(
+        self,
+        session: ChatSession,
+        pending_messages: Optional[List[Message]] = None,
+    ) -> Tuple[bool, str]:
         """Check if a session can be compacted
 
         Args:
             session: The chat session to check
+            pending_messages: Precomputed result of _pending_messages, if known
 
         Returns:
             Tuple of (can_compact, reason)
@@ -48,13 +171,14 @@ class CompactHandler:
         if not session:
             return False, "No active session"
 
-        if session.is_compacted:
-            return False, "Session is already compacted"
+        # Only messages added since the last compact are summarized
+        if pending_messages is None:
+            pending_messages = self._pending_messages(session)
 
-        # Exclude system messages for counting
-        non_system_messages = [msg for msg in session.messages if msg.role != "system"]
+        if session.is_compacted and not pending_messages:
+            return False, "Session is already compacted"
 
-        if len(non_system_messages) < 2:
+        if len(pending_messages) < 2:
             return (
                 False,
                 "Not enough messages to compact (need at least 2 non-system messages)",
@@ -62,11 +186,16 @@ class CompactHandler:
 
         return True, "Session can be compacted"
 
-    def get_compact_stats(self, session: ChatSession) -> Dict:
+    def get_compact_stats(
+        self,
+        session: ChatSession,
+        pending_messages: Optional[List[Message]] = None,
+    ) -> Dict:
         """Get statistics about what would be compacted
 
         Args:
             session: The chat session
+            pending_messages: Precomputed result of _pending_messages, if known
 
         Returns:
             Dictionary with compaction statistics
@@ -74,24 +203,34 @@ class CompactHandler:
         if not session:
             return {}
 
-        non_system_messages = [msg for msg in session.messages if msg.role != "system"]
+        if pending_messages is None:
+            pending_messages = self._pending_messages(session)
 
         # Calculate current token usage for messages that would be compacted
-        current_tokens = 0
-        for msg in non_system_messages:
-            if msg.token_usage:
-                current_tokens += msg.token_usage.total_tokens
-            else:
-                # Rough estimation: 4 chars per token
-                current_tokens += len(msg.content) // 4
+        current_tokens = sum(map(_message_tokens, pending_messages))
 
         return {
             "total_messages": len(session.messages),
-            "non_system_messages": len(non_system_messages),
+            "non_system_messages": len(pending_messages),
+            "segments": len(_segment_messages(pending_messages)),
             "estimated_current_tokens": current_tokens,
             "system_prompt": session.get_system_prompt() is not None,
         }
 
+    def _pending_messages(self, session: ChatSession) -> List[Message]:
+        """Get the non-system messages that haven't been compacted yet
+
+        Args:
+            session: The chat session
+
+        Returns:
+            Messages after the last compact point, excluding system messages
+        """
+        messages = session.messages
+        if session.is_compacted:
+            messages = messages[session.compact_index :]
+        return [msg for msg in messages if msg.role != "system"]
+
     def _resolve_model_name(self, session: ChatSession) -> str:
         """Resolve the correct model name for the session
 
@@ -104,69 +243,88 @@ class CompactHandler:
         Raises:
             CompactError: If model resolution fails
         """
-        try:
-            if session.provider == ProviderType.OTHER and session.custom_provider:
-                if not session.model.startswith(f"{session.custom_provider}/"):
-                    return f"{session.custom_provider}/{session.model}"
-                else:
-                    return session.model
+        key = (session.provider, session.custom_provider, session.model)
+        resolved = self._resolved_models.get(key)
+        if resolved is None:
+            try:
+                resolved = self._build_model_name(session)
+            except Exception as e:
+                raise CompactError(f"Failed to resolve model name: {str(e)}")
+            self._resolved_models[key] = resolved
+        return resolved
+
+    @staticmethod
+    def _build_model_name(session: ChatSession) -> str:
+        """Build the provider-qualified model name for the session
+
+        Args:
+            session: The chat session
+
+        Returns:
+            Resolved model name
+        """
+        if session.provider == ProviderType.OTHER and session.custom_provider:
+            if not session.model.startswith(f"{session.custom_provider}/"):
+                return f"{session.custom_provider}/{session.model}"
             else:
-                provider_prefix = (
-                    f"{session.provider.value}/" if session.provider else ""
-                )
-                if (
-                    session.model
-                    and provider_prefix
-                    and session.model.startswith(provider_prefix)
-                ):
-                    return session.model
-                elif session.provider and session.provider in [
-                    ProviderType.GEMINI,
-                    ProviderType.BEDROCK,
-                    ProviderType.AZURE,
-                ]:
-                    return f"{session.provider.value}/{session.model}"
-                else:
-                    return session.model
-        except Exception as e:
-            raise CompactError(f"Failed to resolve model name: {str(e)}")
+                return session.model
+        else:
+            provider_prefix = f"{session.provider.value}/" if session.provider else ""
+            if (
+                session.model
+                and provider_prefix
+                and session.model.startswith(provider_prefix)
+            ):
+                return session.model
+            elif session.provider and session.provider in [
+                ProviderType.GEMINI,
+                ProviderType.BEDROCK,
+                ProviderType.AZURE,
+            ]:
+                return f"{session.provider.value}/{session.model}"
+            else:
+                return session.model
 
-    def _prepare_compact_messages(self, session: ChatSession) -> List[Dict[str, str]]:
+    def _prepare_compact_messages(
+        self,
+        session: ChatSession,
+        pending_messages: Optional[List[Message]] = None,
+    ) -> List[Dict[str, str]]:
         """Prepare messages for the compact LLM call
 
         Args:
             session: The chat session
+            pending_messages: Precomputed result of _pending_messages, if known
 
         Returns:
             List of messages for the LLM
         """
-        # Get all non-system messages
-        prev_msgs = [msg for msg in session.messages if msg.role != "system"]
+        # Get the messages not yet covered by a summary
+        prev_msgs = pending_messages
+        if prev_msgs is None:
+            prev_msgs = self._pending_messages(session)
 
         # Use the current system prompt or default
-        system_prompt = (
-            session.get_system_prompt() or "You are LoopLM, a helpful assistant."
-        )
+        system_prompt = session.get_system_prompt() or DEFAULT_SYSTEM_PROMPT
 
-        # Get the compact prompt
-        try:
-            compact_prompt = self.prompt_manager.get_prompt("compact")
-        except (KeyError, AttributeError):
-            # Fallback if compact prompt is not found
-            compact_prompt = (
-                "Please provide a comprehensive summary of this conversation."
-            )
-            logger.warning("Compact prompt not found, using fallback")
-
-        # Prepare messages for LLM
-        llm_messages = [{"role": "system", "content": system_prompt}]
-
-        for msg in prev_msgs:
-            llm_messages.append({"role": msg.role, "content": msg.content})
-
-        llm_messages.append({"role": "user", "content": compact_prompt})
-
-        return llm_messages
+        # Earlier segments are passed as context, not re-summarized
+        earlier = []
+        compact_prompt = self._compact_prompt
+        if session.is_compacted:
+            earlier = [
+                {
+                    "role": "user",
+                    "content": f"{EARLIER_SUMMARY_LABEL}\n\n{session.compact_summary}",
+                }
+            ]
+            compact_prompt = f"{compact_prompt}\n\n{NEW_SEGMENT_INSTRUCTION}"
+
+        return [
+            {"role": "system", "content": system_prompt},
+            *earlier,
+            *[{"role": msg.role, "content": msg.content} for msg in prev_msgs],
+            {"role": "user", "content": compact_prompt},
+        ]
 
     def compact_session(self, session: ChatSession, show_progress: bool = True) -> bool:
         """Compact a chat session by generating a summary
@@ -178,14 +336,17 @@ class CompactHandler:
         Returns:
             True if successful, False otherwise
         """
+        # Collect the messages to compact once and share them below
+        pending_messages = self._pending_messages(session) if session else None
+
         # Validate session can be compacted
-        can_compact, reason = self.can_compact(session)
+        can_compact, reason = self.can_compact(session, pending_messages)
         if not can_compact:
             self.console.display_error(f"Cannot compact session: {reason}")
             return False
 
         # Show statistics before compacting
-        stats = self.get_compact_stats(session)
+        stats = self.get_compact_stats(session, pending_messages)
         self.console.display_info(
             f"Compacting {stats['non_system_messages']} messages "
             f"(~{stats['estimated_current_tokens']:,} tokens)",
@@ -193,13 +354,7 @@ class CompactHandler:
         )
 
         try:
-            # Resolve model name
-            actual_model = self._resolve_model_name(session)
-
-            # Prepare messages
-            llm_messages = self._prepare_compact_messages(session)
-
-            # Make LLM call with progress indication
+            # Make the summary call with progress indication
             if show_progress:
                 with Progress(
                     SpinnerColumn(),
@@ -208,15 +363,17 @@ class CompactHandler:
                     transient=True,
                 ) as progress:
                     task = progress.add_task("Generating summary...", total=None)
-                    summary = self._call_llm_for_summary(actual_model, llm_messages)
+                    summary = self._generate_summary(session, pending_messages)
             else:
-                summary = self._call_llm_for_summary(actual_model, llm_messages)
+                summary = self._generate_summary(session, pending_messages)
 
-            # Set the compact summary
-            session.set_compact_summary(summary)
+            # Store the summary as a new segment
+            session.add_compact_segment(summary)
 
             # Calculate estimated token savings
-            estimated_savings = stats["estimated_current_tokens"] - (len(summary) // 4)
+            estimated_savings = stats["estimated_current_tokens"] - _estimate_tokens(
+                summary
+            )
 
             # Success message
             self.console.display_success("✓ Conversation compacted successfully!")
@@ -240,6 +397,102 @@ class CompactHandler:
             self.console.display_error(f"Unexpected error during compact: {str(e)}")
             return False
 
+    def _generate_summary(
+        self,
+        session: ChatSession,
+        pending_messages: Optional[List[Message]] = None,
+    ) -> str:
+        """Generate a summary, preferring local compression over an LLM call
+
+        Args:
+            session: The chat session
+            pending_messages: Precomputed result of _pending_messages, if known
+
+        Returns:
+            Generated summary
+
+        Raises:
+            CompactError: If summary generation fails
+        """
+        # LOOPLM_COMPACT_LOCAL=0 asks the model for a summary even when
+        # llmlingua is installed
+        use_local = os.environ.get("LOOPLM_COMPACT_LOCAL") != "0"
+        if PromptCompressor is not None and use_local:
+            return self._compress_messages(session, pending_messages)
+
+        # Resolve model name
+        actual_model = self._resolve_model_name(session)
+
+        # Prepare messages
+        llm_messages = self._prepare_compact_messages(session, pending_messages)
+
+        return self._call_llm_for_summary(actual_model, llm_messages)
+
+    def _get_compressor(self):
+        """Get the LLMLingua-2 compressor, loading it on first use
+
+        Returns:
+            PromptCompressor instance
+        """
+        if self._compressor is None:
+            self._compressor = PromptCompressor(
+                model_name=LLMLINGUA_MODEL, use_llmlingua2=True
+            )
+        return self._compressor
+
+    def _compress_messages(
+        self,
+        session: ChatSession,
+        pending_messages: Optional[List[Message]] = None,
+    ) -> str:
+        """Compress conversation messages locally with LLMLingua-2
+
+        Args:
+            session: The chat session
+            pending_messages: Precomputed result of _pending_messages, if known
+
+        Returns:
+            Compressed conversation text
+
+        Raises:
+            CompactError: If compression fails
+        """
+        if pending_messages is None:
+            pending_messages = self._pending_messages(session)
+
+        try:
+            compressed_parts = []
+            for msg in pending_messages:
+                if not isinstance(msg.content, str):
+                    continue
+                if not msg.content.strip():
+                    continue
+
+                key = hashlib.blake2b(msg.content.encode(), digest_size=16).digest()
+                compressed = self._compressed_cache.get(key)
+                if compressed is None:
+                    result = self._get_compressor().compress_prompt(
+                        [msg.content],
+                        rate=LLMLINGUA_RATE,
+                        force_tokens=LLMLINGUA_FORCE_TOKENS,
+                    )
+                    compressed = result["compressed_prompt"]
+                    self._compressed_cache[key] = compressed
+                    if len(self._compressed_cache) > COMPRESSED_CACHE_SIZE:
+                        self._compressed_cache.popitem(last=False)
+                else:
+                    self._compressed_cache.move_to_end(key)
+
+                compressed_parts.append(f"{msg.role}: {compressed}")
+
+        except Exception as e:
+            raise CompactError(f"Compression failed: {str(e)}")
+
+        if not compressed_parts:
+            raise CompactError("Nothing to compress")
+
+        return "\n\n".join(compressed_parts)
+
     def _call_llm_for_summary(self, model: str, messages: List[Dict[str, str]]) -> str:
         """Make the actual LLM call to generate summary
 
@@ -269,10 +522,10 @@ class CompactHandler:
 
             return parsed_summary
 
+        except CompactError:
+            raise
         except Exception as e:
-            if "CompactError" in str(type(e)):
-                raise
-            raise CompactError(f"LLM call failed: {str(e)}")
+            raise CompactError(f"LLM call failed: {str(e)}") from e
 
     def _extract_summary_content(self, raw_response: str) -> str:
         """Extract summary content from LLM response
@@ -283,12 +536,8 @@ class CompactHandler:
         Returns:
             Extracted summary content
         """
-        import re
-
         # Try to find content between <summary> tags (case insensitive)
-        summary_match = re.search(
-            r"<summary>\s*(.*?)\s*</summary>", raw_response, re.DOTALL | re.IGNORECASE
-        )
+        summary_match = _SUMMARY_RE.search(raw_response)
 
         if summary_match:
             extracted_content = summary_match.group(1).strip()
@@ -304,16 +553,14 @@ class CompactHandler:
         cleaned_response = raw_response.strip()
 
         # Remove any analysis sections that might be at the beginning
-        analysis_pattern = r"<analysis>.*?</analysis>\s*"
-        cleaned_response = re.sub(
-            analysis_pattern, "", cleaned_response, flags=re.DOTALL | re.IGNORECASE
-        )
+        # Most responses have no analysis section; check before the DOTALL sub
+        if "<" in cleaned_response and _HAS_ANALYSIS_TAG_RE.search(cleaned_response):
+            cleaned_response = _ANALYSIS_RE.sub("", cleaned_response)
 
         # If we still have summary tags visible in the output, warn about it
-        if (
-            "<summary>" in cleaned_response.lower()
-            or "</summary>" in cleaned_response.lower()
-        ):
+        # A plain ">" scan (memchr-fast) rules out most responses before the
+        # case-insensitive regex has to run
+        if ">" in cleaned_response and _HAS_SUMMARY_TAG_RE.search(cleaned_response):
             logger.warning(
                 "Summary tags are visible in output - LLM may not have followed instructions properly"
             )
@@ -353,12 +600,14 @@ class CompactHandler:
             self.console.display_error("No active session")
             return
 
-        stats = self.get_compact_stats(session)
+        pending_messages = self._pending_messages(session)
+        stats = self.get_compact_stats(session, pending_messages)
 
         self.console.console.print("\n[bold blue]Compact Information:[/bold blue]")
         self.console.console.print(f"Total messages: {stats['total_messages']}")
         self.console.console.print(
-            f"Non-system messages: {stats['non_system_messages']}"
+            f"Messages to compact: {stats['non_system_messages']} "
+            f"in {stats['segments']} conversation turns"
         )
         self.console.console.print(
             f"Estimated tokens: ~{stats['estimated_current_tokens']:,}"
@@ -372,9 +621,17 @@ class CompactHandler:
             self.console.console.print(
                 f"Summary length: {len(session.compact_summary) if session.compact_summary else 0} chars"
             )
+            self.console.console.print(
+                f"Compacted segments: {len(session.compact_segments)}"
+            )
+            can_compact, _ = self.can_compact(session, pending_messages)
+            if can_compact:
+                self.console.console.print(
+                    "[green]New messages can be compacted as a new segment[/green]"
+                )
         else:
             self.console.console.print("[yellow]Status: Not compacted[/yellow]")
-            can_compact, reason = self.can_compact(session)
+            can_compact, reason = self.can_compact(session, pending_messages)
             if can_compact:
                 self.console.console.print("[green]Can compact: Yes[/green]")
             else:
@@ -1,192 +1,624 @@
 # src/looplm/chat/console.py
 
+import hashlib
+import os
+import shutil
+import signal
+import time
+import weakref
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
-import pyperclip
 from prompt_toolkit.key_binding import KeyBindings
-from rich.console import Console
+from rich.console import Console, Group
+from rich.live import Live
 from rich.markdown import Markdown
+from rich.markup import escape
 from rich.prompt import Confirm, Prompt
+from rich.segment import Segment, Segments
+from rich.style import Style
 from rich.table import Table
+from rich.text import Text
 
+from ..commands import CommandManager
 from ..config.manager import ConfigManager
 from .prompt_manager import PromptManager
 from .session import ChatSession, TokenUsage
 
+# Sessions shown per page by display_sessions and select_session
+SESSIONS_PAGE_SIZE = 50
+
+# Rendered assistant messages kept for redisplay
+MARKDOWN_CACHE_SIZE = 64
+
+# Minimum seconds between redraws of a streaming message
+STREAM_REFRESH_SECONDS = 0.05
+
+# Render options that print(..., soft_wrap=True) uses, for pre-rendering
+# messages that are later printed with soft wrapping
+_SOFT_WRAP = {"no_wrap": True, "overflow": "ignore"}
+
+# Message prefixes by role; other roles are shown like assistant messages
+_ASSISTANT_PREFIX = "[bright_green]Assistant ▣[/bright_green]"
+_ROLE_PREFIXES = {
+    "user": "[bright_blue]User ►[/bright_blue]",
+    "assistant": _ASSISTANT_PREFIX,
+}
+_MESSAGE_STYLE = "bright_white"
+
+# Assistant messages shorter than this with no markdown syntax skip the parser
+PLAIN_TEXT_MAX_CHARS = 2000
+
+# Characters that can start markdown syntax anywhere in a line. Newlines are
+# included because markdown joins and reflows multi-line paragraphs
+_MD_TRIGGERS = frozenset("`*_#[]>|~<&\\\n")
+
+# Characters that start a list or code block at the beginning of a line
+_MD_LINE_STARTS = frozenset("-+0123456789 \t")
+
+# Static parts of the welcome screen; rendering doesn't modify them
+_WELCOME_TITLE = Text("\n💬 LoopLM Chat", style="bold blue")
+_WELCOME_GAP = Text("\n")
+
+# Repeated copy requests for the same text within this window are ignored
+COPY_DEBOUNCE_SECONDS = 0.25
+
+# Clipboard copies run here, one at a time, so a slow clipboard tool never
+# blocks key handling
+_CLIPBOARD_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clipboard")
+
+# Column styles of the sessions table, which is rebuilt for every page;
+# Style objects skip the theme lookup and parse that style names go through
+_STYLE_CYAN = Style.parse("cyan")
+_STYLE_GREEN = Style.parse("green")
+_STYLE_BLUE = Style.parse("blue")
+
+# Cost cell for sessions that haven't incurred any cost
+_ZERO_COST = "$0.000000"
+
+
+def _last_block_end(text: str, start: int) -> int:
+    """Find the end of the last complete markdown block in text
+
+    A block ends at a blank line outside a fenced code block.
+
+    Args:
+        text: Markdown text received so far
+        start: Offset where the current incomplete block begins
+
+    Returns:
+        Offset just after the last complete block, or start if none finished
+    """
+    end = text.rfind("\n\n", start)
+    while end != -1:
+        # An odd number of fences before the blank line means it is inside code
+        if text.count("```", 0, end) % 2 == 0:
+            return end + 2
+        end = text.rfind("\n\n", start, end)
+    return start
+
+
+def stream_assistant_message(
+    console: Console, chunks: Iterable[str], timestamp: Optional[datetime] = None
+) -> str:
+    """Print an assistant message as markdown while its text is still arriving
+
+    The display is redrawn at most every STREAM_REFRESH_SECONDS. Finished
+    markdown blocks are printed once above the live area and never redrawn,
+    so each redraw only renders the trailing block that is still growing,
+    and long replies aren't cropped to the terminal height. Printed blocks
+    are soft wrapped like display_message; the growing block is wrapped to
+    the terminal while it is shown, and printed once the reply is complete.
+
+    Args:
+        console: Console to print to
+        chunks: Iterable of text chunks, e.g. from a streaming response
+        timestamp: Optional message timestamp
+
+    Returns:
+        The complete message text
+    """
+    time_str = f"[dim]{timestamp:%H:%M}[/dim] " if timestamp else ""
+    console.print(f"\n{time_str}{_ASSISTANT_PREFIX}")
+
+    parts: List[str] = []
+    text = ""
+    done_end = 0  # Offset in text where the unfinished tail begins
+    last_refresh = 0.0
+
+    def markdown(start: int, end: int, soft_wrap: bool) -> Segments:
+        md = Markdown(text[start:end], code_theme="monokai")
+        options = console.options
+        if soft_wrap:
+            options = options.update(**_SOFT_WRAP)
+        segments = list(console.render(md, options))
+        # Blocks rendered on their own lose the blank line markdown puts
+        # between them, except lists, which already start with one
+        if start and segments and segments[0].text != "\n":
+            segments.insert(0, Segment.line())
+        return Segments(segments)
+
+    def refresh(live: Live, block_end: int):
+        nonlocal done_end
+        if block_end > done_end:
+            live.console.print(markdown(done_end, block_end, True), soft_wrap=True)
+            done_end = block_end
+        if done_end < len(text):
+            live.update(markdown(done_end, len(text), False), refresh=True)
+        else:
+            # Nothing to preview when the text ends on a block boundary
+            live.update(Segments(()), refresh=True)
+
+    # Transient, so the wrapped preview of the growing block is cleared once
+    # the complete reply has been printed above it
+    with Live(console=console, auto_refresh=False, transient=True) as live:
+        for chunk in chunks:
+            parts.append(chunk)
+            now = time.monotonic()
+            if now - last_refresh >= STREAM_REFRESH_SECONDS:
+                text += "".join(parts)
+                parts.clear()
+                refresh(live, _last_block_end(text, done_end))
+                last_refresh = now
+        text += "".join(parts)
+        refresh(live, len(text))
+
+    return text
+
+
+def _is_plain_text(content: str) -> bool:
+    """Check whether text renders the same with or without markdown
+
+    Args:
+        content: Message text
+
+    Returns:
+        True if the text is short and contains no markdown syntax
+    """
+    return (
+        0 < len(content) < PLAIN_TEXT_MAX_CHARS
+        and content[0] not in _MD_LINE_STARTS
+        and _MD_TRIGGERS.isdisjoint(content)
+    )
+
+
+def _format_updated_at(value: str) -> str:
+    """Format an ISO timestamp as 'YYYY-MM-DD HH:MM'
+
+    Timestamps written by datetime.isoformat() are sliced directly; anything
+    else is parsed.
+
+    Args:
+        value: ISO 8601 timestamp
+
+    Returns:
+        Timestamp formatted to the minute
+    """
+    if len(value) >= 16 and value[10] in "T " and value[13] == ":":
+        return f"{value[:10]} {value[11:16]}"
+    return datetime.fromisoformat(value).strftime("%Y-%m-%d %H:%M")
+
+
+def _match_session_ids(session_ids: List[str], prefix: str) -> List[str]:
+    """Find session IDs starting with prefix
+
+    Args:
+        session_ids: Sorted session IDs
+        prefix: Full or partial session ID
+
+    Returns:
+        Up to two matching IDs, enough to tell unique from ambiguous. An exact
+        match is returned on its own.
+    """
+    i = bisect_left(session_ids, prefix)
+    matches = []
+    for session_id in session_ids[i : i + 2]:
+        if session_id == prefix:
+            return [session_id]
+        if session_id.startswith(prefix):
+            matches.append(session_id)
+    return matches
+
+
+def _copy_quietly(text: str) -> None:
+    """Copy text to the system clipboard, ignoring clipboard errors"""
+    try:
+        # Imported on first use; it probes for clipboard tools
+        import pyperclip
+
+        pyperclip.copy(text)
+    except Exception:
+        pass
+
+
+@lru_cache(maxsize=1)
+def _provider_rows(
+    config_manager: ConfigManager, config_mtime_ns: int
+) -> Tuple[Tuple[str, str, str, str], ...]:
+    """Build the configured-providers table rows
+
+    Cached until the config file changes; its mtime is part of the key.
+
+    Args:
+        config_manager: Config manager to read providers from
+        config_mtime_ns: Modification time of the config file
+
+    Returns:
+        Tuple of (display_name, models, default_model, status) rows
+    """
+    default_provider, _ = config_manager.get_default_provider()
+    providers = config_manager.get_configured_providers()
+
+    rows = []
+    for provider, config in providers.items():
+        display_name = config_manager.get_provider_display_name(provider, config)
+
+        # Get all models for this provider
+        models = config_manager.get_provider_models(provider)
+        models_str = ", ".join(models)
+
+        default_model = config.get("default_model", "")
+        status = "DEFAULT" if provider == default_provider else "Configured"
+
+        rows.append((display_name, models_str, default_model, status))
+    return tuple(rows)
+
+
+@lru_cache(maxsize=1)
+def _provider_table(rows: Tuple[Tuple[str, str, str, str], ...]) -> Table:
+    """Build the configured providers table
+
+    Args:
+        rows: Provider rows from _provider_rows
+
+    Returns:
+        Providers table, reused while the rows are unchanged
+    """
+    provider_table = Table(title="Configured Providers")
+    provider_table.add_column("Provider", style="cyan")
+    provider_table.add_column("Models", style="green")
+    provider_table.add_column("Default Model", style="yellow")
+    provider_table.add_column("Status", style="yellow")
+
+    for row in rows:
+        provider_table.add_row(*row)
+    return provider_table
+
+
+@lru_cache(maxsize=8)
+def _usage_table(
+    title: str, input_tokens: int, output_tokens: int, total_tokens: int, cost: float
+) -> Table:
+    """Build a token usage table
+
+    Rendering doesn't modify a table, so repeated /usage calls with the same
+    numbers print the same table.
+
+    Args:
+        title: Table title
+        input_tokens: Input token count
+        output_tokens: Output token count
+        total_tokens: Total token count
+        cost: Cost in dollars
+
+    Returns:
+        Token usage table
+    """
+    table = Table(title=title)
+    table.add_column("Type", style="cyan")
+    table.add_column("Count", justify="right")
+
+    table.add_row("Input Tokens", f"{input_tokens:,}")
+    table.add_row("Output Tokens", f"{output_tokens:,}")
+    table.add_row("Total Tokens", f"{total_tokens:,}")
+    table.add_row("Cost", f"${cost:.6f}")
+    return table
+
+
+# Static (command, description) rows of the commands table
+_SESSION_COMMAND_ROWS = (
+    ("/new", "Start a new session"),
+    ("/save", "Save current session"),
+    ("/load", "Load a saved session"),
+    ("/list", "List saved sessions"),
+    ("/delete", "Delete a session"),
+    ("/rename", "Rename current session"),
+    ("/clear, /c", "Clear chat history"),
+    ("/clear-last [N]", "Clear last N messages (default: 1)"),
+    (
+        "/compact",
+        "Summarize and compact conversation so far (reduces context/cost)",
+    ),
+    ("/compact-info", "Show compact status and statistics"),
+    ("/compact-reset", "Reset compact state and use full history"),
+    ("/quit, /q", "Exit chat session"),
+    ("/help, /h", "Show this help message"),
+)
+_SYSTEM_COMMAND_ROWS = (
+    ("/model", "Change model"),
+    ("/system", "View/update system prompt"),
+    ("/usage", "View token usage"),
+)
+_SHORTCUT_ROWS = (("Ctrl+B", "Copy last assistant response"),)
+
+
+@lru_cache(maxsize=1)
+def _commands_table(content_rows: Tuple[Tuple[str, str], ...]) -> Table:
+    """Build the commands & shortcuts table
+
+    Only the content command rows vary (with the registered processors), so
+    the table is cached on them and reused across /help calls.
+
+    Args:
+        content_rows: (command, description) rows for @ and $() commands
+
+    Returns:
+        Commands table
+    """
+    # Combined commands table
+    commands_table = Table(
+        title="LoopLM Commands & Shortcuts",
+        title_style="bold blue",
+        border_style="blue",
+        show_header=True,
+        header_style="bold cyan",
+    )
+
+    commands_table.add_column("Command", style="cyan", width=30)
+    commands_table.add_column("Description", style="white")
+    sections = (
+        ("Session Management", "bold cyan", _SESSION_COMMAND_ROWS),
+        ("System Controls", "bold yellow", _SYSTEM_COMMAND_ROWS),
+        ("Content & Code", "bold green", content_rows),
+        ("Keyboard Shortcuts", "bold magenta", _SHORTCUT_ROWS),
+    )
+    for heading, style, rows in sections:
+        commands_table.add_row(heading, "", style=style)
+        for row in rows:
+            commands_table.add_row(*row)
+
+    return commands_table
+
 
 class ChatConsole:
     """Handles chat UI rendering and interaction"""
 
+    # Shared config manager; creating one derives the encryption key
+    _config_manager: Optional[ConfigManager] = None
+
+    # Console the shared key bindings act on
+    _active: Optional["weakref.ReferenceType[ChatConsole]"] = None
+
     def __init__(self, console: Optional[Console] = None):
         """Initialize chat console"""
+        # Our own console gets a fixed width, updated on resize, so Rich
+        # doesn't query the terminal size on every print
+        self._track_width = console is None and hasattr(signal, "SIGWINCH")
         self.console = console or Console(
             force_terminal=True,
             force_interactive=True,
-            width=None,
+            highlight=False,
+            width=shutil.get_terminal_size().columns if self._track_width else None,
         )
+        if self._track_width and not _watch_terminal_size():
+            self._track_width = False
+            self.console.width = None
         self.prompt_manager = PromptManager(console=self.console, base_path=Path.cwd())
         self.current_session = None
-        # Add key bindings for copying
-        kb = KeyBindings()
-
-        @kb.add("c-b")  # Ctrl+B
-        @kb.add("escape", "b")
-        def copy_to_clipboard(event):
-            """Copy latest response to clipboard"""
-            if self.current_session and self.current_session.latest_response:
-                try:
-                    pyperclip.copy(self.current_session.latest_response)
-                except Exception as e:
-                    pass
-
-        self.key_bindings = kb
+        # Formatted display_sessions rows keyed by the session fields they show
+        self._session_row_cache: Dict[Tuple, Tuple[str, ...]] = {}
+        # Rendered markdown segments keyed by (content digest, console width)
+        self._md_cache: "OrderedDict[Tuple[bytes, int], List[Segment]]" = OrderedDict()
+        # Input prompt and the minute it was formatted for
+        self._prompt_minute = ""
+        self._prompt_text = ""
+        # Welcome screen command rows and the commands they were built for
+        self._content_rows_key: Optional[Tuple] = None
+        self._content_rows: Tuple[Tuple[str, str], ...] = ()
+        # Last text sent to the clipboard and when, for debouncing Ctrl+B
+        self._last_copied: Optional[str] = None
+        self._last_copy_time = 0.0
+        self._copy_future: Optional[Future] = None
+        # Key bindings are shared by all consoles; Ctrl+B copies from the
+        # console that is prompting
+        self.key_bindings = _KEY_BINDINGS
+        self._make_active()
+
+    def _sync_width(self) -> None:
+        """Read the terminal width into a fixed-width console"""
+        if self._track_width:
+            self.console.width = shutil.get_terminal_size().columns
+
+    def _make_active(self) -> None:
+        """Make this console the target of the shared key bindings"""
+        # A weak reference, so the module-level bindings and resize handler
+        # don't keep it alive
+        ChatConsole._active = weakref.ref(self)
+
+    def copy_latest_response(self) -> bool:
+        """Copy the latest assistant response to the clipboard
+
+        The copy runs on a background worker so the key binding returns
+        immediately. Repeats of the same copy from key autorepeat, or while
+        that copy is still running, are dropped.
+
+        Returns:
+            True if a copy was started
+        """
+        if not (self.current_session and self.current_session.latest_response):
+            return False
+
+        text = self.current_session.latest_response
+        now = time.monotonic()
+        if text == self._last_copied and (
+            now - self._last_copy_time < COPY_DEBOUNCE_SECONDS
+            or not self._copy_future.done()
+        ):
+            return False
+        self._last_copied = text
+        self._last_copy_time = now
+
+        self._copy_future = _CLIPBOARD_POOL.submit(_copy_quietly, text)
+        return True
 
     def display_welcome(self):
         """Display welcome message and instructions"""
-        config_manager = ConfigManager()
-        default_provider, _ = config_manager.get_default_provider()
-        providers = config_manager.get_configured_providers()
-
         # Provider info table
-        provider_table = Table(title="Configured Providers")
-        provider_table.add_column("Provider", style="cyan")
-        provider_table.add_column("Models", style="green")
-        provider_table.add_column("Default Model", style="yellow")
-        provider_table.add_column("Status", style="yellow")
-
-        for provider, config in providers.items():
-            display_name = config_manager.get_provider_display_name(provider, config)
+        provider_table = _provider_table(self._get_provider_rows())
 
-            # Get all models for this provider
-            models = config_manager.get_provider_models(provider)
-            models_str = ", ".join(models)
-
-            default_model = config.get("default_model", "")
-            status = "DEFAULT" if provider == default_provider else "Configured"
-
-            provider_table.add_row(display_name, models_str, default_model, status)
-
-        # Get available commands from the CommandManager
-        from looplm.commands import CommandManager
-
-        command_manager = CommandManager()
-        available_commands = command_manager.get_available_commands()
+        content_rows = self._get_content_rows(CommandManager())
 
         # Combined commands table
-        commands_table = Table(
-            title="LoopLM Commands & Shortcuts",
-            title_style="bold blue",
-            border_style="blue",
-            show_header=True,
-            header_style="bold cyan",
+        commands_table = _commands_table(content_rows)
+
+        # Display tables in a single render
+        self.console.print(
+            Group(
+                _WELCOME_TITLE,
+                provider_table,
+                _WELCOME_GAP,
+                commands_table,
+                _WELCOME_GAP,
+            )
         )
 
-        commands_table.add_column("Command", style="cyan", width=30)
-        commands_table.add_column("Description", style="white")
-        # Session commands
-        commands_table.add_row("Session Management", "", style="bold cyan")
-        commands_table.add_row("/new", "Start a new session")
-        commands_table.add_row("/save", "Save current session")
-        commands_table.add_row("/load", "Load a saved session")
-        commands_table.add_row("/list", "List saved sessions")
-        commands_table.add_row("/delete", "Delete a session")
-        commands_table.add_row("/rename", "Rename current session")
-        commands_table.add_row("/clear, /c", "Clear chat history")
-        commands_table.add_row("/clear-last [N]", "Clear last N messages (default: 1)")
-        commands_table.add_row(
-            "/compact",
-            "Summarize and compact conversation so far (reduces context/cost)",
-        )
-        commands_table.add_row("/compact-info", "Show compact status and statistics")
-        commands_table.add_row(
-            "/compact-reset", "Reset compact state and use full history"
-        )
-        commands_table.add_row("/quit, /q", "Exit chat session")
-        commands_table.add_row("/help, /h", "Show this help message")
+    def _get_content_rows(
+        self, command_manager: CommandManager
+    ) -> Tuple[Tuple[str, str], ...]:
+        """Get the (command, description) rows for the content commands
 
-        # System commands
-        commands_table.add_row("System Controls", "", style="bold yellow")
-        commands_table.add_row("/model", "Change model")
-        commands_table.add_row("/system", "View/update system prompt")
-        commands_table.add_row("/usage", "View token usage")
+        Rows are rebuilt only when the registry or its commands change.
 
-        # Content commands
-        commands_table.add_row("Content & Code", "", style="bold green")
+        Args:
+            command_manager: Manager holding the command registry
 
-        # Add command processors
+        Returns:
+            Rows for @ commands followed by the $() shell command
+        """
+        # Get available commands from the CommandManager
+        available_commands = command_manager.get_available_commands()
+        key = (command_manager.registry, tuple(available_commands))
+        if key == self._content_rows_key:
+            return self._content_rows
+
+        content_rows = []
         for cmd_name in available_commands:
             processor = command_manager.get_processor(cmd_name)
             if processor:
                 if cmd_name != "shell":
                     # Standard @ commands
-                    commands_table.add_row(f"@{cmd_name}(path)", processor.description)
+                    content_rows.append((f"@{cmd_name}(path)", processor.description))
 
         # Add shell command with $() syntax
         shell_processor = command_manager.get_processor("shell")
         if shell_processor:
-            commands_table.add_row("$(command)", shell_processor.description)
+            content_rows.append(("$(command)", shell_processor.description))
 
-        # Keyboard shortcuts
-        commands_table.add_row("Keyboard Shortcuts", "", style="bold magenta")
-        commands_table.add_row("Ctrl+B", "Copy last assistant response")
+        self._content_rows_key = key
+        self._content_rows = tuple(content_rows)
+        return self._content_rows
 
-        # Display tables
-        self.console.print("\n💬 LoopLM Chat", style="bold blue")
-        self.console.print(provider_table)
-        self.console.print("\n")
-        self.console.print(commands_table)
-        self.console.print("\n")
+    @classmethod
+    def _get_provider_rows(cls) -> Tuple[Tuple[str, str, str, str], ...]:
+        """Get the configured-providers rows, reusing them while config is unchanged"""
+        if cls._config_manager is None:
+            cls._config_manager = ConfigManager()
+        try:
+            mtime_ns = cls._config_manager.config_file.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = 0
+        return _provider_rows(cls._config_manager, mtime_ns)
 
-    def display_sessions(self, sessions: List[Dict]):
-        """Display list of available chat sessions"""
+    def display_sessions(
+        self, sessions: List[Dict], page_size: int = SESSIONS_PAGE_SIZE
+    ):
+        """Display list of available chat sessions, one page at a time"""
         if not sessions:
             self.console.print("\nNo saved sessions found.", style="yellow")
             return
 
+        offset = 0
+        while True:
+            offset = self._display_sessions_page(sessions, offset, page_size)
+            if offset >= len(sessions):
+                return
+            answer = Prompt.ask(
+                "\nPress Enter for more sessions (or 'q' to stop)",
+                default="",
+                console=self.console,
+            )
+            if answer.lower() in ("q", "quit", "cancel"):
+                return
+
+    def _display_sessions_page(
+        self, sessions: List[Dict], offset: int, page_size: int
+    ) -> int:
+        """Display one page of chat sessions
+
+        Only the page is rendered, so Rich never measures the full list.
+
+        Args:
+            sessions: All sessions
+            offset: Index of the first session on the page
+            page_size: Maximum number of sessions per page
+
+        Returns:
+            int: Offset of the next page
+        """
+        end = min(offset + page_size, len(sessions))
         table = Table(title="Saved Chat Sessions")
-        table.add_column("ID", style="cyan")
-        table.add_column("Name", style="green")
+        if offset > 0 or end < len(sessions):
+            table.caption = f"Showing {offset + 1}-{end} of {len(sessions)}"
+        table.add_column("ID", style=_STYLE_CYAN)
+        table.add_column("Name", style=_STYLE_GREEN)
         table.add_column("Messages", justify="right")
         table.add_column("Total Tokens", justify="right")
         table.add_column("Cost", justify="right")
-        table.add_column("Last Updated", style="blue")
-        temp_usage = TokenUsage()
-        for session in sessions:
-            updated_at = datetime.fromisoformat(session["updated_at"])
+        table.add_column("Last Updated", style=_STYLE_BLUE)
+        format_number = TokenUsage.format_number
+        row_cache = self._session_row_cache
+        for session in sessions[offset:end]:
             cost = session.get("cost", 0.0)
-            table.add_row(
-                session["id"][:8],  # Show shortened ID
+            key = (
+                session["id"],
                 session["name"],
-                str(session["message_count"]),
-                temp_usage.format_number(session["total_tokens"]),
-                f"${cost:.6f}" if cost > 0 else "$0.000000",
-                updated_at.strftime("%Y-%m-%d %H:%M"),
+                session["updated_at"],
+                session["message_count"],
+                session["total_tokens"],
+                cost,
             )
+            row = row_cache.get(key)
+            if row is None:
+                row = (
+                    session["id"][:8],  # Show shortened ID
+                    session["name"],
+                    str(session["message_count"]),
+                    format_number(session["total_tokens"]),
+                    f"${cost:.6f}" if cost > 0 else _ZERO_COST,
+                    _format_updated_at(session["updated_at"]),
+                )
+                row_cache[key] = row
+            table.add_row(*row)
 
         self.console.print(table)
+        return end
 
     def display_token_usage(
         self, title: str, usage: Dict, show_automatically: bool = False
     ):
         """Display token usage statistics"""
-
-        token_usage = TokenUsage(
-            input_tokens=usage.get("input_tokens", 0),
-            output_tokens=usage.get("output_tokens", 0),
-            total_tokens=usage.get("total_tokens", 0),
-            cost=usage.get("cost", 0.0),
+        table = _usage_table(
+            title,
+            usage["input_tokens"],
+            usage["output_tokens"],
+            usage["total_tokens"],
+            usage["cost"],
         )
-        table = Table(title=title)
-        table.add_column("Type", style="cyan")
-        table.add_column("Count", justify="right")
-
-        table.add_row("Input Tokens", f"{usage['input_tokens']:,}")
-        table.add_row("Output Tokens", f"{usage['output_tokens']:,}")
-        table.add_row("Total Tokens", f"{usage['total_tokens']:,}")
-        table.add_row("Cost", f"${usage['cost']:.6f}")
-
         self.console.print(table)
 
         if show_automatically:
@@ -196,39 +628,85 @@ class ChatConsole:
         """Display current provider and model information"""
         provider_msg = f"[bright_cyan]{provider_name}[/bright_cyan]"
         model_msg = f"[bright_green]{model_name}[/bright_green]"
-        self.console.print(f"\n Using {model_msg} from {provider_msg}")
-        self.console.print()
+        self.console.print(
+            f"\n Using {model_msg} from {provider_msg}\n", highlight=False
+        )
 
     def confirm_action(self, message: str) -> bool:
         """Get user confirmation for an action"""
-        return Confirm.ask(message)
-
-    def select_session(self, sessions: List[Dict]) -> Optional[str]:
-        """Prompt user to select a session"""
+        return Confirm.ask(message, console=self.console)
+
+    def select_session(
+        self,
+        sessions: List[Dict],
+        page_size: int = SESSIONS_PAGE_SIZE,
+        ask: Optional[Callable[..., str]] = None,
+    ) -> Optional[str]:
+        """Prompt user to select a session
+
+        Args:
+            sessions: Sessions to choose from
+            page_size: Sessions shown per page
+            ask: Reads an answer given a prompt and default; a Rich prompt
+                is used when not given
+
+        Returns:
+            The selected session ID, or None if cancelled
+        """
         if not sessions:
             self.console.print("\nNo sessions available.", style="yellow")
             return None
 
-        self.display_sessions(sessions)
-
-        session_ids = {s["id"][:8]: s["id"] for s in sessions}
+        # Sorted IDs of the sessions shown so far, so any unique prefix of an
+        # ID the user has seen selects it
+        session_ids: List[str] = []
+        offset = 0
+        show_page = True
         while True:
-            session_id = Prompt.ask(
-                "\nEnter session ID (or 'cancel')", default="cancel"
+            if show_page:
+                start = offset
+                offset = self._display_sessions_page(sessions, offset, page_size)
+                for session in sessions[start:offset]:
+                    insort(session_ids, session["id"])
+                show_page = False
+
+            has_more = offset < len(sessions)
+            prompt = (
+                "\nEnter session ID ('more' for next page, or 'cancel')"
+                if has_more
+                else "\nEnter session ID (or 'cancel')"
             )
+            if ask is not None:
+                session_id = ask(prompt, default="cancel")
+            else:
+                session_id = Prompt.ask(prompt, default="cancel", console=self.console)
 
             if session_id.lower() == "cancel":
                 return None
 
-            if session_id in session_ids:
-                return session_ids[session_id]
+            if has_more and session_id.lower() == "more":
+                show_page = True
+                continue
 
-            self.console.print("Invalid session ID. Please try again.", style="red")
+            matches = _match_session_ids(session_ids, session_id)
+            if not matches and session_id != session_id.lower():
+                # Generated IDs are lowercase UUIDs
+                matches = _match_session_ids(session_ids, session_id.lower())
+            if len(matches) == 1:
+                return matches[0]
+
+            if matches:
+                self.console.print(
+                    "Ambiguous session ID. Please enter more characters.",
+                    style="red",
+                )
+            else:
+                self.console.print("Invalid session ID. Please try again.", style="red")
 
     def get_session_name(self, current_name: Optional[str] = None) -> Optional[str]:
         """Get session name from user"""
         default = current_name or "New Chat"
-        name = Prompt.ask("Enter session name", default=default)
+        name = Prompt.ask("Enter session name", default=default, console=self.console)
         return name if name != default else None
 
     def display_message(
@@ -239,44 +717,107 @@ class ChatConsole:
             return  # Don't display system messages
 
         # Set up styling based on role
-        if role == "user":
-            prefix = "[bright_blue]User ►[/bright_blue]"
-            content_style = "bright_white"
-        else:  # assistant
-            prefix = "[bright_green]Assistant ▣[/bright_green]"
-            content_style = "bright_white"
+        prefix = _ROLE_PREFIXES.get(role, _ASSISTANT_PREFIX)
+        content_style = _MESSAGE_STYLE
 
         # Create timestamp string if provided
-        time_str = f"[dim]{timestamp.strftime('%H:%M')}[/dim] " if timestamp else ""
+        time_str = f"[dim]{timestamp:%H:%M}[/dim] " if timestamp else ""
 
         # Display the message
         try:
             if role == "user":
                 # For user messages, simple format
                 self.console.print(
-                    f"\n{time_str}{prefix} {content}", style=content_style
+                    f"\n{time_str}{prefix} {content}",
+                    style=content_style,
+                    highlight=False,
                 )
             else:
                 # For assistant messages, add a newline and try markdown
-                self.console.print(f"\n{time_str}{prefix}")
-                md = Markdown(content, code_theme="monokai")
-                # self.console.print(Markdown(content))
-                self.console.print(md, soft_wrap=True)
+                if _is_plain_text(content):
+                    # Nothing to parse, so skip the markdown renderer
+                    body = Text(content.rstrip())
+                else:
+                    body = self._render_markdown(content)
+                # Header and body go out in one print
+                header = self.console.render_str(f"\n{time_str}{prefix}")
+                self.console.print(Group(header, body), soft_wrap=True)
 
         except Exception:
             # Fallback to plain text if markdown parsing fails
-            self.console.print(f"\n{time_str}{prefix} {content}", style=content_style)
+            self.console.print(
+                f"\n{time_str}{prefix} {content}",
+                style=content_style,
+                highlight=False,
+            )
+
+    def display_message_stream(
+        self,
+        role: str,
+        chunks: Iterable[str],
+        timestamp: Optional[datetime] = None,
+    ) -> str:
+        """Display a message while its text is still arriving
+
+        Assistant messages are drawn as they arrive by stream_assistant_message;
+        other roles are shown once complete.
+
+        Args:
+            role: Message role
+            chunks: Iterable of text chunks, e.g. from a streaming response
+            timestamp: Optional message timestamp
+
+        Returns:
+            The complete message text
+        """
+        if role != "assistant":
+            content = "".join(chunks)
+            self.display_message(role, content, timestamp)
+            return content
+
+        return stream_assistant_message(self.console, chunks, timestamp)
+
+    def _render_markdown(self, content: str) -> Segments:
+        """Render markdown to segments, reusing earlier renders of the same text
+
+        Args:
+            content: Markdown text
+
+        Returns:
+            Segments ready to print
+        """
+        # Each read of console.width or console.options queries the terminal
+        # size, so read the options once and take the width from them.
+        # Messages are soft wrapped: lines are left for the terminal to wrap
+        options = self.console.options.update(**_SOFT_WRAP)
+        digest = hashlib.blake2b(content.encode(), digest_size=16).digest()
+        key = (digest, options.max_width)
+        segments = self._md_cache.get(key)
+        if segments is None:
+            md = Markdown(content, code_theme="monokai")
+            segments = list(self.console.render(md, options))
+            self._md_cache[key] = segments
+            if len(self._md_cache) > MARKDOWN_CACHE_SIZE:
+                self._md_cache.popitem(last=False)
+        else:
+            self._md_cache.move_to_end(key)
+        return Segments(segments)
 
     def prompt_user(self) -> str:
         """Get user input with improved prompt and file completion"""
-        timestamp = datetime.now()
-        time_str = timestamp.strftime("%H:%M")
-        prompt_text = f"{time_str} User ► "
+        self._make_active()
+        time_str = time.strftime("%H:%M")
+        # The prompt only changes once a minute
+        if time_str != self._prompt_minute:
+            self._prompt_minute = time_str
+            self._prompt_text = f"\n{time_str} User ► "
 
         # Use PromptManager for input with completion and key bindings
         user_input = self.prompt_manager.get_input(
-            f"\n{prompt_text}", key_bindings=self.key_bindings
+            self._prompt_text, key_bindings=self.key_bindings
         )
+        # prompt_toolkit handles SIGWINCH itself while the prompt is open
+        self._sync_width()
 
         if user_input.lower() in ("exit", "quit"):
             return "/quit"
@@ -286,19 +827,73 @@ class ChatConsole:
     def set_current_session(self, session: "ChatSession"):
         """Set current active session for key bindings"""
         self.current_session = session
+        self._make_active()
 
     def display_error(self, message: str):
         """Display error message"""
-        from rich.markup import escape
-
         # Escape any Rich markup in the error message
-        safe_message = escape(message)
-        self.console.print(f"\nError: {safe_message}", style="bold red")
+        self.console.print(
+            f"\nError: {escape(message)}", style="bold red", highlight=False
+        )
 
     def display_success(self, message: str):
         """Display success message"""
-        self.console.print(message, style="bold green")
+        self.console.print(message, style="bold green", highlight=False)
 
     def display_info(self, message: str, style: Optional[str] = "blue"):
         """Display info message"""
-        self.console.print(message, style=style)
+        self.console.print(message, style=style, highlight=False)
+
+
+# SIGWINCH handler that was installed before ours, chained after resizing
+_previous_resize_handler = None
+_resize_handler_installed = False
+
+
+def _on_resize(signum, frame):
+    """Update the width of the active console after a terminal resize"""
+    ref = ChatConsole._active
+    chat_console = ref() if ref is not None else None
+    if chat_console is not None:
+        chat_console._sync_width()
+    if callable(_previous_resize_handler):
+        _previous_resize_handler(signum, frame)
+
+
+def _watch_terminal_size() -> bool:
+    """Install the SIGWINCH handler once for all consoles
+
+    Returns:
+        True if the handler is installed
+    """
+    global _previous_resize_handler, _resize_handler_installed
+    if _resize_handler_installed:
+        return True
+    previous = signal.getsignal(signal.SIGWINCH)
+    try:
+        signal.signal(signal.SIGWINCH, _on_resize)
+    except ValueError:
+        # Signal handlers can only be installed from the main thread
+        return False
+    _previous_resize_handler = previous
+    _resize_handler_installed = True
+    return True
+
+
+# Key bindings shared by every ChatConsole
+_KEY_BINDINGS = KeyBindings()
+
+
+@_KEY_BINDINGS.add("c-b")  # Ctrl+B
+def _copy_to_clipboard(event):
+    """Copy latest response to clipboard"""
+    ref = ChatConsole._active
+    chat_console = ref() if ref is not None else None
+    if chat_console is not None:
+        chat_console.copy_latest_response()
+
+
+# An Esc-prefixed binding makes prompt_toolkit wait for a follow-up key after
+# every Esc press, so Alt+B is opt-in with LOOPLM_ALT_KEYS=1
+if os.environ.get("LOOPLM_ALT_KEYS") == "1":
+    _KEY_BINDINGS.add("escape", "b")(_copy_to_clipboard)
@@ -1,6 +1,8 @@
 # src/looplm/chat/commands.py
 
-from typing import Optional
+import sys
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
 
 from rich.prompt import Prompt
 from rich.table import Table
@@ -13,10 +15,67 @@ from .console import ChatConsole
 from .persistence import SessionManager
 from .session import ChatSession
 
+# Messages shown from a session when it is loaded
+RECENT_MESSAGES_SHOWN = 5
+
+# Answers accepted by the /system menu and yes/no prompts; Rich only reads them
+_SYSTEM_CHOICES = ("1", "2", "3", "4", "5")
+_YES_NO_CHOICES = ("y", "n")
+
+# Standard providers by their --provider value
+_PROVIDERS_BY_VALUE = {provider.value: provider for provider in ProviderType}
+
 
 class CommandHandler:
     """Handles chat commands and orchestrates components"""
 
+    # Commands without arguments, mapped to the methods that handle them
+    _COMMANDS = {
+        # Basic commands
+        "quit": "_handle_quit",
+        "q": "_handle_quit",
+        "help": "_handle_help",
+        "h": "_handle_help",
+        "clear": "_handle_clear",
+        "c": "_handle_clear",
+        # Session management
+        "save": "_handle_save",
+        "load": "_handle_load",
+        "new": "_handle_new",
+        "list": "_handle_list",
+        "delete": "_handle_delete",
+        "rename": "_handle_rename",
+        # Configuration
+        "model": "_handle_model",
+        "system": "_handle_system",
+        "usage": "_handle_usage",
+        "compact": "_handle_compact",
+        "compact-info": "_handle_compact_info",
+        "compact-reset": "_handle_compact_reset",
+        # Tool commands
+        "tools": "_handle_tools",
+        "tools-list": "_handle_tools_list",
+        "tools-disable": "_handle_tools_disable",
+        "tools-approval": "_handle_tools_approval",
+        "tools-dir": "_handle_tools_dir",
+        "tools-reload": "_handle_tools_reload",
+    }
+
+    # Commands taking an argument, mapped to their handler and default argument
+    _COMMANDS_WITH_ARG = {
+        "clear-last": ("_handle_clear_last", "1"),
+        "tools-enable": ("_handle_tools_enable", "all"),
+        "tools-create": ("_handle_tools_create", ""),
+    }
+
+    # Whether stdin is a terminal; set per handler in __init__
+    _interactive = True
+
+    # (config file mtime, providers table, provider name index) for /model
+    _provider_menu_cache: Optional[Tuple[int, Table, Dict[str, ProviderType]]] = None
+    # (prompts file mtime, saved prompts, prompts table) for /system
+    _prompts_table_cache: Optional[Tuple[int, Dict[str, str], Table]] = None
+
     def __init__(
         self,
         provider: Optional[str] = None,
@@ -26,6 +85,7 @@ class CommandHandler:
         tools_approval: bool = False,
     ):
         """Initialize command handler"""
+        self._interactive = sys.stdin.isatty()
         self.console = ChatConsole()
         self.session_manager = SessionManager()
         self.config_manager = ConfigManager()
@@ -47,91 +107,52 @@ class CommandHandler:
         Returns:
             bool: True if should continue chat, False if should exit
         """
-        cmd = cmd.lower().strip()
-
-        # Basic commands
-        if cmd in ["quit", "q"]:
-            return self._handle_quit()
-        elif cmd in ["help", "h"]:
-            return self._handle_help()
-        elif cmd in ["clear", "c"]:
-            return self._handle_clear()
-        elif cmd.startswith("clear-last"):
-            parts = cmd.split(" ", 1)
-            count_param = parts[1] if len(parts) > 1 else "1"
-            return self._handle_clear_last(count_param)
+        cmd = cmd.strip()
+        # Commands are almost always typed in lowercase; skip the copy then
+        if not cmd.islower():
+            cmd = cmd.lower()
+
+        handler_name = self._COMMANDS.get(cmd)
+        if handler_name is not None:
+            return getattr(self, handler_name)()
+
+        # Commands that take an argument; split off the argument once
+        head, _, arg = cmd.partition(" ")
+        command = self._COMMANDS_WITH_ARG.get(head)
+        if command is not None:
+            handler_name, default = command
+            return getattr(self, handler_name)(arg.strip() or default)
+
+        self.console.display_error(f"Unknown command: {cmd}")
+        return True
 
-        # Session management
-        elif cmd == "save":
-            return self._handle_save()
-        elif cmd == "load":
-            return self._handle_load()
-        elif cmd == "new":
-            return self._handle_new()
-        elif cmd == "list":
-            return self._handle_list()
-        elif cmd == "delete":
-            return self._handle_delete()
-        elif cmd == "rename":
-            return self._handle_rename()
+    def _require_session(
+        self, error: str = "No active session"
+    ) -> Optional[ChatSession]:
+        """Get the active session, reporting an error if there is none
 
-        # Configuration
-        elif cmd == "model":
-            return self._handle_model()
-        elif cmd == "system":
-            return self._handle_system()
-        elif cmd == "usage":
-            return self._handle_usage()
-        elif cmd == "compact":
-            return self._handle_compact()
-        elif cmd == "compact-info":
-            return self._handle_compact_info()
-        elif cmd == "compact-reset":
-            return self._handle_compact_reset()
+        Args:
+            error: Message shown when no session is active
 
-        # Tool commands
-        elif cmd == "tools":
-            return self._handle_tools()
-        elif cmd == "tools-list":
-            return self._handle_tools_list()
-        elif cmd.startswith("tools-enable"):
-            parts = cmd.split(" ", 1)
-            tool_names = parts[1] if len(parts) > 1 else "all"
-            return self._handle_tools_enable(tool_names)
-        elif cmd == "tools-disable":
-            return self._handle_tools_disable()
-        elif cmd == "tools-approval":
-            return self._handle_tools_approval()
-        elif cmd.startswith("tools-create"):
-            parts = cmd.split(" ", 1)
-            args = parts[1] if len(parts) > 1 else ""
-            return self._handle_tools_create(args)
-        elif cmd == "tools-dir":
-            return self._handle_tools_dir()
-        elif cmd == "tools-reload":
-            return self._handle_tools_reload()
-        else:
-            self.console.display_error(f"Unknown command: {cmd}")
-            return True
+        Returns:
+            The active session, or None
+        """
+        session = self.session_manager.active_session
+        if session is None:
+            self.console.display_error(error)
+        return session
 
     def _handle_clear_last(self, count: str = "1") -> bool:
         """Handle clear-last command"""
-        if not self.session_manager.active_session:
-            self.console.display_error("No active session")
+        session = self._require_session()
+        if session is None:
             return True
 
-        try:
-            num_to_clear = int(count) if count.isdigit() else 1
-        except ValueError:
-            self.console.display_error("Invalid number format")
-            return True
-
-        session = self.session_manager.active_session
+        # isdecimal, unlike isdigit, only accepts characters int() can parse
+        num_to_clear = int(count) if count.isdecimal() else 1
 
         # Check if there are messages to clear
-        non_system_count = len(
-            [msg for msg in session.messages if msg.role != "system"]
-        )
+        non_system_count = sum(1 for msg in session.messages if msg.role != "system")
         if non_system_count == 0:
             self.console.display_error("No messages to clear")
             return True
@@ -188,23 +209,21 @@ class CommandHandler:
 
     def _handle_clear(self) -> bool:
         """Handle clear command"""
-        if not self.session_manager.active_session:
-            self.console.display_error("No active session")
+        session = self._require_session()
+        if session is None:
             return True
 
         if self.console.confirm_action("Clear chat history?"):
-            self.session_manager.active_session.clear_history()
+            session.clear_history()
             self.console.display_success("Chat history cleared")
         return True
 
     def _handle_save(self) -> bool:
         """Handle save command"""
-        if not self.session_manager.active_session:
-            self.console.display_error("No active session to save")
+        session = self._require_session("No active session to save")
+        if session is None:
             return True
 
-        session = self.session_manager.active_session
-
         # Get session name if not set
         if session.name == "New Chat":
             new_name = self.console.get_session_name()
@@ -227,7 +246,7 @@ class CommandHandler:
             if self.console.confirm_action("Save current session before loading?"):
                 self._handle_save()
 
-        session_id = self.console.select_session(sessions)
+        session_id = self.console.select_session(sessions, ask=self._ask)
         if not session_id:
             return True
 
@@ -235,13 +254,16 @@ class CommandHandler:
         if session:
             self.console.display_success(f"Loaded session: {session.name}")
 
-            # Display recent messages
-            recent_messages = (
-                session.messages[-5:] if len(session.messages) > 5 else session.messages
+            # Display the last five messages, newest found first; system
+            # messages aren't shown, so they don't count towards the five
+            recent_messages = list(
+                islice(
+                    (msg for msg in reversed(session.messages) if msg.role != "system"),
+                    RECENT_MESSAGES_SHOWN,
+                )
             )
-            for msg in recent_messages:
-                if msg.role != "system":  # Don't show system messages
-                    self.console.display_message(msg.role, msg.content)
+            for msg in reversed(recent_messages):
+                self.console.display_message(msg.role, msg.content)
         else:
             self.console.display_error("Failed to load session")
 
@@ -276,12 +298,12 @@ class CommandHandler:
     def _handle_delete(self) -> bool:
         """Handle delete command"""
         sessions = self.session_manager.get_session_list()
-        session_id = self.console.select_session(sessions)
+        session_id = self.console.select_session(sessions, ask=self._ask)
 
         if not session_id:
             return True
 
-        if self.console.confirm_action("Are you sure you want to delete this session?"):
+        if self._confirm("Are you sure you want to delete this session?"):
             if self.session_manager.delete_session(session_id):
                 self.console.display_success("Session deleted successfully")
             else:
@@ -291,11 +313,10 @@ class CommandHandler:
 
     def _handle_rename(self) -> bool:
         """Handle rename command"""
-        if not self.session_manager.active_session:
-            self.console.display_error("No active session to rename")
+        session = self._require_session("No active session to rename")
+        if session is None:
             return True
 
-        session = self.session_manager.active_session
         new_name = self.console.get_session_name(session.name)
 
         if new_name and new_name != session.name:
@@ -309,71 +330,31 @@ class CommandHandler:
 
     def _handle_model(self) -> bool:
         """Handle model command"""
-        if not self.session_manager.active_session:
-            self.console.display_error("No active session")
+        session = self._require_session()
+        if session is None:
             return True
 
         # Display current model
-        session = self.session_manager.active_session
         self.console.display_info(f"\nCurrent model: {session.model}")
 
         # Display available providers
         providers = self.config_manager.get_configured_providers()
-        self.console.display_info("\nConfigured providers:")
-
-        for provider, config in providers.items():
-            provider_name = self.config_manager.get_provider_display_name(
-                provider, config
-            )
-            models = config.get("models", [config.get("default_model")])
-            default_model = config.get("default_model")
-
-            self.console.display_info(f"  • {provider_name}:")
-            for model in models:
-                is_default = model == default_model
-                self.console.display_info(
-                    f"      - {model}" + (" (default)" if is_default else "")
-                )
+        menu, provider_index = self._get_provider_menu(providers)
+        self.console.console.print(menu)
 
         # Get provider selection
-        provider_input = Prompt.ask(
+        provider_input = self._ask(
             "\nEnter provider name (or press Enter to keep current)"
         )
 
         if provider_input:
             # If provider selected, show its models
             try:
-                # Try to find the provider
-                selected_provider = None
-
-                # Try to get provider as ProviderType directly
-                try:
-                    selected_provider = ProviderType(provider_input)
-                    if selected_provider not in providers:
-                        selected_provider = None
-                except ValueError:
-                    # Not a direct enum match
-                    pass
-
-                # Check if it's a custom provider
-                if selected_provider is None:
-                    for p, config in providers.items():
-                        if (
-                            p == ProviderType.OTHER
-                            and config.get("provider_name") == provider_input
-                        ):
-                            selected_provider = p
-                            break
-
-                # Check if it matches any provider display name
-                if selected_provider is None:
-                    for p, config in providers.items():
-                        display_name = self.config_manager.get_provider_display_name(
-                            p, config
-                        ).lower()
-                        if provider_input.lower() == display_name:
-                            selected_provider = p
-                            break
+                # Match the provider value or custom name exactly, then fall
+                # back to a case-insensitive display name match
+                selected_provider = provider_index.get(
+                    provider_input
+                ) or provider_index.get(provider_input.lower())
 
                 if selected_provider is None:
                     self.console.display_error(f"Provider {provider_input} not found")
@@ -385,27 +366,9 @@ class CommandHandler:
                     "models", [provider_config.get("default_model")]
                 )
 
-                if models:
-                    self.console.display_info(
-                        f"\nAvailable models for {provider_input}:"
-                    )
-                    for i, model in enumerate(models, 1):
-                        self.console.display_info(f"  {i}. {model}")
-
-                    model_choice = Prompt.ask("Enter model number or name", default="1")
-
-                    # Convert choice to model name if it's a number
-                    model_input = None
-                    try:
-                        choice_idx = int(model_choice) - 1
-                        if 0 <= choice_idx < len(models):
-                            model_input = models[choice_idx]
-                        else:
-                            model_input = model_choice
-                    except ValueError:
-                        model_input = model_choice
-                else:
-                    model_input = Prompt.ask("Enter model name")
+                model_input = self._select_model(
+                    models, f"Available models for {provider_input}:"
+                )
 
                 # Use the display name for better UX
                 display_name = self.config_manager.get_provider_display_name(
@@ -426,39 +389,143 @@ class CommandHandler:
                 "models", [provider_config.get("default_model")]
             )
 
-            if models:
-                self.console.display_info("\nAvailable models for current provider:")
-                for i, model in enumerate(models, 1):
-                    self.console.display_info(f"  {i}. {model}")
-
-                model_choice = Prompt.ask("Enter model number or name", default="1")
-
-                # Convert choice to model name if it's a number
-                model_input = None
-                try:
-                    choice_idx = int(model_choice) - 1
-                    if 0 <= choice_idx < len(models):
-                        model_input = models[choice_idx]
-                    else:
-                        model_input = model_choice
-                except ValueError:
-                    model_input = model_choice
-            else:
-                model_input = Prompt.ask("Enter model name")
-
+            model_input = self._select_model(
+                models, "Available models for current provider:"
+            )
             session.set_model(model_input)
             self.console.display_success(f"Switched to model: {model_input}")
 
         return True
 
+    def _ask(
+        self,
+        prompt: str,
+        default: Optional[str] = None,
+        choices: Optional[Tuple[str, ...]] = None,
+    ) -> str:
+        """Ask the user a question, reading a bare line when stdin isn't a TTY
+
+        Args:
+            prompt: Question shown by the interactive prompt
+            default: Answer used for empty (or, without a TTY, invalid) input
+            choices: Accepted answers
+
+        Returns:
+            str: The answer
+        """
+        if self._interactive:
+            kwargs = {} if default is None else {"default": default}
+            return Prompt.ask(
+                prompt, choices=choices, console=self.console.console, **kwargs
+            )
+
+        # Scripted input: no prompt rendering, and no re-asking on bad input
+        if choices:
+            prompt += f" [{'/'.join(choices)}]"
+        if default is not None:
+            prompt += f" ({default})"
+        try:
+            answer = input(f"{prompt}: ").strip()
+        except EOFError:
+            answer = ""
+        if default is not None and (not answer or (choices and answer not in choices)):
+            return default
+        return answer
+
+    def _confirm(self, message: str) -> bool:
+        """Ask a yes/no question, reading a bare line when stdin isn't a TTY
+
+        Args:
+            message: Question to ask
+
+        Returns:
+            bool: True if the user answered yes
+        """
+        if self._interactive:
+            return self.console.confirm_action(message)
+        answer = self._ask(f"{message} [y/n]", default="n")
+        return answer.lower() in ("y", "yes")
+
+    def _select_model(self, models: List[str], heading: str) -> str:
+        """Show numbered models and ask for a model number or name
+
+        Args:
+            models: Models to choose from; when empty, a name is asked for
+            heading: Line shown above the numbered models
+
+        Returns:
+            str: Chosen model, or the answer itself when it isn't a listed number
+        """
+        if not models:
+            return self._ask("Enter model name")
+
+        self.console.display_info(
+            f"\n{heading}\n"
+            + "\n".join(f"  {i}. {model}" for i, model in enumerate(models, 1))
+        )
+        model_choice = self._ask("Enter model number or name", default="1")
+
+        # Convert choice to model name if it's a number
+        if model_choice.isdecimal() and 0 < int(model_choice) <= len(models):
+            return models[int(model_choice) - 1]
+        return model_choice
+
+    def _get_provider_menu(
+        self, providers: Dict
+    ) -> Tuple[Table, Dict[str, ProviderType]]:
+        """Get the /model providers table and name index, rebuilt on config change
+
+        Args:
+            providers: Configured providers, as loaded for this /model call
+
+        Returns:
+            Tuple of (table with one row per provider model, index mapping
+            provider values, custom provider names and lowercase display
+            names to providers)
+        """
+        try:
+            mtime_ns = self.config_manager.config_file.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = 0
+        if self._provider_menu_cache and self._provider_menu_cache[0] == mtime_ns:
+            return self._provider_menu_cache[1:]
+
+        table = Table(title="Configured providers")
+        table.add_column("Provider", style="cyan")
+        table.add_column("Model", style="green")
+        table.add_column("Default", style="yellow")
+
+        index = {}
+        for provider, config in providers.items():
+            provider_name = self.config_manager.get_provider_display_name(
+                provider, config
+            )
+            index.setdefault(provider_name.lower(), provider)
+            default_model = config.get("default_model")
+            for model in config.get("models", [default_model]):
+                table.add_row(
+                    provider_name, model, "✓" if model == default_model else ""
+                )
+                # Only the first row of each provider names it
+                provider_name = ""
+
+        # Exact provider values and custom names take precedence over
+        # display names, as they did when matched one after another
+        for provider, config in providers.items():
+            if provider == ProviderType.OTHER and config.get("provider_name"):
+                index[config["provider_name"]] = provider
+        for provider in providers:
+            index[provider.value] = provider
+
+        self._provider_menu_cache = (mtime_ns, table, index)
+        return table, index
+
     def _handle_system(self) -> bool:
         """Handle system command"""
-        if not self.session_manager.active_session:
-            self.console.display_error("No active session")
+        session = self._require_session()
+        if session is None:
             return True
 
-        session = self.session_manager.active_session
-
         # Display current prompt
         current_prompt = session.get_system_prompt()
         self.console.display_info("\nCurrent system prompt:")
@@ -466,31 +533,23 @@ class CommandHandler:
 
         # Show options
         self.console.display_info("\nOptions:", style="bold")
-        self.console.display_info("1. Use saved prompt")
-        self.console.display_info("2. Create new prompt")
-        self.console.display_info("3. Save current prompt")
-        self.console.display_info("4. Delete saved prompt")
-        self.console.display_info("5. Cancel")
-
-        choice = Prompt.ask(
-            "Select option", choices=["1", "2", "3", "4", "5"], default="5"
+        self.console.display_info(
+            "1. Use saved prompt\n"
+            "2. Create new prompt\n"
+            "3. Save current prompt\n"
+            "4. Delete saved prompt\n"
+            "5. Cancel"
         )
 
+        choice = self._ask("Select option", choices=_SYSTEM_CHOICES, default="5")
+
         if choice == "1":
             # Show saved prompts
-            prompts = self.prompts_manager.list_prompts()
-            table = Table(title="Saved System Prompts")
-            table.add_column("Name", style="cyan")
-            table.add_column("Preview", style="dim")
-
-            for name, prompt in prompts.items():
-                preview = prompt[:50] + "..." if len(prompt) > 50 else prompt
-                table.add_row(name, preview)
-
-            self.console.display_info(table)
+            prompts, table = self._get_prompts_table()
+            self.console.console.print(table)
 
             # Select prompt
-            name = Prompt.ask("Enter prompt name", default="default")
+            name = self._ask("Enter prompt name", default="default")
             if name in prompts:
                 session.set_system_prompt(prompts[name])
                 self.console.display_success(f"System prompt set to '{name}'")
@@ -501,12 +560,12 @@ class CommandHandler:
             # Create new prompt using multi-line input
             new_prompt = self._get_multiline_input()
             if new_prompt:  # Only proceed if we got input
-                save = Prompt.ask(
-                    "Save this prompt? (y/n)", choices=["y", "n"], default="n"
+                save = self._ask(
+                    "Save this prompt? (y/n)", choices=_YES_NO_CHOICES, default="n"
                 )
 
                 if save.lower() == "y":
-                    name = Prompt.ask("Enter name for this prompt")
+                    name = self._ask("Enter name for this prompt")
                     self.prompts_manager.save_prompt(name, new_prompt)
                     self.console.display_success(f"Prompt saved as '{name}'")
 
@@ -519,24 +578,16 @@ class CommandHandler:
                 self.console.display_error("No current prompt to save")
                 return True
 
-            name = Prompt.ask("Enter name for this prompt")
+            name = self._ask("Enter name for this prompt")
             self.prompts_manager.save_prompt(name, current_prompt)
             self.console.display_success(f"Current prompt saved as '{name}'")
 
         elif choice == "4":
             # Delete saved prompt
-            prompts = self.prompts_manager.list_prompts()
-            table = Table(title="Saved System Prompts")
-            table.add_column("Name", style="cyan")
-            table.add_column("Preview", style="dim")
-
-            for name, prompt in prompts.items():
-                preview = prompt[:50] + "..." if len(prompt) > 50 else prompt
-                table.add_row(name, preview)
+            _, table = self._get_prompts_table()
+            self.console.console.print(table)
 
-            self.console.print(table)
-
-            name = Prompt.ask("Enter prompt name to delete")
+            name = self._ask("Enter prompt name to delete")
             if self.prompts_manager.delete_prompt(name):
                 self.console.display_success(f"Prompt '{name}' deleted")
             else:
@@ -548,11 +599,10 @@ class CommandHandler:
 
     def _handle_usage(self) -> bool:
         """Handle usage command"""
-        if not self.session_manager.active_session:
-            self.console.display_error("No active session")
+        session = self._require_session()
+        if session is None:
             return True
 
-        session = self.session_manager.active_session
         self.console.display_token_usage(
             f"Token Usage - {session.name}", session.total_usage.to_dict()
         )
@@ -560,31 +610,28 @@ class CommandHandler:
 
     def _handle_compact(self) -> bool:
         """Handle /compact command by summarizing conversation so far using LLM."""
-        if not self.session_manager.active_session:
-            self.console.display_error("No active session")
+        session = self._require_session()
+        if session is None:
             return True
 
-        session = self.session_manager.active_session
         self.compact_handler.compact_session(session)
         return True
 
     def _handle_compact_info(self) -> bool:
         """Handle /compact-info command to show compact status and statistics."""
-        if not self.session_manager.active_session:
-            self.console.display_error("No active session")
+        session = self._require_session()
+        if session is None:
             return True
 
-        session = self.session_manager.active_session
         self.compact_handler.show_compact_info(session)
         return True
 
     def _handle_compact_reset(self) -> bool:
         """Handle /compact-reset command to reset compact state."""
-        if not self.session_manager.active_session:
-            self.console.display_error("No active session")
+        session = self._require_session()
+        if session is None:
             return True
 
-        session = self.session_manager.active_session
         self.compact_handler.reset_compact(session)
         return True
 
@@ -644,7 +691,11 @@ class CommandHandler:
                 try:
                     # Try to process the message
                     self.session_manager.active_session.send_message(
-                        user_input, stream=True, show_tokens=False, debug=self.debug
+                        user_input,
+                        stream=True,
+                        show_tokens=False,
+                        debug=self.debug,
+                        display=self.console.display_message_stream,
                     )
                 except Exception as e:
                     # Handle other errors
@@ -657,6 +708,31 @@ class CommandHandler:
             except Exception as e:
                 self.console.display_error(str(e))
 
+    def _get_prompts_table(self) -> Tuple[Dict[str, str], Table]:
+        """Get saved system prompts and their table, rebuilt when prompts change
+
+        Returns:
+            Tuple of (prompts by name, table of names and previews)
+        """
+        try:
+            mtime_ns = self.prompts_manager.prompts_file.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = 0
+        if self._prompts_table_cache and self._prompts_table_cache[0] == mtime_ns:
+            return self._prompts_table_cache[1:]
+
+        prompts = self.prompts_manager.list_prompts()
+        table = Table(title="Saved System Prompts")
+        table.add_column("Name", style="cyan")
+        table.add_column("Preview", style="dim")
+
+        for name, prompt in prompts.items():
+            preview = prompt[:50] + "..." if len(prompt) > 50 else prompt
+            table.add_row(name, preview)
+
+        self._prompts_table_cache = (mtime_ns, prompts, table)
+        return prompts, table
+
     def _get_multiline_input(self, current_text: str = "") -> str:
         """Get multi-line input from user with instructions
 
@@ -667,29 +743,35 @@ class CommandHandler:
             str: Complete multi-line input
         """
         self.console.display_info(
-            "\nEnter your prompt. Type ':done' on a new line to finish."
+            "\nEnter your prompt. Type ':done' on a new line to finish.\n"
+            "To cancel, type ':cancel' or use Ctrl+C"
         )
-        self.console.display_info("To cancel, type ':cancel' or use Ctrl+C")
 
         lines = []
         if current_text:
             lines.extend(current_text.split("\n"))
-            for line in lines:
-                self.console.display_info(line)
+            self.console.display_info(current_text)
 
         while True:
             try:
-                line = Prompt.ask("", default="")
-                # Check for termination commands
-                if line.strip().lower() == ":done":
-                    break
-                if line.strip().lower() == ":cancel":
-                    return ""
-                lines.append(line)
+                # Plain input() per line; a Rich prompt is re-rendered on
+                # every call, which adds up when a long prompt is pasted
+                line = input()
+            except EOFError:
+                # End of piped input finishes the prompt like :done
+                break
             except KeyboardInterrupt:
                 self.console.display_info("\nCancelled input.")
                 return ""
 
+            # Check for termination commands
+            command = line.strip().lower()
+            if command == ":done":
+                break
+            if command == ":cancel":
+                return ""
+            lines.append(line)
+
         return "\n".join(lines)
 
     def _create_new_session(self) -> ChatSession:
@@ -699,9 +781,8 @@ class CommandHandler:
         if self.override_provider:
             try:
                 # Handle both standard and custom providers
-                try:
-                    provider_type = ProviderType(self.override_provider)
-                except ValueError:
+                provider_type = _PROVIDERS_BY_VALUE.get(self.override_provider)
+                if provider_type is None:
                     # Check if this is a custom provider
                     providers = self.config_manager.get_configured_providers()
                     other_config = providers.get(ProviderType.OTHER, {})
@@ -792,8 +873,8 @@ class CommandHandler:
 
     def _handle_tools_create(self, args: str) -> bool:
         """Handle /tools-create command to create a new custom tool"""
-        if not self.session_manager.active_session:
-            self.console.display_error("No active session")
+        session = self._require_session()
+        if session is None:
             return True
 
         if not args.strip():
@@ -809,7 +890,6 @@ class CommandHandler:
             self.console.display_error("Tool name must be a valid Python identifier")
             return True
 
-        session = self.session_manager.active_session
         if not session.tool_manager:
             self.console.display_error(
                 "Tools are not enabled. Use /tools-enable first."
@@ -826,11 +906,10 @@ class CommandHandler:
 
     def _handle_tools_dir(self) -> bool:
         """Handle /tools-dir command to show user tools directory"""
-        if not self.session_manager.active_session:
-            self.console.display_error("No active session")
+        session = self._require_session()
+        if session is None:
             return True
 
-        session = self.session_manager.active_session
         if not session.tool_manager:
             self.console.display_error("Tools are not enabled")
             return True
@@ -845,11 +924,10 @@ class CommandHandler:
 
     def _handle_tools_reload(self) -> bool:
         """Handle /tools-reload command to reload tools from directories"""
-        if not self.session_manager.active_session:
-            self.console.display_error("No active session")
+        session = self._require_session()
+        if session is None:
             return True
 
-        session = self.session_manager.active_session
         if not session.tool_manager:
             self.console.display_error("Tools are not enabled")
             return True
@@ -867,11 +945,10 @@ class CommandHandler:
 
     def _handle_tools_list(self) -> bool:
         """Handle /tools-list command"""
-        if not self.session_manager.active_session:
-            self.console.display_error("No active session")
+        session = self._require_session()
+        if session is None:
             return True
 
-        session = self.session_manager.active_session
         available_tools = session.list_available_tools()
         enabled_tools = session.list_enabled_tools()
 
@@ -889,12 +966,10 @@ class CommandHandler:
 
     def _handle_tools_enable(self, tool_names: str = "all") -> bool:
         """Handle /tools-enable command"""
-        if not self.session_manager.active_session:
-            self.console.display_error("No active session")
+        session = self._require_session()
+        if session is None:
             return True
 
-        session = self.session_manager.active_session
-
         if tool_names == "all":
             session.enable_tools(require_approval=self.tools_approval)
         else:
@@ -907,21 +982,19 @@ class CommandHandler:
 
     def _handle_tools_disable(self) -> bool:
         """Handle /tools-disable command"""
-        if not self.session_manager.active_session:
-            self.console.display_error("No active session")
+        session = self._require_session()
+        if session is None:
             return True
 
-        session = self.session_manager.active_session
         session.disable_tools()
         return True
 
     def _handle_tools_approval(self) -> bool:
         """Handle /tools-approval command"""
-        if not self.session_manager.active_session:
-            self.console.display_error("No active session")
+        session = self._require_session()
+        if session is None:
             return True
 
-        session = self.session_manager.active_session
         if session.tool_manager:
             current_mode = session.tool_manager.require_approval
             session.tool_manager.set_approval_mode(not current_mode)
@@ -8,7 +8,7 @@ from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
 from prompt_toolkit.completion import Completer, Completion
 from prompt_toolkit.formatted_text import ANSI
 from prompt_toolkit.history import FileHistory
-from prompt_toolkit.key_binding import KeyBindings
+from prompt_toolkit.key_binding import KeyBindings, merge_key_bindings
 from prompt_toolkit.styles import Style
 from rich.console import Console
 
@@ -322,17 +322,11 @@ class PromptManager:
         """Get user input with completion and history"""
         try:
             if key_bindings:
-                combined_bindings = KeyBindings()
-
-                # Copy existing bindings
-                if self.session.key_bindings:
-                    for binding in self.session.key_bindings.bindings:
-                        combined_bindings.add(*binding.keys)(binding.handler)
-
-                # Add new bindings
-                for binding in key_bindings.bindings:
-                    combined_bindings.add(*binding.keys)(binding.handler)
-                kb = combined_bindings
+                # Merged lazily, so the bindings aren't copied on every prompt;
+                # the extra bindings take priority as they come last
+                kb = merge_key_bindings(
+                    [self.session.key_bindings or KeyBindings(), key_bindings]
+                )
 
             else:
                 kb = self.session.key_bindings
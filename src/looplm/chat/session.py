@@ -1,26 +1,78 @@
 # src/looplm/chat/session.py - Updated for new command system
 
+import hashlib
 import os
 import random
+import re
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 from uuid import uuid4
 
 from litellm import completion, completion_cost
 from rich.console import Console
-from rich.live import Live
 from rich.markdown import Markdown
+from rich.markup import escape
 from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.text import Text
 
 from ..commands import CommandManager
 from ..config.manager import ConfigManager
 from ..config.providers import ProviderType
 
+# Draws a message while it streams in: display(role, chunks, timestamp) -> text
+StreamDisplay = Callable[[str, Iterable[str], Optional[datetime]], str]
 
-@dataclass
+# Fenced code blocks, used to drop repeated blocks from API payloads
+CODE_BLOCK_PATTERN = re.compile(r"```[\s\S]*?```")
+
+# Shared role strings so messages loaded from disk don't each hold a copy
+_ROLE_INTERN = {
+    role: sys.intern(role) for role in ("user", "assistant", "system", "tool")
+}
+
+
+class BlockInterner:
+    """Shares a single copy of equal text blocks across messages
+
+    Strings can't be weakly referenced, so the table is bounded by total size
+    and simply starts over once the budget is exceeded.
+    """
+
+    def __init__(self, max_chars: int = 16 * 1024 * 1024, min_length: int = 64):
+        """Initialize the interner
+
+        Args:
+            max_chars: Total characters to hold before the table is reset
+            min_length: Blocks shorter than this are not worth sharing
+        """
+        self.max_chars = max_chars
+        self.min_length = min_length
+        self._blocks: Dict[str, str] = {}
+        self._chars = 0
+
+    def intern(self, text: str) -> str:
+        """Return the shared copy of text, registering it if new"""
+        if len(text) < self.min_length:
+            return text
+
+        shared = self._blocks.get(text)
+        if shared is not None:
+            return shared
+
+        if self._chars + len(text) > self.max_chars:
+            self._blocks.clear()
+            self._chars = 0
+        self._blocks[text] = text
+        self._chars += len(text)
+        return text
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+
+@dataclass(slots=True)
 class TokenUsage:
     """Tracks token usage for a message"""
 
@@ -48,7 +100,8 @@ class TokenUsage:
             cost=data.get("cost", 0.0),
         )
 
-    def format_number(self, value: int) -> str:
+    @staticmethod
+    def format_number(value: int) -> str:
         """Format numbers with K/M suffixes"""
         if value >= 1_000_000:
             return f"{value / 1_000_000:.1f}M"
@@ -58,7 +111,7 @@ class TokenUsage:
             return f"{value:,}"
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """Represents a chat message"""
 
@@ -74,6 +127,15 @@ class Message:
     tool_call_id: Optional[str] = None
     name: Optional[str] = None
 
+    # Cached token estimate; content doesn't change once a message is created
+    _token_estimate: Optional[int] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        """Intern the role string"""
+        self.role = _ROLE_INTERN.get(self.role, self.role)
+
     def to_dict(self) -> Dict:
         """Convert to dictionary for API calls and serialization"""
         result = {
@@ -218,6 +280,46 @@ def analyze_message_content(messages):
     return estimated_tokens, image_count, pdf_count
 
 
+def _dedup_messages(msgs: List[Dict]) -> Tuple[List[Dict], int]:
+    """Replace repeated fenced code blocks with references to their first copy
+
+    Only string content is deduplicated; structured (media) content is left as is.
+
+    Args:
+        msgs: Messages in API format
+
+    Returns:
+        Tuple of (deduplicated messages, number of characters saved)
+    """
+    seen: Dict[str, Tuple[int, int]] = {}
+    saved = 0
+
+    for msg_index, msg in enumerate(msgs):
+        content = msg.get("content")
+        if not isinstance(content, str) or "```" not in content:
+            continue
+
+        block_index = 0
+
+        def replace_block(match):
+            nonlocal block_index, saved
+            block = match.group(0)
+            digest = hashlib.sha1(block.encode("utf-8")).hexdigest()
+            ref = seen.setdefault(digest, (msg_index, block_index))
+            block_index += 1
+            if ref[0] == msg_index:
+                return block
+            marker = f"```<ref msg{ref[0]} block{ref[1]}>```"
+            if len(marker) >= len(block):
+                return block
+            saved += len(block) - len(marker)
+            return marker
+
+        msg["content"] = CODE_BLOCK_PATTERN.sub(replace_block, content)
+
+    return msgs, saved
+
+
 @dataclass
 class ChatSession:
     """Manages a chat session with history and configuration"""
@@ -233,6 +335,9 @@ class ChatSession:
     compacted: bool = False
     compact_summary: Optional[str] = None
     compact_index: Optional[int] = None
+    # Summaries of each compacted segment, oldest first
+    compact_segments: List[str] = field(default_factory=list)
+    dedup_savings: int = 0  # Characters saved by code block dedup
 
     # Configuration
     console: Console = field(
@@ -248,6 +353,11 @@ class ChatSession:
     # Tool support
     tool_manager: Optional[object] = None
 
+    # Shares equal message content within this session
+    _interner: BlockInterner = field(
+        default_factory=BlockInterner, init=False, repr=False, compare=False
+    )
+
     def enable_tools(
         self, tool_names: Optional[List[str]] = None, require_approval: bool = False
     ) -> None:
@@ -299,10 +409,23 @@ class ChatSession:
             tool_call_id=message_dict.get("tool_call_id"),
             name=message_dict.get("name"),
         )
+        self.add_message(msg)
+
+    def add_message(self, msg: Message) -> None:
+        """Append a message, sharing its content with equal earlier messages"""
+        self._share_content(msg)
         self.messages.append(msg)
 
+    def _share_content(self, msg: Message) -> None:
+        """Point the message at the session's copy of equal content"""
+        if isinstance(msg.content, str):
+            msg.content = self._interner.intern(msg.content)
+
     def __post_init__(self):
         """Initialize after creation"""
+        # Loaded sessions often repeat the same file or tool output
+        for msg in self.messages:
+            self._share_content(msg)
         if not self.provider or not self.model:
             provider, model, custom_provider = self._get_provider_and_model()
             self.provider = provider
@@ -414,18 +537,23 @@ class ChatSession:
         Returns:
             int: Number of messages actually cleared
         """
-        # Get non-system messages
-        non_system_messages = [msg for msg in self.messages if msg.role != "system"]
+        # Split system and non-system messages in one pass
+        system_messages = []
+        remaining_messages = []
+        for msg in self.messages:
+            if msg.role == "system":
+                system_messages.append(msg)
+            else:
+                remaining_messages.append(msg)
 
-        if count > len(non_system_messages):
-            count = len(non_system_messages)
+        if count > len(remaining_messages):
+            count = len(remaining_messages)
 
         if count <= 0:
             return 0
 
         # Rebuild message list
-        system_messages = [msg for msg in self.messages if msg.role == "system"]
-        remaining_messages = non_system_messages[:-count]
+        del remaining_messages[-count:]
 
         self.messages = system_messages + remaining_messages
         self.updated_at = datetime.now()
@@ -485,8 +613,8 @@ class ChatSession:
 
     def get_system_prompt(self) -> Optional[str]:
         """Get current system prompt"""
-        system_messages = [msg for msg in self.messages if msg.role == "system"]
-        return system_messages[0].content if system_messages else None
+        system_msg = next((msg for msg in self.messages if msg.role == "system"), None)
+        return system_msg.content if system_msg is not None else None
 
     def _update_total_usage(self, usage: TokenUsage):
         """Update total token usage"""
@@ -496,15 +624,6 @@ class ChatSession:
         self.total_usage.cost += usage.cost
         self.updated_at = datetime.now()
 
-    def _stream_markdown(self, content: str, live: Live) -> None:
-        """Update live display with markdown content"""
-        try:
-            markdown = Markdown(content)
-            live.update(markdown, refresh=True)
-        except Exception:
-            text = Text(content)
-            live.update(text)
-
     def clear_history(self, keep_system_prompt: bool = True):
         """Clear chat history"""
         system_prompt = None
@@ -526,6 +645,7 @@ class ChatSession:
         show_tokens: bool = False,
         debug: bool = False,
         use_progress_streaming: bool = True,
+        display: Optional[StreamDisplay] = None,
     ) -> str:
         """
         Send a message and get response.
@@ -539,32 +659,34 @@ class ChatSession:
             show_tokens: Whether to show token usage
             debug: Whether to debug command processing without sending to LLM
             use_progress_streaming: Deprecated - always uses progress animation now
+            display: Called as display(role, chunks, timestamp) to draw the reply
+                while it streams in, returning the full text; defaults to
+                streaming markdown to this session's console
 
         Returns:
-            str: Model's response
+            str: Model's response, or an empty string if a command failed
 
         Raises:
-            Exception: If there's an error sending the message or processing commands
+            Exception: If there's an error sending the message
         """
         try:
             # Process all commands in the message using the CommandManager
             command_manager = CommandManager(base_path=self.base_path)
 
             # Process all commands in the message
-            import asyncio
-
-            try:
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-
-            processed_result = loop.run_until_complete(
-                command_manager.process_text(content)
-            )
+            processed = command_manager.process_text_result_sync(content)
+            if processed.errors:
+                # Nothing is sent when a command fails; report why instead
+                self.console.print(
+                    f"\nError: {escape(processed.error_message)}",
+                    style="bold red",
+                    highlight=False,
+                )
+                return ""
 
-            # Unpack the result - now includes processed text and image metadata
-            processed_content, media_metadata = processed_result
+            # Processed text and image metadata
+            processed_content = processed.text
+            media_metadata = processed.media_metadata
 
             if debug:
                 # In debug mode, just display the processed content
@@ -601,7 +723,7 @@ class ChatSession:
                 # Regular text-only message
                 user_msg = Message("user", processed_content)
 
-            self.messages.append(user_msg)
+            self.add_message(user_msg)
 
             # Prepare model name
             # IMPORTANT FIX: Check if the model name already contains the provider prefix
@@ -731,12 +853,10 @@ class ChatSession:
 
             # Always use the unified response handler with progress animation
             return self._handle_response_with_progress(
-                actual_model, messages, show_tokens, stream, tools
+                actual_model, messages, show_tokens, stream, tools, display
             )
 
         except Exception as e:
-            from rich.markup import escape
-
             error_message = escape(str(e))
             raise Exception(f"Error sending message: {error_message}")
 
@@ -747,14 +867,54 @@ class ChatSession:
         show_tokens: bool = False,
         stream: bool = False,
         tools: Optional[List[Dict]] = None,
+        display: Optional[StreamDisplay] = None,
     ) -> str:
         """Handle both streaming and non-streaming responses with progress animation"""
-        accumulated_text = ""
         timestamp = datetime.now()
+        if display is None:
+            from .console import stream_assistant_message
+
+            def display(role, chunks, timestamp):
+                return stream_assistant_message(self.console, chunks, timestamp)
+
+        final_chunk = None
+        tool_calls = []
+
+        def read_chunk(chunk) -> str:
+            """Collect tool calls and usage from a chunk and return its text"""
+            nonlocal final_chunk
+            delta = chunk.choices[0].delta
+
+            # Handle tool calls (streaming)
+            if hasattr(delta, "tool_calls") and delta.tool_calls:
+                for tool_call in delta.tool_calls:
+                    # Extend tool_calls list if needed
+                    while len(tool_calls) <= tool_call.index:
+                        tool_calls.append(
+                            {
+                                "id": "",
+                                "type": "function",
+                                "function": {"name": "", "arguments": ""},
+                            }
+                        )
+
+                    # Update the tool call
+                    if tool_call.id:
+                        tool_calls[tool_call.index]["id"] = tool_call.id
+                    if tool_call.function.name:
+                        tool_calls[tool_call.index]["function"][
+                            "name"
+                        ] = tool_call.function.name
+                    if tool_call.function.arguments:
+                        tool_calls[tool_call.index]["function"][
+                            "arguments"
+                        ] += tool_call.function.arguments
+
+            # Check for usage information
+            if hasattr(chunk, "usage") and chunk.usage is not None:
+                final_chunk = chunk
 
-        self.console.print()  # Add newline before response
-        self.console.print(f"{timestamp.strftime('%H:%M')} ", style="dim", end="")
-        self.console.print("Assistant ▣", style="bright_green")
+            return delta.content or ""
 
         with Progress(
             SpinnerColumn(),
@@ -816,47 +976,27 @@ class ChatSession:
                 call_kwargs["tool_choice"] = "auto"
 
             # Make API call with or without streaming
-            response = completion(**call_kwargs)
+            response = iter(completion(**call_kwargs))
 
-            final_chunk = None
-            cost = 0.0
-            tool_calls = []
+            # The spinner runs until the reply starts arriving
+            first_text = ""
+            for chunk in response:
+                first_text = read_chunk(chunk)
+                if first_text:
+                    break
 
+        def text_chunks():
+            if first_text:
+                yield first_text
             for chunk in response:
-                delta = chunk.choices[0].delta
-
-                # Handle text content
-                if delta.content:
-                    accumulated_text += delta.content
-
-                # Handle tool calls (streaming)
-                if hasattr(delta, "tool_calls") and delta.tool_calls:
-                    for tool_call in delta.tool_calls:
-                        # Extend tool_calls list if needed
-                        while len(tool_calls) <= tool_call.index:
-                            tool_calls.append(
-                                {
-                                    "id": "",
-                                    "type": "function",
-                                    "function": {"name": "", "arguments": ""},
-                                }
-                            )
-
-                        # Update the tool call
-                        if tool_call.id:
-                            tool_calls[tool_call.index]["id"] = tool_call.id
-                        if tool_call.function.name:
-                            tool_calls[tool_call.index]["function"][
-                                "name"
-                            ] = tool_call.function.name
-                        if tool_call.function.arguments:
-                            tool_calls[tool_call.index]["function"][
-                                "arguments"
-                            ] += tool_call.function.arguments
-
-                # Check for usage information
-                if hasattr(chunk, "usage") and chunk.usage is not None:
-                    final_chunk = chunk
+                text = read_chunk(chunk)
+                if text:
+                    yield text
+
+        # Draw the reply as it streams in; tool calls and usage are collected
+        # along the way
+        accumulated_text = display("assistant", text_chunks(), timestamp)
+        cost = 0.0
 
         # Extract cost from the final chunk with usage information
         if final_chunk and hasattr(final_chunk, "usage") and final_chunk.usage:
@@ -888,15 +1028,7 @@ class ChatSession:
                 token_usage=token_usage,
                 tool_calls=tool_calls,
             )
-            self.messages.append(assistant_message)
-
-            # Display assistant response if there's content
-            if accumulated_text:
-                try:
-                    markdown = Markdown(accumulated_text)
-                    self.console.print(markdown)
-                except Exception:
-                    self.console.print(accumulated_text)
+            self.add_message(assistant_message)
 
             # Execute all tool calls for this round
             for tool_call in tool_calls:
@@ -915,7 +1047,7 @@ class ChatSession:
                         tool_call_id=tool_call["id"],
                         name=tool_call["function"]["name"],
                     )
-                    self.messages.append(tool_message)
+                    self.add_message(tool_message)
 
                 except Exception as e:
                     error_message = f"Tool execution failed: {str(e)}"
@@ -929,7 +1061,7 @@ class ChatSession:
                         tool_call_id=tool_call["id"],
                         name=tool_call["function"]["name"],
                     )
-                    self.messages.append(tool_message)
+                    self.add_message(tool_message)
 
             # ReACT cycle: Continue until LLM provides final response (no more tool calls)
             final_text = self._continue_react_cycle(model, tools, token_usage)
@@ -939,15 +1071,8 @@ class ChatSession:
             # Regular response without tool calls
             self.latest_response = accumulated_text
 
-            # Display the complete response at once using Markdown
-            try:
-                markdown = Markdown(accumulated_text)
-                self.console.print(markdown)
-            except Exception:
-                self.console.print(accumulated_text)
-
             # Add response to history with token usage
-            self.messages.append(
+            self.add_message(
                 Message(
                     "assistant",
                     accumulated_text,
@@ -1051,7 +1176,7 @@ class ChatSession:
                         cost=cycle_cost if "cycle_cost" in locals() else 0.0,
                     ),
                 )
-                self.messages.append(final_message)
+                self.add_message(final_message)
 
                 # Display final response
                 try:
@@ -1070,7 +1195,7 @@ class ChatSession:
                 timestamp=datetime.now(),
                 tool_calls=new_tool_calls,
             )
-            self.messages.append(assistant_message)
+            self.add_message(assistant_message)
 
             # Display reasoning if LLM provided any
             if response_message.content:
@@ -1097,7 +1222,7 @@ class ChatSession:
                         tool_call_id=tool_call.id,
                         name=tool_call.function.name,
                     )
-                    self.messages.append(tool_message)
+                    self.add_message(tool_message)
 
                 except Exception as e:
                     error_message = f"Tool execution failed: {str(e)}"
@@ -1111,7 +1236,7 @@ class ChatSession:
                         tool_call_id=tool_call.id,
                         name=tool_call.function.name,
                     )
-                    self.messages.append(tool_message)
+                    self.add_message(tool_message)
 
         # If we've hit max iterations, force a final response
         self.console.print(
@@ -1127,7 +1252,7 @@ class ChatSession:
 
         final_text = final_response.choices[0].message.content
         final_message = Message("assistant", final_text, timestamp=datetime.now())
-        self.messages.append(final_message)
+        self.add_message(final_message)
 
         # Display final response
         try:
@@ -1156,78 +1281,105 @@ class ChatSession:
             "compacted": self.compacted,
             "compact_summary": self.compact_summary,
             "compact_index": self.compact_index,
+            "compact_segments": self.compact_segments,
         }
 
     def get_messages_for_api(self) -> List[Dict]:
-        """Get messages in format needed for API calls - supports both string and structured content."""
+        """Get messages in format needed for API calls - supports both string and structured content.
+
+        Repeated code blocks are replaced with references when LOOPLM_DEDUP=1.
+        """
+        msgs = self._build_messages_for_api()
+        if os.environ.get("LOOPLM_DEDUP") == "1":
+            msgs, saved = _dedup_messages(msgs)
+            self.dedup_savings += saved
+        return msgs
+
+    def _build_messages_for_api(self) -> List[Dict]:
+        """Build API messages from history, honouring compact state."""
         if self.is_compacted:
-            msgs = []
-            # System prompt
-            system_msgs = [msg for msg in self.messages if msg.role == "system"]
-            if system_msgs:
-                msgs.append({"role": "system", "content": system_msgs[0].content})
-            # Summary as assistant message
-            msgs.append({"role": "assistant", "content": self.compact_summary})
+            msgs = self._compacted_prefix()
             # All messages after compact_index
             if self.compact_index is not None:
-                for msg in self.messages[self.compact_index :]:
-                    if msg.role != "system":
+                msgs.extend(
+                    {
+                        "role": msg.role,
                         # Support both string and structured content
-                        content = msg.content if msg.content is not None else ""
-                        msgs.append({"role": msg.role, "content": content})
+                        "content": msg.content if msg.content is not None else "",
+                    }
+                    for msg in self.messages[self.compact_index :]
+                    if msg.role != "system"
+                )
             return msgs
         else:
-            msgs = []
-            for msg in self.messages:
-                # Support both string and structured content (preserves media)
-                content = msg.content if msg.content is not None else ""
-                msgs.append({"role": msg.role, "content": content})
-            return msgs
+            # Support both string and structured content (preserves media)
+            return [
+                {
+                    "role": msg.role,
+                    "content": msg.content if msg.content is not None else "",
+                }
+                for msg in self.messages
+            ]
 
     def get_messages_for_api_with_tools(self) -> List[Dict]:
         """Get messages in format needed for API calls including tool calls and responses."""
         if self.is_compacted:
-            msgs = []
-            # System prompt
-            system_msgs = [msg for msg in self.messages if msg.role == "system"]
-            if system_msgs:
-                msgs.append({"role": "system", "content": system_msgs[0].content})
-            # Summary as assistant message
-            msgs.append({"role": "assistant", "content": self.compact_summary})
+            msgs = self._compacted_prefix()
             # All messages after compact_index
             if self.compact_index is not None:
-                for msg in self.messages[self.compact_index :]:
-                    if msg.role != "system":
-                        # Support both string and structured content (preserves media)
-                        content = msg.content if msg.content is not None else ""
-                        msg_dict = {"role": msg.role, "content": content}
-                        if hasattr(msg, "tool_calls") and msg.tool_calls:
-                            msg_dict["tool_calls"] = msg.tool_calls
-                        if hasattr(msg, "tool_call_id") and msg.tool_call_id:
-                            msg_dict["tool_call_id"] = msg.tool_call_id
-                        if hasattr(msg, "name") and msg.name:
-                            msg_dict["name"] = msg.name
-                        msgs.append(msg_dict)
+                msgs.extend(
+                    self._tool_message_dict(msg)
+                    for msg in self.messages[self.compact_index :]
+                    if msg.role != "system"
+                )
             return msgs
         else:
-            msgs = []
-            for msg in self.messages:
-                # Support both string and structured content (preserves media)
-                content = msg.content if msg.content is not None else ""
-                msg_dict = {"role": msg.role, "content": content}
-                if hasattr(msg, "tool_calls") and msg.tool_calls:
-                    msg_dict["tool_calls"] = msg.tool_calls
-                if hasattr(msg, "tool_call_id") and msg.tool_call_id:
-                    msg_dict["tool_call_id"] = msg.tool_call_id
-                if hasattr(msg, "name") and msg.name:
-                    msg_dict["name"] = msg.name
-                msgs.append(msg_dict)
-            return msgs
+            return [self._tool_message_dict(msg) for msg in self.messages]
+
+    def _compacted_prefix(self) -> List[Dict]:
+        """Get the system prompt and summary that open a compacted history."""
+        msgs = []
+        # System prompt; stop at the first one rather than collecting them all
+        system_msg = next((msg for msg in self.messages if msg.role == "system"), None)
+        if system_msg is not None:
+            msgs.append({"role": "system", "content": system_msg.content})
+        # Summary as assistant message
+        msgs.append({"role": "assistant", "content": self.compact_summary})
+        return msgs
+
+    @staticmethod
+    def _tool_message_dict(msg: Message) -> Dict:
+        """Convert a message to an API dict including tool call fields."""
+        # Support both string and structured content (preserves media)
+        content = msg.content if msg.content is not None else ""
+        msg_dict = {"role": msg.role, "content": content}
+        if msg.tool_calls:
+            msg_dict["tool_calls"] = msg.tool_calls
+        if msg.tool_call_id:
+            msg_dict["tool_call_id"] = msg.tool_call_id
+        if msg.name:
+            msg_dict["name"] = msg.name
+        return msg_dict
 
     def set_compact_summary(self, summary: str):
         """Set the session as compacted, store summary and index."""
         self.compacted = True
         self.compact_summary = summary
+        self.compact_segments = [summary]
+        self.compact_index = len(self.messages)
+        self.updated_at = datetime.now()
+
+    def add_compact_segment(self, summary: str):
+        """Compact messages added since the last compact as a new segment.
+
+        Earlier segment summaries are kept as they are; the session summary
+        is the concatenation of all segment summaries.
+        """
+        if not self.is_compacted:
+            self.set_compact_summary(summary)
+            return
+        self.compact_segments.append(summary)
+        self.compact_summary = "\n\n".join(self.compact_segments)
         self.compact_index = len(self.messages)
         self.updated_at = datetime.now()
 
@@ -1236,6 +1388,7 @@ class ChatSession:
         self.compacted = False
         self.compact_summary = None
         self.compact_index = None
+        self.compact_segments = []
         self.updated_at = datetime.now()
 
     @property
@@ -1253,6 +1406,10 @@ class ChatSession:
         messages = [Message.from_dict(msg) for msg in data.get("messages", [])]
         total_usage = TokenUsage.from_dict(data.get("total_usage", {}))
         provider = ProviderType(data["provider"]) if data.get("provider") else None
+        compact_summary = data.get("compact_summary")
+        compact_segments = data.get("compact_segments") or (
+            [compact_summary] if compact_summary else []
+        )
         return cls(
             id=data.get("id", str(uuid4())),
             name=data.get("name", "New Chat"),
@@ -1264,6 +1421,7 @@ class ChatSession:
             model=data.get("model"),
             custom_provider=data.get("custom_provider"),
             compacted=data.get("compacted", False),
-            compact_summary=data.get("compact_summary"),
+            compact_summary=compact_summary,
             compact_index=data.get("compact_index"),
+            compact_segments=compact_segments,
         )
@@ -612,29 +612,41 @@ class LoopLMChat(App):
         self._update_status("Generating response...")
 
         try:
-            await self._stream_llm_response(message)
-            self._update_status("Ready")
+            if await self._stream_llm_response(message):
+                self._update_status("Ready")
 
         except Exception as e:
-            if self.streaming_response:
-                error_response = AssistantResponse(f"Error: {str(e)}")
-                await chat_messages.mount(error_response)
-                self.streaming_response.remove()
-                self.streaming_response = None
-            self._update_status(f"Error: {str(e)}")
+            await self._show_response_error(str(e))
 
         chat_messages.scroll_end()
 
-    async def _stream_llm_response(self, message: str) -> None:
-        """Handle streaming LLM response with real-time UI updates"""
+    async def _show_response_error(self, error: str) -> None:
+        """Show an error in place of the streaming response and in the status"""
+        if self.streaming_response:
+            chat_messages = self.query_one("#chat-view", VerticalScroll)
+            await chat_messages.mount(AssistantResponse(f"Error: {error}"))
+            self.streaming_response.remove()
+            self.streaming_response = None
+        self._update_status(f"Error: {error}")
+
+    async def _stream_llm_response(self, message: str) -> bool:
+        """Handle streaming LLM response with real-time UI updates
+
+        Returns:
+            bool: False if a command in the message failed and nothing was sent
+        """
         from litellm import completion
 
         from ..commands import CommandManager
 
         # Process commands in the message
         command_manager = CommandManager(base_path=self.current_session.base_path)
-        processed_result = await command_manager.process_text(message)
-        processed_content, media_metadata = processed_result
+        processed = await command_manager.process_text_result(message)
+        if processed.errors:
+            await self._show_response_error(processed.error_message)
+            return False
+        processed_content = processed.text
+        media_metadata = processed.media_metadata
 
         # Load environment and prepare for API call
         self.current_session.config_manager.load_environment(
@@ -663,7 +675,7 @@ class LoopLMChat(App):
             # Regular text-only message
             user_msg = Message("user", processed_content)
 
-        self.current_session.messages.append(user_msg)
+        self.current_session.add_message(user_msg)
 
         # Prepare model name (same logic as in session.py)
         if (
@@ -830,7 +842,7 @@ class LoopLMChat(App):
                 timestamp=timestamp,
                 token_usage=token_usage,
             )
-            self.current_session.messages.append(assistant_msg)
+            self.current_session.add_message(assistant_msg)
             self.current_session._update_total_usage(token_usage)
             self.current_session.latest_response = accumulated_text
 
@@ -844,6 +856,8 @@ class LoopLMChat(App):
                 self.streaming_response.remove()
                 self.streaming_response = None
 
+            return True
+
         except Exception as e:
             if self.streaming_response:
                 error_response = AssistantResponse(f"Error: {str(e)}")
@@ -21,10 +21,8 @@ import click
 from rich.console import Console
 from rich.table import Table
 
-from ..chat.control import CommandHandler
 from ..config.manager import ConfigManager
 from ..config.providers import ProviderType
-from ..conversation.handler import ConversationHandler
 from .setup import initial_setup
 
 console = Console()
@@ -112,6 +110,8 @@ def cli(
                 )
             else:
                 # Use the traditional Rich interface
+                from ..chat.control import CommandHandler
+
                 handler = CommandHandler(
                     provider=provider,
                     model=model,
@@ -124,7 +124,10 @@ def cli(
                 if prompt:
                     if handler.session_manager.active_session:
                         handler.session_manager.active_session.send_message(
-                            prompt, stream=True, show_tokens=False
+                            prompt,
+                            stream=True,
+                            show_tokens=False,
+                            display=handler.console.display_message_stream,
                         )
                     else:
                         console.print("\nSession Closed", style="bold red")
@@ -280,6 +283,9 @@ def cli(
                 if other_config and other_config.get("provider_name") == provider:
                     provider = "other"  # Use the internal provider type
 
+            # Imported here so --help, --status and setup don't load litellm
+            from ..conversation.handler import ConversationHandler
+
             handler = ConversationHandler(console, debug=debug)
 
             # Enable tools if specified
@@ -6,7 +6,7 @@ from .github_command import GithubProcessor
 from .image_command import ImageProcessor
 from .manager import CommandManager
 from .pdf_command import PDFProcessor
-from .processor import CommandProcessor, ProcessingResult
+from .processor import CommandProcessor, ProcessedText, ProcessingResult
 from .registry import CommandRegistry
 from .shell_command import ShellCommandProcessor
 
@@ -15,6 +15,7 @@ default_manager = CommandManager()
 __all__ = [
     "CommandProcessor",
     "ProcessingResult",
+    "ProcessedText",
     "CommandRegistry",
     "CommandManager",
     "default_manager",
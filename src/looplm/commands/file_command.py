@@ -1,9 +1,13 @@
 # src/looplm/commands/file_command.py
 
+import asyncio
+import atexit
 import mimetypes
 import os
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple, Union
+from typing import List, Optional, Tuple, Union
 from urllib.parse import urlparse
 
 import aiofiles
@@ -11,12 +15,9 @@ import aiohttp
 
 from .processor import CommandProcessor, ProcessingResult
 
-
-class FileProcessor(CommandProcessor):
-    """Processor for @file command"""
-
-    # File extensions that can be directly read as text
-    TEXT_EXTENSIONS = {
+# File extensions that can be directly read as text
+_TEXT_EXTS = frozenset(
+    {
         ".txt",
         ".py",
         ".js",
@@ -43,6 +44,113 @@ class FileProcessor(CommandProcessor):
         ".h",
         ".hpp",
     }
+)
+
+# URL schemes accepted for remote files
+_URL_SCHEMES = frozenset({"http", "https"})
+_URL_PREFIXES = ("http://", "https://")
+
+# Load the mimetypes database at import rather than on the first URL fetch
+mimetypes.init()
+
+# Local file and URL body limits
+MAX_FILE_BYTES = 5 * 1024 * 1024
+MAX_URL_BYTES = 5 * 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+_URL_TOO_LARGE = (
+    f"URL body too large. Maximum size is {MAX_URL_BYTES // (1024 * 1024)}MB"
+)
+
+
+def _parse_url(arg: str) -> Tuple[bool, str]:
+    """Check whether an argument is a URL, skipping urlparse for plain paths
+
+    Args:
+        arg: File path or URL
+
+    Returns:
+        Tuple of (is_url, scheme)
+    """
+    if arg.startswith(_URL_PREFIXES):
+        return True, arg[: arg.index(":")]
+    if "://" not in arg:
+        return False, ""
+    parsed = urlparse(arg)
+    return bool(parsed.scheme and parsed.netloc), parsed.scheme
+
+
+@lru_cache(maxsize=128)
+def _ext_for(content_type: str) -> str:
+    """Get the file extension for a Content-Type header value
+
+    Args:
+        content_type: Content-Type header, possibly with parameters
+
+    Returns:
+        Extension including the dot, or an empty string if unknown
+    """
+    return mimetypes.guess_extension(content_type.split(";", 1)[0].strip()) or ""
+
+
+@lru_cache(maxsize=256)
+def _local_candidates(path: str, cwd: str, base_path: str) -> Tuple[str, ...]:
+    """Get the locations a local file path may refer to, in lookup order
+
+    Args:
+        path: File path to resolve
+        cwd: Current working directory
+        base_path: Processor base path
+
+    Returns:
+        The path itself if absolute, else the path joined to cwd and base_path
+    """
+    if os.path.isabs(path):
+        return (path,)
+    return os.path.join(cwd, path), os.path.join(base_path, path)
+
+
+def _resolve_local(path: str, cwd: str, base_path: str) -> str:
+    """Resolve a local file path against the current dir and base path
+
+    Only the candidate locations are cached; existence is checked on every
+    call, so deleted, moved, and newly created files are seen.
+
+    Args:
+        path: File path to resolve
+        cwd: Current working directory
+        base_path: Processor base path
+
+    Returns:
+        Resolved absolute path
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+    """
+    candidates = _local_candidates(path, cwd, base_path)
+    for candidate in candidates:
+        if os.path.exists(candidate):
+            return os.path.realpath(candidate)
+
+    if len(candidates) == 1:
+        raise FileNotFoundError(f"File not found: {path}")
+    cwd_path, base = candidates
+    raise FileNotFoundError(
+        f"File not found: {path}\n"
+        f"Tried locations:\n"
+        f"  - Relative to current dir: {cwd_path}\n"
+        f"  - Relative to base path: {base}"
+    )
+
+
+class FileProcessor(CommandProcessor):
+    """Processor for @file command"""
+
+    # File extensions that can be directly read as text
+    TEXT_EXTENSIONS = _TEXT_EXTS
+
+    # HTTP session shared across URL fetches for connection reuse
+    _session: Optional[aiohttp.ClientSession] = None
+    _session_loop: Optional[asyncio.AbstractEventLoop] = None
 
     @property
     def name(self) -> str:
@@ -55,17 +163,16 @@ class FileProcessor(CommandProcessor):
     def validate(self, arg: str) -> bool:
         """Validate file path/URL"""
         # Check if URL
-        parsed = urlparse(arg)
-        if parsed.scheme and parsed.netloc:
-            return parsed.scheme in {"http", "https"}
+        is_url, scheme = _parse_url(arg)
+        if is_url:
+            return scheme in _URL_SCHEMES
 
         # Check if local file exists
-        path = Path(arg)
-        if path.is_absolute():
-            return path.exists()
-
-        # Try relative to current directory and base path
-        return (Path.cwd() / path).exists() or (self.base_path / path).exists()
+        try:
+            _resolve_local(arg, os.getcwd(), str(self.base_path))
+        except OSError:
+            return False
+        return True
 
     async def process(self, arg: str) -> ProcessingResult:
         """Process file inclusion
@@ -96,34 +203,73 @@ class FileProcessor(CommandProcessor):
         Returns:
             Tuple of (is_url, resolved_path)
         """
-        parsed = urlparse(path)
-        is_url = bool(parsed.scheme and parsed.netloc)
-
+        is_url, _ = _parse_url(path)
         if is_url:
             return True, path
 
-        path_obj = Path(path)
-        if path_obj.is_absolute():
-            if not path_obj.exists():
-                raise FileNotFoundError(f"File not found: {path_obj}")
-            return False, str(path_obj.resolve())
-
-        # Try relative to current directory
-        cwd_path = Path.cwd() / path_obj
-        if cwd_path.exists():
-            return False, str(cwd_path.resolve())
-
-        # Try relative to base path
-        base_path = self.base_path / path_obj
-        if base_path.exists():
-            return False, str(base_path.resolve())
-
-        raise FileNotFoundError(
-            f"File not found: {path}\n"
-            f"Tried locations:\n"
-            f"  - Relative to current dir: {cwd_path}\n"
-            f"  - Relative to base path: {base_path}"
-        )
+        return False, _resolve_local(path, os.getcwd(), str(self.base_path))
+
+    @classmethod
+    async def _get_session(cls) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it if needed
+
+        A session is bound to the event loop it was created on, so a new one
+        is created when the loop changes.
+
+        Returns:
+            Shared aiohttp ClientSession
+        """
+        loop = asyncio.get_running_loop()
+        if cls._session is None or cls._session.closed or cls._session_loop is not loop:
+            if cls._session is not None:
+                cls._close_replaced_session(cls._session, cls._session_loop)
+            cls._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300),
+                headers={"Accept-Encoding": "gzip"},
+            )
+            cls._session_loop = loop
+        return cls._session
+
+    @staticmethod
+    def _close_replaced_session(
+        session: aiohttp.ClientSession, loop: Optional[asyncio.AbstractEventLoop]
+    ) -> None:
+        """Close a session that was created on another event loop
+
+        Args:
+            session: Session being replaced
+            loop: Event loop the session was created on
+        """
+        if session.closed:
+            return
+        if loop is not None and loop.is_running():
+            # Running in another thread; close it there
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+        # This thread is running another loop, so the idle loop (or a fresh
+        # one, if it was closed) runs the close on a worker thread
+        if loop is None or loop.is_closed():
+            run = asyncio.run
+        else:
+            run = loop.run_until_complete
+
+        def close() -> None:
+            try:
+                run(session.close())
+            except Exception:
+                pass
+
+        worker = threading.Thread(target=close)
+        worker.start()
+        worker.join()
+
+    @classmethod
+    async def close_session(cls) -> None:
+        """Close the shared HTTP session"""
+        if cls._session is not None and not cls._session.closed:
+            await cls._session.close()
+        cls._session = None
+        cls._session_loop = None
 
     async def _handle_url(self, url: str) -> ProcessingResult:
         """Handle URL content retrieval
@@ -135,22 +281,31 @@ class FileProcessor(CommandProcessor):
             ProcessingResult containing content or error
         """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        return ProcessingResult(
-                            content="", error=f"Failed to fetch URL: {response.status}"
-                        )
-
-                    content = await response.text()
-                    ext = mimetypes.guess_extension(
-                        response.headers.get("content-type", "")
-                    )
-
+            session = await self._get_session()
+            async with session.get(url) as response:
+                if response.status != 200:
                     return ProcessingResult(
-                        content=self._format_content(content, ext, url)
+                        content="", error=f"Failed to fetch URL: {response.status}"
                     )
 
+                # Stream the body so an oversized response is never fully buffered
+                if (response.content_length or 0) > MAX_URL_BYTES:
+                    return ProcessingResult(content="", error=_URL_TOO_LARGE)
+
+                size = 0
+                chunks = []
+                async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > MAX_URL_BYTES:
+                        return ProcessingResult(content="", error=_URL_TOO_LARGE)
+                    chunks.append(chunk)
+                content = b"".join(chunks).decode(
+                    response.charset or "utf-8", errors="replace"
+                )
+                ext = _ext_for(response.headers.get("content-type", ""))
+
+                return ProcessingResult(content=self._format_content(content, ext, url))
+
         except Exception as e:
             return ProcessingResult(content="", error=f"Error fetching URL: {str(e)}")
 
@@ -167,17 +322,34 @@ class FileProcessor(CommandProcessor):
         if not path.exists():
             return ProcessingResult(content="", error=f"File not found: {file_path}")
 
-        if path.suffix.lower() not in self.TEXT_EXTENSIONS:
+        suffix = path.suffix
+        if suffix.lower() not in _TEXT_EXTS:
             return ProcessingResult(
-                content="", error=f"Unsupported file type: {path.suffix}"
+                content="", error=f"Unsupported file type: {suffix}"
             )
 
         try:
-            async with aiofiles.open(path, "r") as f:
-                content = await f.read()
+            size = path.stat().st_size
+            if size > MAX_FILE_BYTES:
                 return ProcessingResult(
-                    content=self._format_content(content, path.suffix, str(path))
+                    content="",
+                    error=f"File too large ({size:,} bytes). "
+                    f"Maximum size is {MAX_FILE_BYTES // (1024 * 1024)}MB",
                 )
+
+            chunks = []
+            async with aiofiles.open(
+                path, "r", encoding="utf-8", errors="replace"
+            ) as f:
+                while True:
+                    chunk = await f.read(READ_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+            content = "".join(chunks)
+            return ProcessingResult(
+                content=self._format_content(content, suffix, str(path))
+            )
         except Exception as e:
             return ProcessingResult(content="", error=f"Error reading file: {str(e)}")
 
@@ -192,7 +364,7 @@ class FileProcessor(CommandProcessor):
         Returns:
             Formatted content string
         """
-        tag_name = f"{os.path.basename(path)}"
+        tag_name = os.path.basename(path)
         return f"""<{tag_name}>
 {content}
 </{tag_name}>
@@ -226,11 +398,11 @@ class FileProcessor(CommandProcessor):
             if text.endswith("/"):
                 base = path
                 prefix = text
-                pattern = "*"
+                name_prefix = ""
             else:
                 base = path.parent
-                prefix = text[: text.rfind("/") + 1] if "/" in text else ""
-                pattern = f"{path.name}*" if path.name else "*"
+                prefix = text[: text.rfind("/") + 1]
+                name_prefix = path.name
 
             # Handle absolute paths
             if path.is_absolute():
@@ -245,14 +417,18 @@ class FileProcessor(CommandProcessor):
 
             completions = []
             try:
-                for item in base.glob(pattern):
-                    new_part = item.name
-                    # Add type indicator (D/F) with color
-                    if item.is_dir():
-                        display = f"\033[44;97m D \033[0m {new_part}"  # bright blue background with white text
-                    else:
-                        display = f"\033[100;97m F \033[0m {new_part}"  # gray background with white text
-                    completions.append((prefix + new_part, display))
+                # scandir reuses the d_type from readdir, so is_dir() needs no stat
+                with os.scandir(base) as entries:
+                    for entry in entries:
+                        new_part = entry.name
+                        if name_prefix and not new_part.startswith(name_prefix):
+                            continue
+                        # Add type indicator (D/F) with color
+                        if entry.is_dir():
+                            display = f"\033[44;97m D \033[0m {new_part}"  # bright blue background with white text
+                        else:
+                            display = f"\033[100;97m F \033[0m {new_part}"  # gray background with white text
+                        completions.append((prefix + new_part, display))
             except (PermissionError, OSError):
                 pass
 
@@ -260,3 +436,17 @@ class FileProcessor(CommandProcessor):
 
         except Exception:
             return []
+
+
+def _close_shared_session():
+    """Close the shared @file HTTP session at interpreter exit"""
+    loop = FileProcessor._session_loop
+    if loop is None or loop.is_closed() or loop.is_running():
+        return
+    try:
+        loop.run_until_complete(FileProcessor.close_session())
+    except Exception:
+        pass
+
+
+atexit.register(_close_shared_session)
@@ -1,13 +1,78 @@
 # src/looplm/commands/folder_command.py
 import asyncio
 import os
+import stat
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple, Union
+from typing import List, Optional, Tuple, Union
 
 from gitingest import ingest
 
 from .processor import CommandProcessor, ProcessingResult
 
+# Directories skipped when fingerprinting; gitingest ignores these as well
+_FINGERPRINT_SKIP_DIRS = frozenset({".git", "node_modules", "__pycache__", ".venv"})
+
+
+def _is_dir(path: str) -> Optional[bool]:
+    """Check a path with a single stat call
+
+    Args:
+        path: Path to check
+
+    Returns:
+        None if the path doesn't exist, otherwise whether it is a directory
+    """
+    try:
+        return stat.S_ISDIR(os.stat(path).st_mode)
+    except (OSError, ValueError):
+        return None
+
+
+def _fingerprint(root: str) -> int:
+    """Compute a cheap fingerprint of a directory tree
+
+    Combines the relative path, mtime and size of every entry, so adding,
+    removing or editing a file changes the result.
+
+    Args:
+        root: Directory to fingerprint
+
+    Returns:
+        int: Fingerprint of the tree
+    """
+    fingerprint = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in _FINGERPRINT_SKIP_DIRS]
+        for name in filenames:
+            file_path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                continue
+            fingerprint = hash((fingerprint, file_path, st.st_mtime_ns, st.st_size))
+    return fingerprint
+
+
+# Ingested folders can be very large, so only the latest few are kept
+@lru_cache(maxsize=4)
+def _ingest_cached(path: str, fingerprint: int) -> Tuple[str, str, str]:
+    """Ingest a folder, reusing the result while its fingerprint is unchanged
+
+    Args:
+        path: Folder to ingest
+        fingerprint: Fingerprint of the folder contents, part of the cache key
+
+    Returns:
+        Tuple of (summary, tree, content) from gitingest
+    """
+    return ingest(path)
+
+
+def _ingest_folder(path: str) -> Tuple[str, str, str]:
+    """Fingerprint a folder and ingest it through the cache"""
+    return _ingest_cached(path, _fingerprint(path))
+
 
 class FolderProcessor(CommandProcessor):
     """Processor for @folder command"""
@@ -29,20 +94,17 @@ class FolderProcessor(CommandProcessor):
         Returns:
             bool: True if folder exists
         """
-        path = Path(arg)
-
         # Handle absolute paths
-        if path.is_absolute():
-            return path.is_dir() and path.exists()
+        if os.path.isabs(arg):
+            return bool(_is_dir(arg))
 
         # Try relative to current directory
-        cwd_path = Path.cwd() / path
-        if cwd_path.exists():
-            return cwd_path.is_dir()
+        cwd_is_dir = _is_dir(os.path.join(os.getcwd(), arg))
+        if cwd_is_dir is not None:
+            return cwd_is_dir
 
         # Try relative to base path
-        base_path = self.base_path / path
-        return base_path.exists() and base_path.is_dir()
+        return bool(_is_dir(os.path.join(str(self.base_path), arg)))
 
     async def process(self, arg: str) -> ProcessingResult:
         """Process folder contents using gitingest
@@ -55,10 +117,10 @@ class FolderProcessor(CommandProcessor):
         """
         try:
             path = self._resolve_path(arg)
-            loop = asyncio.get_event_loop()
-            summary, tree, content = await loop.run_in_executor(None, ingest, str(path))
+            # ingest() reads files synchronously; keep it off the event loop
+            summary, tree, content = await asyncio.to_thread(_ingest_folder, path)
 
-            tag_name = f"{os.path.basename(str(path))}"
+            tag_name = os.path.basename(path)
             result = f"""
 <{tag_name}>
 ```
@@ -75,34 +137,32 @@ class FolderProcessor(CommandProcessor):
                 content="", error=f"Error processing folder: {str(e)}"
             )
 
-    def _resolve_path(self, path: str) -> Path:
+    def _resolve_path(self, path: str) -> str:
         """Resolve folder path
 
         Args:
             path: Folder path to resolve
 
         Returns:
-            Path: Resolved absolute path
+            str: Resolved absolute path
 
         Raises:
             FileNotFoundError: If folder doesn't exist
         """
-        path_obj = Path(path)
-
-        if path_obj.is_absolute():
-            if not path_obj.exists() or not path_obj.is_dir():
-                raise FileNotFoundError(f"Folder not found: {path_obj}")
-            return path_obj.resolve()
+        if os.path.isabs(path):
+            if not _is_dir(path):
+                raise FileNotFoundError(f"Folder not found: {path}")
+            return os.path.realpath(path)
 
         # Try relative to current directory
-        cwd_path = Path.cwd() / path_obj
-        if cwd_path.exists() and cwd_path.is_dir():
-            return cwd_path.resolve()
+        cwd_path = os.path.join(os.getcwd(), path)
+        if _is_dir(cwd_path):
+            return os.path.realpath(cwd_path)
 
         # Try relative to base path
-        base_path = self.base_path / path_obj
-        if base_path.exists() and base_path.is_dir():
-            return base_path.resolve()
+        base_path = os.path.join(str(self.base_path), path)
+        if _is_dir(base_path):
+            return os.path.realpath(base_path)
 
         raise FileNotFoundError(
             f"Folder not found: {path}\n"
@@ -139,11 +199,11 @@ class FolderProcessor(CommandProcessor):
             if text.endswith("/"):
                 base = path
                 prefix = text
-                pattern = "*"
+                name_prefix = ""
             else:
                 base = path.parent
-                prefix = text[: text.rfind("/") + 1] if "/" in text else ""
-                pattern = f"{path.name}*" if path.name else "*"
+                prefix = text[: text.rfind("/") + 1]
+                name_prefix = path.name
 
             # Handle absolute paths
             if path.is_absolute():
@@ -158,12 +218,16 @@ class FolderProcessor(CommandProcessor):
 
             completions = []
             try:
-                for item in base.glob(pattern):
-                    if item.is_dir():
-                        new_part = item.name
-                        # Add type indicator (D/F)
-                        display = f"\033[44;97m D \033[0m {new_part}"  # bright blue background with white text
-                        completions.append((prefix + new_part, display))
+                # scandir reuses the d_type from readdir, so is_dir() needs no stat
+                with os.scandir(base) as entries:
+                    for entry in entries:
+                        new_part = entry.name
+                        if name_prefix and not new_part.startswith(name_prefix):
+                            continue
+                        if entry.is_dir():
+                            # Add type indicator (D/F)
+                            display = f"\033[44;97m D \033[0m {new_part}"  # bright blue background with white text
+                            completions.append((prefix + new_part, display))
             except (PermissionError, OSError):
                 pass
 
@@ -48,12 +48,11 @@ class GithubProcessor(CommandProcessor):
             # Clean up URL (remove trailing slashes, etc)
             url = arg.rstrip("/")
 
-            # Since ingest() is synchronous, run it in a thread pool
-            loop = asyncio.get_event_loop()
-            summary, tree, content = await loop.run_in_executor(None, ingest, url)
+            # Since ingest() is synchronous, run it in a worker thread
+            summary, tree, content = await asyncio.to_thread(ingest, url)
 
             # Format output
-            tag_name = f"{self._get_repo_name(url)}"
+            tag_name = self._get_repo_name(url)
 
             result = f"""
 <{tag_name}>
@@ -3,7 +3,7 @@ import asyncio
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Type
 
-from .processor import CommandProcessor
+from .processor import CommandProcessor, ProcessedText
 from .registry import CommandRegistry
 
 
@@ -89,6 +89,8 @@ class CommandManager:
     async def process_text(self, text: str) -> Tuple[str, List[Dict]]:
         """Process text with all registered commands
 
+        Kept for backward compatibility; prefer process_text_result.
+
         Args:
             text: Input text containing commands
 
@@ -102,9 +104,22 @@ class CommandManager:
         """
         return await self.registry.process_text(text)
 
+    async def process_text_result(self, text: str) -> ProcessedText:
+        """Process text with all registered commands without raising on errors
+
+        Args:
+            text: Input text containing commands
+
+        Returns:
+            ProcessedText with processed text, media metadata and command errors
+        """
+        return await self.registry.process_text_result(text)
+
     def process_text_sync(self, text: str) -> Tuple[str, List[Dict]]:
         """Synchronous wrapper for process_text
 
+        Kept for backward compatibility; prefer process_text_result_sync.
+
         Args:
             text: Input text containing commands
 
@@ -116,10 +131,26 @@ class CommandManager:
         Raises:
             Exception: If command processing fails
         """
+        return self._run(self.process_text(text))
+
+    def process_text_result_sync(self, text: str) -> ProcessedText:
+        """Synchronous wrapper for process_text_result
+
+        Args:
+            text: Input text containing commands
+
+        Returns:
+            ProcessedText with processed text, media metadata and command errors
+        """
+        return self._run(self.process_text_result(text))
+
+    @staticmethod
+    def _run(coro):
+        """Run a coroutine to completion on the current thread's event loop"""
         try:
             loop = asyncio.get_event_loop()
         except RuntimeError:
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
 
-        return loop.run_until_complete(self.process_text(text))
+        return loop.run_until_complete(coro)
@@ -2,29 +2,21 @@
 import base64
 import os
 from pathlib import Path
-from typing import List, Optional, Tuple, Union
+from typing import List, Tuple, Union
 from urllib.parse import urlparse
 
-try:
-    from litellm.utils import supports_pdf_input
-except ImportError:
-    # Fallback if litellm is not available
-    def supports_pdf_input(model: str, api_key: Optional[str] = None) -> bool:
-        """Fallback PDF support check"""
-        # Some common models that support PDF input
-        pdf_supporting_models = [
-            "bedrock/anthropic.claude-3-5-sonnet",
-            "bedrock/anthropic.claude-3-sonnet",
-            "bedrock/anthropic.claude-3-haiku",
-            "anthropic.claude-3-5-sonnet",
-            "anthropic.claude-3-sonnet",
-            "anthropic.claude-3-haiku",
-        ]
-        return any(model.startswith(supported) for supported in pdf_supporting_models)
-
-
 from .processor import CommandProcessor, ProcessingResult
 
+# Models assumed to support PDF input when litellm can't tell
+_PDF_SUPPORTING_MODELS = (
+    "bedrock/anthropic.claude-3-5-sonnet",
+    "bedrock/anthropic.claude-3-sonnet",
+    "bedrock/anthropic.claude-3-haiku",
+    "anthropic.claude-3-5-sonnet",
+    "anthropic.claude-3-sonnet",
+    "anthropic.claude-3-haiku",
+)
+
 
 class PDFProcessor(CommandProcessor):
     """Processor for @pdf command to include PDF documents in prompts for document-capable models"""
@@ -305,17 +297,10 @@ class PDFProcessor(CommandProcessor):
             bool: True if model supports PDF input
         """
         try:
+            # litellm is slow to import, so it's only loaded when a PDF is used
+            from litellm.utils import supports_pdf_input
+
             return supports_pdf_input(model, None)
         except Exception:
             # Fallback check for common PDF-supporting models
-            pdf_supporting_models = [
-                "bedrock/anthropic.claude-3-5-sonnet",
-                "bedrock/anthropic.claude-3-sonnet",
-                "bedrock/anthropic.claude-3-haiku",
-                "anthropic.claude-3-5-sonnet",
-                "anthropic.claude-3-sonnet",
-                "anthropic.claude-3-haiku",
-            ]
-            return any(
-                model.startswith(supported) for supported in pdf_supporting_models
-            )
+            return model.startswith(_PDF_SUPPORTING_MODELS)
@@ -1,12 +1,12 @@
 # src/looplm/commands/processor.py
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcessingResult:
     """Result of processing a command"""
 
@@ -15,6 +15,20 @@ class ProcessingResult:
     metadata: Optional[dict] = None
 
 
+@dataclass(slots=True)
+class ProcessedText:
+    """Result of processing all commands in a piece of text"""
+
+    text: str
+    media_metadata: List[Dict] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def error_message(self) -> str:
+        """All command errors combined into one message"""
+        return "Command processing failed:\n" + "\n".join(self.errors)
+
+
 class CommandProcessor(ABC):
     """Base class for command processors"""
 
@@ -1,18 +1,40 @@
 # src/looplm/commands/registry.py
 
+import asyncio
 import re
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Type
+from typing import Dict, Iterator, List, Optional, Tuple, Type
 
-from .processor import CommandProcessor, ProcessingResult
+from .processor import CommandProcessor, ProcessedText, ProcessingResult
 from .shell_command import ShellCommandProcessor
 
+# Quote characters stripped from the ends of command arguments
+_QUOTE_CHARS = "\"'"
+_QUOTES = frozenset(_QUOTE_CHARS)
+
+
+def _clean_arg(arg: str) -> str:
+    """Remove surrounding whitespace and quotes from a command argument
+
+    Args:
+        arg: Raw command argument
+
+    Returns:
+        Cleaned argument
+    """
+    arg = arg.strip()
+    # Only strip quotes (a second copy) when the argument is actually quoted
+    if arg and (arg[0] in _QUOTES or arg[-1] in _QUOTES):
+        arg = arg.strip(_QUOTE_CHARS)
+    return arg
+
 
 class CommandRegistry:
     """Registry for command processors"""
 
     # COMMAND_PATTERN = re.compile(r"@(\w+)(?:\s*\(([^)]*)\)|\s+([^\s@]*))")
     SHELL_PATTERN = re.compile(r"\$\((.*?)\)")
+    _COMPLETION_PATTERN = re.compile(r"@(\w+)(?:\s+|\()(.*?)(?:\)|$)")
 
     def __init__(self, base_path: Optional[Path] = None):
         """Initialize registry
@@ -22,6 +44,10 @@ class CommandRegistry:
         """
         self.base_path = base_path or Path.cwd()
         self._processors: Dict[str, CommandProcessor] = {}
+        # Compiled @command pattern, rebuilt when a processor is registered
+        self._command_pattern: Optional[re.Pattern] = None
+        # "@name" completions, rebuilt when a processor is registered
+        self._prefixed_names: List[str] = []
         # Create shell processor but don't register it as an @ command
         # We'll still use it for processing $() commands
         self.shell_processor = ShellCommandProcessor(self.base_path)
@@ -37,20 +63,33 @@ class CommandRegistry:
         return True
 
     def _get_command_pattern(self) -> re.Pattern:
-        """Build pattern that only matches @command(...) for known commands"""
+        """Get the pattern that only matches @command(...) for known commands"""
+        if self._command_pattern is None:
+            self._command_pattern = self._build_command_pattern()
+        return self._command_pattern
+
+    def _build_command_pattern(self) -> re.Pattern:
+        """Build pattern matching $(...) shell commands and known @command(...)
+
+        Shell commands and all registered names go into one alternation, so a
+        single scan of the input finds every command. Matches expose the named
+        groups ``shell`` for shell commands, and ``cmd`` and ``arg`` for
+        @ commands.
+        """
+        shell = rf"\$\((?P<shell>.*?)\)"
         if not self._processors:
-            return re.compile(r"(?!.*)")  # Match nothing
+            return re.compile(shell)
 
         # Build a pattern that only matches exact registered commands with parentheses
         command_names = "|".join(re.escape(name) for name in self._processors.keys())
 
-        # This pattern is very specific:
+        # The @ command branch is very specific:
         # - @ symbol
         # - One of our registered command names (exact match)
         # - Opening parenthesis directly after the command name (no space)
         # - Any content inside the parentheses
         # - Closing parenthesis
-        return re.compile(rf"@({command_names})\(([^)]*)\)")
+        return re.compile(rf"{shell}|@(?P<cmd>{command_names})\((?P<arg>[^)]*)\)")
 
     def register(self, processor_class: Type[CommandProcessor]) -> None:
         """Register a command processor
@@ -62,6 +101,8 @@ class CommandRegistry:
         # Skip registering the shell processor as @shell
         if processor.name != "shell":
             self._processors[processor.name] = processor
+            self._command_pattern = None
+            self._prefixed_names = [f"@{name}" for name in self._processors]
 
     def get_processor(self, name: str) -> Optional[CommandProcessor]:
         """Get processor by command name
@@ -90,8 +131,23 @@ class CommandRegistry:
         if not processor:
             return ProcessingResult(content="", error=f"Unknown command: @{command}")
 
+        return await self._run_command(processor, command, arg)
+
+    async def _run_command(
+        self, processor: CommandProcessor, command: str, arg: str
+    ) -> ProcessingResult:
+        """Clean, validate and process a command argument with its processor
+
+        Args:
+            processor: Processor for the command
+            command: Command name, used in error messages
+            arg: Raw command argument
+
+        Returns:
+            ProcessingResult with processed content
+        """
         # Clean up argument - remove quotes and extra whitespace
-        arg = arg.strip().strip("\"'")
+        arg = _clean_arg(arg)
 
         if not arg:  # Empty argument
             return ProcessingResult(
@@ -105,31 +161,37 @@ class CommandRegistry:
 
         return await processor.process(arg)
 
-    def get_completions(self, text: str) -> List[str]:
+    def get_completions(self, text: str) -> Iterator[str]:
         """Get completions for current input
 
+        Completions are yielded lazily so the completer can stop early.
+
         Args:
             text: Current input text
 
-        Returns:
-            List of completion suggestions
+        Yields:
+            Completion suggestions
         """
         # Extract command if present
-        match = re.search(r"@(\w+)(?:\s+|\()(.*?)(?:\)|$)", text)
+        match = self._COMPLETION_PATTERN.search(text)
         if not match:
-            # Return list of available commands
-            return [f"@{name}" for name in self._processors.keys()]
+            # Yield available commands
+            yield from self._prefixed_names
+            return
 
         command, current_arg = match.groups()
         processor = self.get_processor(command)
         if not processor:
-            return []
+            return
 
-        return processor.get_completions(current_arg)
+        yield from processor.get_completions(_clean_arg(current_arg))
 
     async def process_text(self, text: str) -> Tuple[str, List[Dict]]:
         """Process all commands in text while preserving original
 
+        Kept for backward compatibility; process_text_result reports command
+        errors without raising.
+
         Args:
             text: Input text containing commands
 
@@ -137,72 +199,101 @@ class CommandRegistry:
             Tuple of (processed_text, list_of_media_metadata)
                 - processed_text: Text with commands output appended
                 - list_of_media_metadata: List of media metadata for vision/document models
+
+        Raises:
+            Exception: If any command fails
         """
-        processed_outputs = []
-        media_metadata = []
-        error_messages = []
+        result = await self.process_text_result(text)
+        if result.errors:
+            raise Exception(result.error_message)
+        return result.text, result.media_metadata
 
-        modified_text = text
+    async def process_text_result(self, text: str) -> ProcessedText:
+        """Process all commands in text, returning errors instead of raising
 
-        # Process shell commands
-        shell_matches = list(self.SHELL_PATTERN.finditer(text))
-        for match in shell_matches:
-            command = match.group(1)
-            full_match = match.group(0)
+        Args:
+            text: Input text containing commands
 
-            if not command.strip():
-                error_messages.append("Empty shell command in $()")
-                error_found = True
-                continue
+        Returns:
+            ProcessedText with the processed text, media metadata and any
+            command errors. When there are errors, text is the original input.
+        """
+        # Ordinary chat messages contain neither marker; skip the regex scan
+        if "@" not in text and "$(" not in text:
+            return ProcessedText(text=text)
 
-            # Process shell command using the shell processor
-            processed = await self.shell_processor.process(command)
+        shell_outputs = []
+        command_outputs = []
+        media_metadata = []
+        error_messages = []
 
-            if processed.error:
-                error_found = True
-                error_messages.append(f"Shell command error: {processed.error}")
+        # One pass finds both $() shell commands and @ commands; they are
+        # independent, so they run concurrently below
+        matches = []
+        tasks = []
+        for match in self._get_command_pattern().finditer(text):
+            shell_command = match.group("shell")
+            if shell_command is not None:
+                if not shell_command.strip():
+                    error_messages.append("Empty shell command in $()")
+                    continue
+                # Process shell command using the shell processor
+                processor = self.shell_processor
+                tasks.append(processor.process(shell_command))
             else:
-                processed_outputs.append(processed.content)
-
-                # Get the full match for shell command
-                full_match = text[match.start() : match.end()]
-                replacement = self.shell_processor.modify_input_text(
-                    "shell", command, full_match
-                )
-                # Replace with the modified text
-                # start, end = match.span()
-                # modified_text = modified_text[:start] + replacement + modified_text[end:]
-
-        # Process @ commands
-        command_pattern = self._get_command_pattern()
-        at_matches = list(command_pattern.finditer(text))
-        for match in at_matches:
-            command = match.group(1)
-            arg = match.group(2)
-
-            processed = await self.process_command(command, arg)
+                # The pattern only matches registered names, so this always hits
+                command = match.group("cmd")
+                processor = self._processors[command]
+                tasks.append(self._run_command(processor, command, match.group("arg")))
+            matches.append((match, processor))
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Pieces of the modified text, rebuilt around each replaced command
+        pieces = []
+        last_end = 0
+
+        for (match, processor), processed in zip(matches, results):
+            if isinstance(processed, Exception):
+                processed = ProcessingResult(content="", error=str(processed))
+
+            shell_command = match.group("shell")
+            if shell_command is not None:
+                if processed.error:
+                    error_messages.append(f"Shell command error: {processed.error}")
+                else:
+                    shell_outputs.append(processed.content)
+                # The $() syntax is kept unchanged in the input text
+                continue
+
+            command = match.group("cmd")
+            arg = match.group("arg")
             if processed.error:
                 error_messages.append(f"@{command} error: {processed.error}")
             else:
-                processed_outputs.append(processed.content)
+                command_outputs.append(processed.content)
                 if command in ["image", "pdf"] and processed.metadata:
                     media_metadata.append(processed.metadata)
 
                 # Replace command with modified text
-                full_match = text[match.start() : match.end()]
-                processor = self.get_processor(command)
-                replacement = processor.modify_input_text(command, arg, full_match)
+                replacement = processor.modify_input_text(command, arg, match.group(0))
                 start, end = match.span()
-                modified_text = (
-                    modified_text[:start] + replacement + modified_text[end:]
-                )
+                pieces.append(text[last_end:start])
+                pieces.append(replacement)
+                last_end = end
 
+        # Nothing gets sent when a command fails, so skip assembling the text
         if error_messages:
-            raise Exception("Command processing failed:\n" + "\n".join(error_messages))
+            return ProcessedText(text=text, errors=error_messages)
+
+        pieces.append(text[last_end:])
 
-        # Combine results
-        result = modified_text
+        # Combine results in a single join; shell output comes before @
+        # command output, and nothing is appended when there is no output
+        # (media commands return their data as metadata, not content)
+        processed_outputs = [out for out in shell_outputs + command_outputs if out]
         if processed_outputs:
-            result += "\n\n" + "\n".join(processed_outputs)
+            pieces.append("\n\n")
+            pieces.append("\n".join(processed_outputs))
 
-        return result, media_metadata
+        return ProcessedText(text="".join(pieces), media_metadata=media_metadata)
@@ -230,9 +230,13 @@ class ConversationHandler:
         """
         try:
             # Process the prompt using the command manager
-            processed_content, media_metadata = self.command_manager.process_text_sync(
-                prompt
-            )
+            processed = self.command_manager.process_text_result_sync(prompt)
+            if processed.errors:
+                # A one-shot prompt fails as a whole, so this still ends the
+                # run with an error
+                raise ValueError(processed.error_message)
+            processed_content = processed.text
+            media_metadata = processed.media_metadata
 
             if self.debug:
                 # In debug mode, just display the processed content
@@ -0,0 +1,525 @@
+"""Tests for the chat console."""
+
+import gc
+import os
+import signal
+from datetime import datetime
+from io import StringIO
+from unittest.mock import Mock
+
+import pytest
+from prompt_toolkit.keys import Keys
+from rich.console import Console
+from rich.markdown import Markdown
+
+from looplm.chat import console as console_module
+from looplm.chat.console import ChatConsole
+from looplm.config.providers import ProviderType
+
+
+@pytest.fixture
+def chat_console():
+    """Create a chat console that renders into a string buffer."""
+    return ChatConsole(console=Console(file=StringIO(), width=120))
+
+
+@pytest.fixture
+def config_manager(tmp_path, monkeypatch):
+    """Install a mock config manager backed by a temporary config file."""
+    config_file = tmp_path / "config.json"
+    config_file.write_text("{}")
+
+    manager = Mock()
+    manager.config_file = config_file
+    manager.get_default_provider.return_value = (ProviderType.OPENAI, "gpt-4o")
+    manager.get_configured_providers.return_value = {
+        ProviderType.OPENAI: {"default_model": "gpt-4o"}
+    }
+    manager.get_provider_display_name.return_value = "OpenAI"
+    manager.get_provider_models.return_value = ["gpt-4o", "gpt-4o-mini"]
+
+    monkeypatch.setattr(ChatConsole, "_config_manager", manager)
+    console_module._provider_rows.cache_clear()
+    yield manager
+    console_module._provider_rows.cache_clear()
+
+
+def output_of(chat_console):
+    return chat_console.console.file.getvalue()
+
+
+@pytest.mark.unit
+def test_welcome_reuses_provider_rows(chat_console, config_manager):
+    """Test that provider rows are read once while the config is unchanged."""
+    chat_console.display_welcome()
+    chat_console.display_welcome()
+
+    assert config_manager.get_configured_providers.call_count == 1
+    assert "gpt-4o, gpt-4o-mini" in output_of(chat_console)
+
+    stat = config_manager.config_file.stat()
+    os.utime(config_manager.config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    chat_console.display_welcome()
+
+    assert config_manager.get_configured_providers.call_count == 2
+
+
+@pytest.mark.unit
+def test_welcome_reuses_commands_table(chat_console, config_manager):
+    """Test that the commands table is built once for the same commands."""
+    console_module._commands_table.cache_clear()
+
+    chat_console.display_welcome()
+    chat_console.display_welcome()
+
+    info = console_module._commands_table.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+    output = output_of(chat_console)
+    assert output.count("LoopLM Commands & Shortcuts") == 2
+    assert "@file(path)" in output
+    assert "$(command)" in output
+
+
+@pytest.mark.unit
+def test_content_rows_rebuilt_only_when_commands_change(chat_console):
+    """Test that command rows are cached until a command is registered."""
+    commands = ["file", "shell"]
+    manager = Mock()
+    manager.get_available_commands.side_effect = lambda: list(commands)
+    manager.get_processor.side_effect = lambda name: Mock(description=f"{name} help")
+
+    rows = chat_console._get_content_rows(manager)
+    assert chat_console._get_content_rows(manager) is rows
+    assert rows == (("@file(path)", "file help"), ("$(command)", "shell help"))
+    assert manager.get_processor.call_count == 3
+
+    commands.insert(1, "image")
+    rows = chat_console._get_content_rows(manager)
+    assert ("@image(path)", "image help") in rows
+    assert manager.get_processor.call_count == 7
+
+
+@pytest.mark.unit
+def test_welcome_prints_once(chat_console, config_manager, monkeypatch):
+    """Test that the welcome screen is written in a single print."""
+    print_ = Mock(wraps=chat_console.console.print)
+    monkeypatch.setattr(chat_console.console, "print", print_)
+
+    chat_console.display_welcome()
+
+    assert print_.call_count == 1
+    output = output_of(chat_console)
+    assert output.index("LoopLM Chat") < output.index("Configured Providers")
+    assert output.index("Configured Providers") < output.index("LoopLM Commands")
+
+
+@pytest.mark.unit
+def test_display_sessions_caches_rows(chat_console, monkeypatch):
+    """Test that session rows are formatted once while unchanged."""
+    sessions = [
+        {
+            "id": "0123456789abcdef",
+            "name": "Work",
+            "message_count": 4,
+            "total_tokens": 12_345,
+            "cost": 0.0,
+            "updated_at": "2025-01-02T03:04:05",
+        }
+    ]
+
+    chat_console.display_sessions(sessions)
+    assert "12.3K" in output_of(chat_console)
+    assert "$0.000000" in output_of(chat_console)
+
+    def fail(_):
+        raise AssertionError("row was formatted again")
+
+    monkeypatch.setattr(console_module, "datetime", Mock(fromisoformat=fail))
+    chat_console.display_sessions(sessions)
+    assert output_of(chat_console).count("01234567") == 2
+
+
+def make_sessions(count):
+    return [
+        {
+            "id": f"{i:08d}-session",
+            "name": f"Chat {i}",
+            "message_count": 2,
+            "total_tokens": 100,
+            "cost": 0.0,
+            "updated_at": "2025-01-02T03:04:05",
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2025-01-02T03:04:05",
+        "2025-01-02T03:04:05.123456",
+        "2025-01-02 03:04:05+02:00",
+        "2025-01-02T03:04",
+        "2025-01-02",
+        "20250102T030405",
+    ],
+)
+def test_format_updated_at(value):
+    """Test that the sliced timestamp matches datetime formatting."""
+    expected = datetime.fromisoformat(value).strftime("%Y-%m-%d %H:%M")
+    assert console_module._format_updated_at(value) == expected
+
+
+@pytest.mark.unit
+def test_display_sessions_pages(chat_console, monkeypatch):
+    """Test that sessions are shown a page at a time."""
+    answers = iter(["", "q"])
+    monkeypatch.setattr(console_module.Prompt, "ask", lambda *a, **k: next(answers))
+
+    chat_console.display_sessions(make_sessions(7), page_size=2)
+
+    output = output_of(chat_console)
+    assert "Showing 1-2 of 7" in output
+    assert "Showing 3-4 of 7" in output
+    assert "Showing 5-6 of 7" not in output
+    assert "Chat 3" in output and "Chat 4" not in output
+
+
+@pytest.mark.unit
+def test_select_session_across_pages(chat_console, monkeypatch):
+    """Test that sessions on later pages can be selected after paging."""
+    answers = iter(["00000002", "more", "00000002"])
+    monkeypatch.setattr(console_module.Prompt, "ask", lambda *a, **k: next(answers))
+
+    selected = chat_console.select_session(make_sessions(3), page_size=2)
+
+    assert selected == "00000002-session"
+    assert "Invalid session ID" in output_of(chat_console)
+
+
+@pytest.mark.unit
+def test_select_session_by_unique_prefix(chat_console, monkeypatch):
+    """Test that any unique prefix of a shown session ID selects it."""
+    sessions = make_sessions(2)
+    sessions[1]["id"] = "00000000-other"
+    answers = iter(["00000000", "00000000-O"])
+    monkeypatch.setattr(console_module.Prompt, "ask", lambda *a, **k: next(answers))
+
+    selected = chat_console.select_session(sessions)
+
+    assert selected == "00000000-other"
+    assert "Ambiguous session ID" in output_of(chat_console)
+
+
+@pytest.mark.unit
+def test_match_session_ids():
+    """Test prefix lookup over sorted session IDs."""
+    ids = ["abc", "abcd", "abx", "b"]
+    assert console_module._match_session_ids(ids, "abc") == ["abc"]
+    assert console_module._match_session_ids(ids, "abcd") == ["abcd"]
+    assert console_module._match_session_ids(ids, "ab") == ["abc", "abcd"]
+    assert console_module._match_session_ids(ids, "abx") == ["abx"]
+    assert console_module._match_session_ids(ids, "c") == []
+
+
+@pytest.mark.unit
+def test_display_message_prefixes(chat_console):
+    """Test role prefixes and timestamps on displayed messages."""
+    chat_console.display_message("user", "hi", datetime(2025, 1, 2, 9, 5))
+    chat_console.display_message("assistant", "Hello.")
+    chat_console.display_message("system", "hidden")
+
+    output = output_of(chat_console)
+    assert "09:05 User ► hi" in output
+    assert "Assistant ▣\nHello." in output
+    assert "hidden" not in output
+
+
+@pytest.mark.unit
+def test_assistant_message_prints_once(chat_console, monkeypatch):
+    """Test that an assistant header and body are written in one print."""
+    print_ = Mock(wraps=chat_console.console.print)
+    monkeypatch.setattr(chat_console.console, "print", print_)
+
+    chat_console.display_message("assistant", "# Title\n\nBody")
+    chat_console.display_message("assistant", "Done.")
+
+    assert print_.call_count == 2
+    assert "Assistant ▣\nDone." in output_of(chat_console)
+
+
+@pytest.mark.unit
+def test_assistant_markdown_render_is_cached(chat_console, monkeypatch):
+    """Test that redisplaying an assistant message reuses its render."""
+    markdown = Mock(wraps=console_module.Markdown)
+    monkeypatch.setattr(console_module, "Markdown", markdown)
+
+    chat_console.display_message("assistant", "# Title\n\nSome **bold** text")
+    chat_console.display_message("assistant", "# Title\n\nSome **bold** text")
+
+    assert markdown.call_count == 1
+    assert output_of(chat_console).count("Some bold text") == 2
+
+
+@pytest.mark.unit
+def test_markdown_render_cache_tracks_width(chat_console, monkeypatch):
+    """Test that a resized console renders the message again."""
+    markdown = Mock(wraps=console_module.Markdown)
+    monkeypatch.setattr(console_module, "Markdown", markdown)
+
+    chat_console.display_message("assistant", "# Title")
+    chat_console.console.width = 60
+    chat_console.display_message("assistant", "# Title")
+
+    assert markdown.call_count == 2
+
+
+@pytest.mark.unit
+def test_plain_assistant_message_skips_markdown(chat_console, monkeypatch):
+    """Test that short messages without markdown syntax aren't parsed."""
+    markdown = Mock(wraps=console_module.Markdown)
+    monkeypatch.setattr(console_module, "Markdown", markdown)
+
+    chat_console.display_message("assistant", "Sure! The answer is 42.")
+    assert markdown.call_count == 0
+    assert "Sure! The answer is 42." in output_of(chat_console)
+
+    for content in ["Use `ls`", "1. First", "line one\nline two", "x" * 2000]:
+        chat_console.display_message("assistant", content)
+    assert markdown.call_count == 4
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(not hasattr(signal, "SIGWINCH"), reason="needs SIGWINCH")
+def test_own_console_tracks_terminal_width(monkeypatch):
+    """Test that the default console width follows terminal resizes."""
+    installed = []
+    monkeypatch.setattr(
+        console_module.signal, "signal", lambda *args: installed.append(args)
+    )
+    monkeypatch.setattr(console_module, "_resize_handler_installed", False)
+    sizes = iter([os.terminal_size((width, 40)) for width in (100, 100, 70, 60)])
+    monkeypatch.setattr(console_module.shutil, "get_terminal_size", lambda: next(sizes))
+
+    first = ChatConsole()
+    chat_console = ChatConsole()
+    assert chat_console.console.width == 100
+    # One handler serves every console, so old consoles aren't kept alive
+    assert installed == [(signal.SIGWINCH, console_module._on_resize)]
+
+    console_module._on_resize(signal.SIGWINCH, None)
+    assert chat_console.console.width == 70
+    assert first.console.width == 100
+
+    first._make_active()
+    console_module._on_resize(signal.SIGWINCH, None)
+    assert first.console.width == 60
+
+
+@pytest.mark.unit
+def test_prompt_user_reuses_prompt_within_minute(chat_console, monkeypatch):
+    """Test that the input prompt is rebuilt only when the minute changes."""
+    minutes = iter(["09:15", "09:15", "09:16"])
+    monkeypatch.setattr(console_module.time, "strftime", lambda fmt: next(minutes))
+    get_input = Mock(side_effect=[" hi ", "again", "quit"])
+    monkeypatch.setattr(chat_console.prompt_manager, "get_input", get_input)
+
+    assert chat_console.prompt_user() == "hi"
+    first = get_input.call_args.args[0]
+    assert chat_console.prompt_user() == "again"
+    assert get_input.call_args.args[0] is first
+    assert chat_console.prompt_user() == "/quit"
+
+    prompts = [c.args[0] for c in get_input.call_args_list]
+    assert prompts == ["\n09:15 User ► ", "\n09:15 User ► ", "\n09:16 User ► "]
+
+
+@pytest.mark.unit
+def test_copy_latest_response_is_debounced(chat_console, monkeypatch):
+    """Test that repeated copies from key autorepeat are dropped."""
+    pool = Mock()
+    pool.submit.return_value.done.return_value = True
+    monkeypatch.setattr(console_module, "_CLIPBOARD_POOL", pool)
+    times = iter([10.0, 10.1, 10.2, 11.0])
+    monkeypatch.setattr(console_module.time, "monotonic", lambda: next(times))
+
+    assert chat_console.copy_latest_response() is False
+    chat_console.current_session = Mock(latest_response="first")
+    assert chat_console.copy_latest_response() is True
+    assert chat_console.copy_latest_response() is False
+    chat_console.current_session.latest_response = "second"
+    assert chat_console.copy_latest_response() is True
+    assert chat_console.copy_latest_response() is True
+
+    copied = [c.args[1] for c in pool.submit.call_args_list]
+    assert copied == ["first", "second", "second"]
+
+
+@pytest.mark.unit
+def test_copy_latest_response_skips_while_pending(chat_console, monkeypatch):
+    """Test that the same text isn't queued again while its copy runs."""
+    pool = Mock()
+    pool.submit.return_value.done.return_value = False
+    monkeypatch.setattr(console_module, "_CLIPBOARD_POOL", pool)
+    times = iter([10.0, 20.0, 30.0])
+    monkeypatch.setattr(console_module.time, "monotonic", lambda: next(times))
+    chat_console.current_session = Mock(latest_response="text")
+
+    assert chat_console.copy_latest_response() is True
+    assert chat_console.copy_latest_response() is False
+    chat_console.current_session.latest_response = "new text"
+    assert chat_console.copy_latest_response() is True
+    assert pool.submit.call_count == 2
+
+
+@pytest.mark.unit
+def test_token_usage_table_is_reused(chat_console):
+    """Test that unchanged usage numbers reuse the built table."""
+    console_module._usage_table.cache_clear()
+    usage = {"input_tokens": 1200, "output_tokens": 30, "total_tokens": 1230}
+
+    chat_console.display_token_usage("Usage", {**usage, "cost": 0.5})
+    chat_console.display_token_usage("Usage", {**usage, "cost": 0.5})
+    chat_console.display_token_usage("Usage", {**usage, "cost": 0.75})
+
+    info = console_module._usage_table.cache_info()
+    assert (info.misses, info.hits) == (2, 1)
+    output = output_of(chat_console)
+    assert output.count("1,200") == 3
+    assert "$0.500000" in output and "$0.750000" in output
+
+
+@pytest.mark.unit
+def test_key_bindings_are_shared(chat_console, monkeypatch):
+    """Test that consoles share key bindings that act on the active console."""
+    copied_from = []
+    monkeypatch.setattr(
+        ChatConsole, "copy_latest_response", lambda self: copied_from.append(self)
+    )
+    handler = chat_console.key_bindings.bindings[0].handler
+
+    chat_console.set_current_session(Mock())
+    handler(None)
+    assert copied_from == [chat_console]
+
+    other = ChatConsole(console=Console(file=StringIO()))
+    assert other.key_bindings is chat_console.key_bindings
+    handler(None)
+    assert copied_from[-1] is other
+
+    # The bindings hold only a weak reference to the console
+    copied_from.clear()
+    del other
+    gc.collect()
+    handler(None)
+    assert copied_from == []
+
+
+@pytest.mark.unit
+def test_prompts_use_the_chat_console(chat_console, monkeypatch):
+    """Test that confirmations and prompts read through the console."""
+    console_input = Mock(side_effect=["y", "Renamed"])
+    monkeypatch.setattr(chat_console.console, "input", console_input)
+
+    assert chat_console.confirm_action("Delete session?") is True
+    assert chat_console.get_session_name("Old") == "Renamed"
+    assert console_input.call_count == 2
+
+
+@pytest.mark.unit
+def test_alt_b_binding_is_opt_in(chat_console):
+    """Test that no Esc-prefixed binding is registered by default."""
+    keys = [binding.keys for binding in chat_console.key_bindings.bindings]
+    assert keys == [(Keys.ControlB,)]
+
+
+@pytest.mark.unit
+def test_display_error_escapes_markup(chat_console):
+    """Test that markup in error messages is shown literally."""
+    chat_console.display_error("bad [bold]value[/bold]")
+
+    assert "Error: bad [bold]value[/bold]" in output_of(chat_console)
+
+
+@pytest.mark.unit
+def test_plain_messages_skip_highlighting():
+    """Test that status messages print without the repr highlighter."""
+    chat_console = ChatConsole(
+        console=Console(file=StringIO(), width=120, force_terminal=True)
+    )
+
+    chat_console.display_info("Saved 42 messages to /tmp/chat.json", style=None)
+    chat_console.display_message("user", "try 3 times")
+
+    output = output_of(chat_console)
+    assert "Saved 42 messages to /tmp/chat.json" in output
+    assert "try 3 times" in output
+
+
+@pytest.mark.unit
+def test_display_message_stream(chat_console, monkeypatch):
+    """Test that a streamed message renders each finished block once."""
+    monkeypatch.setattr(console_module, "STREAM_REFRESH_SECONDS", 0)
+    markdown = Mock(wraps=console_module.Markdown)
+    monkeypatch.setattr(console_module, "Markdown", markdown)
+    chunks = ["# Title\n", "\nFirst ", "para\n\n", "```py\nx = 1\n\n", "```\n"]
+
+    content = chat_console.display_message_stream("assistant", iter(chunks))
+
+    assert content == "".join(chunks)
+    output = output_of(chat_console)
+    assert "Title" in output and "First para" in output and "x = 1" in output
+    # Each finished block is rendered once; the blank line inside the code
+    # fence doesn't end a block
+    assert [c.args[0] for c in markdown.call_args_list] == [
+        "# Title\n",
+        "# Title\n\n",
+        "First ",
+        "First para\n\n",
+        "```py\nx = 1\n\n",
+        "```py\nx = 1\n\n```\n",
+        "```py\nx = 1\n\n```\n",
+    ]
+
+
+@pytest.mark.unit
+def test_display_message_stream_matches_full_render(monkeypatch):
+    """Test that streaming block by block looks like rendering at once."""
+    monkeypatch.setattr(console_module, "STREAM_REFRESH_SECONDS", 0)
+    content = "# Title\n\nSome text\n\n```py\nx = 1\n\ny = 2\n```\n\n- a\n- b\n\nEnd."
+    full = ChatConsole(console=Console(file=StringIO(), width=60))
+    streamed = ChatConsole(console=Console(file=StringIO(), width=60))
+
+    full.display_message("assistant", content)
+    streamed.display_message_stream("assistant", iter(content))
+
+    assert output_of(streamed) == output_of(full)
+
+
+@pytest.mark.unit
+def test_last_block_end_skips_code_fences():
+    """Test that block boundaries inside fenced code are ignored."""
+    assert console_module._last_block_end("a\n\nb", 0) == 3
+    assert console_module._last_block_end("a\n\n```\nb\n\nc", 0) == 3
+    assert console_module._last_block_end("a\n\nb", 3) == 3
+
+
+@pytest.mark.unit
+def test_assistant_messages_are_soft_wrapped(monkeypatch):
+    """Test that long assistant lines are left for the terminal to wrap."""
+    monkeypatch.setattr(console_module, "STREAM_REFRESH_SECONDS", 0)
+    long_line = " ".join(["word"] * 30)
+    content = f"# Title\n\n{long_line}\n\n- item {long_line}"
+    expected = Console(file=StringIO(), width=40)
+    expected.print("\n[bright_green]Assistant ▣[/bright_green]")
+    expected.print(Markdown(content, code_theme="monokai"), soft_wrap=True)
+    shown = ChatConsole(console=Console(file=StringIO(), width=40))
+    streamed = ChatConsole(console=Console(file=StringIO(), width=40))
+
+    shown.display_message("assistant", content)
+    streamed.display_message_stream("assistant", iter(content))
+
+    assert long_line in output_of(shown)
+    assert output_of(shown) == expected.file.getvalue()
+    assert output_of(streamed) == expected.file.getvalue()
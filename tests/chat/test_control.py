@@ -0,0 +1,437 @@
+"""Tests for chat command dispatch."""
+
+import os
+from unittest.mock import Mock
+
+import pytest
+
+from looplm.chat.control import CommandHandler
+
+
+@pytest.fixture
+def handler():
+    """Create a command handler with a mock console and no other components."""
+    handler = CommandHandler.__new__(CommandHandler)
+    handler.console = Mock()
+    return handler
+
+
+@pytest.mark.unit
+def test_commands_map_to_handlers():
+    """Test that every dispatch table entry names a handler method."""
+    for name in CommandHandler._COMMANDS.values():
+        assert callable(getattr(CommandHandler, name))
+    for name, _ in CommandHandler._COMMANDS_WITH_ARG.values():
+        assert callable(getattr(CommandHandler, name))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "cmd, method",
+    [
+        ("q", "_handle_quit"),
+        (" HELP ", "_handle_help"),
+        ("compact-info", "_handle_compact_info"),
+        ("tools-reload", "_handle_tools_reload"),
+    ],
+)
+def test_handle_command_dispatches(handler, monkeypatch, cmd, method):
+    """Test that fixed commands reach their handler."""
+    called = Mock(return_value=False)
+    monkeypatch.setattr(handler, method, called)
+
+    assert handler.handle_command(cmd) is False
+    called.assert_called_once_with()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "cmd, method, arg",
+    [
+        ("clear-last", "_handle_clear_last", "1"),
+        ("clear-last 3", "_handle_clear_last", "3"),
+        ("clear-last   3", "_handle_clear_last", "3"),
+        ("tools-enable", "_handle_tools_enable", "all"),
+        ("tools-enable shell,web", "_handle_tools_enable", "shell,web"),
+        ("tools-create", "_handle_tools_create", ""),
+        ("tools-create mytool", "_handle_tools_create", "mytool"),
+    ],
+)
+def test_handle_command_passes_arguments(handler, monkeypatch, cmd, method, arg):
+    """Test that commands with arguments get the argument or its default."""
+    called = Mock(return_value=True)
+    monkeypatch.setattr(handler, method, called)
+
+    assert handler.handle_command(cmd) is True
+    called.assert_called_once_with(arg)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("cmd", ["bogus", "save now", "clear-lastx"])
+def test_handle_command_unknown(handler, cmd):
+    """Test that unknown commands are reported and the chat continues."""
+    assert handler.handle_command(cmd) is True
+    handler.console.display_error.assert_called_once_with(f"Unknown command: {cmd}")
+
+
+@pytest.mark.unit
+def test_handlers_report_missing_session(handler):
+    """Test that session commands report when no session is active."""
+    handler.session_manager = Mock(active_session=None)
+
+    assert handler.handle_command("rename") is True
+    handler.console.display_error.assert_called_once_with("No active session to rename")
+
+
+@pytest.mark.unit
+def test_handlers_use_active_session(handler):
+    """Test that session commands act on the active session."""
+    session = Mock()
+    handler.session_manager = Mock(active_session=session)
+    handler.console.confirm_action.return_value = True
+
+    assert handler.handle_command("clear") is True
+    session.clear_history.assert_called_once_with()
+    handler.console.display_error.assert_not_called()
+
+
+@pytest.mark.unit
+def test_clear_last_is_capped_at_non_system_messages(handler):
+    """Test that clear-last never counts the system prompt."""
+    roles = ["system", "user", "assistant"]
+    session = Mock(messages=[Mock(role=role) for role in roles])
+    session.clear_last_messages.return_value = 2
+    handler.session_manager = Mock(active_session=session)
+    handler.console.confirm_action.return_value = True
+
+    assert handler.handle_command("clear-last 5") is True
+    session.clear_last_messages.assert_called_once_with(2, preserve_cost=True)
+
+
+@pytest.mark.unit
+def test_provider_menu_rebuilt_only_on_config_change(handler, tmp_path):
+    """Test that the /model providers table is reused until the config changes"""
+    from looplm.config.providers import ProviderType
+
+    config_file = tmp_path / "config.json"
+    config_file.write_text("{}")
+    handler.config_manager = Mock(config_file=config_file)
+    handler.config_manager.get_provider_display_name.return_value = "OpenAI"
+    providers = {
+        ProviderType.OPENAI: {
+            "models": ["gpt-4o", "gpt-4o-mini"],
+            "default_model": "gpt-4o",
+        }
+    }
+
+    table, _ = handler._get_provider_menu(providers)
+    assert handler._get_provider_menu(providers)[0] is table
+    assert table.row_count == 2
+    assert list(table.columns[0].cells) == ["OpenAI", ""]
+    assert list(table.columns[2].cells) == ["✓", ""]
+
+    stat = config_file.stat()
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert handler._get_provider_menu(providers)[0] is not table
+
+
+@pytest.mark.unit
+def test_multiline_input_echoes_prefill_in_one_write(handler, monkeypatch):
+    """Test that pre-filled text is shown with a single console write"""
+    answers = iter(["third", ":done"])
+    monkeypatch.setattr("builtins.input", lambda: next(answers))
+
+    assert handler._get_multiline_input("first\nsecond") == "first\nsecond\nthird"
+    assert handler.console.display_info.call_count == 2
+    handler.console.display_info.assert_called_with("first\nsecond")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "provider_input, expected",
+    [
+        ("anthropic", "ANTHROPIC"),
+        ("ANTHROPIC", "ANTHROPIC"),
+        ("MyLLM", "OTHER"),
+        ("myllm", "OTHER"),
+        ("other", "OTHER"),
+        ("openai", None),
+        ("nope", None),
+    ],
+)
+def test_provider_index_matches_names(handler, tmp_path, provider_input, expected):
+    """Test that /model resolves provider values, custom and display names"""
+    from looplm.config.manager import ConfigManager
+    from looplm.config.providers import ProviderType
+
+    handler.config_manager = Mock(config_file=tmp_path / "missing.json")
+    handler.config_manager.get_provider_display_name.side_effect = (
+        lambda provider, config: ConfigManager.get_provider_display_name(
+            None, provider, config
+        )
+    )
+    providers = {
+        ProviderType.ANTHROPIC: {"default_model": "claude-3"},
+        ProviderType.OTHER: {"provider_name": "MyLLM", "default_model": "m"},
+    }
+
+    _, index = handler._get_provider_menu(providers)
+    selected = index.get(provider_input) or index.get(provider_input.lower())
+    assert selected == (expected and ProviderType[expected])
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("count, expected", [("3", 2), ("²", 1), ("x", 1)])
+def test_clear_last_parses_count_without_raising(handler, count, expected):
+    """Test that clear-last falls back to one message for non-numeric counts"""
+    roles = ["system", "user", "assistant"]
+    session = Mock(messages=[Mock(role=role) for role in roles])
+    session.clear_last_messages.return_value = expected
+    handler.session_manager = Mock(active_session=session)
+    handler.console.confirm_action.return_value = True
+
+    assert handler._handle_clear_last(count) is True
+    session.clear_last_messages.assert_called_once_with(expected, preserve_cost=True)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "override, provider, custom",
+    [("anthropic", "ANTHROPIC", None), ("MyLLM", "OTHER", "MyLLM")],
+)
+def test_create_new_session_override_provider(
+    handler, monkeypatch, override, provider, custom
+):
+    """Test that provider overrides accept standard and custom providers"""
+    from looplm.config.providers import ProviderType
+
+    session = Mock(custom_provider=None)
+    handler.session_manager = Mock()
+    handler.session_manager.create_session.return_value = session
+    handler.config_manager = Mock()
+    handler.config_manager.get_configured_providers.return_value = {
+        ProviderType.OTHER: {"provider_name": "MyLLM"}
+    }
+    handler.override_provider = override
+    handler.override_model = None
+    handler.tools_config = None
+    monkeypatch.setattr(
+        handler, "_get_provider_config", lambda _: {"default_model": "m"}
+    )
+    monkeypatch.setattr(handler, "get_provider_display_info", lambda _: ("p", "m"))
+
+    handler._create_new_session()
+
+    assert session.provider is ProviderType[provider]
+    assert session.model == "m"
+    assert session.custom_provider == custom
+    handler.console.display_error.assert_not_called()
+
+
+@pytest.mark.unit
+def test_create_new_session_rejects_unknown_provider(handler, monkeypatch):
+    """Test that an unknown provider override falls back to the defaults"""
+    session = Mock()
+    session._get_provider_and_model.return_value = ("prov", "model", None)
+    handler.session_manager = Mock()
+    handler.session_manager.create_session.return_value = session
+    handler.config_manager = Mock()
+    handler.config_manager.get_configured_providers.return_value = {}
+    handler.override_provider = "nope"
+    handler.override_model = None
+    handler.tools_config = None
+    monkeypatch.setattr(handler, "get_provider_display_info", lambda _: ("p", "m"))
+
+    handler._create_new_session()
+
+    handler.console.display_error.assert_called_once_with(
+        "Error setting provider: Invalid provider: nope"
+    )
+    assert session.provider == "prov"
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "answers, expected",
+    [
+        (["one", "two", " :DONE "], "one\ntwo"),
+        (["one", ":cancel"], ""),
+        (["one", "two", EOFError], "one\ntwo"),
+        (["one", KeyboardInterrupt], ""),
+    ],
+)
+def test_multiline_input_reads_lines(handler, monkeypatch, answers, expected):
+    """Test that multi-line input stops on :done, :cancel, EOF and Ctrl+C"""
+    answers = iter(answers)
+
+    def fake_input():
+        answer = next(answers)
+        if isinstance(answer, type):
+            raise answer
+        return answer
+
+    monkeypatch.setattr("builtins.input", fake_input)
+
+    assert handler._get_multiline_input() == expected
+
+
+@pytest.mark.unit
+def test_load_shows_last_five_visible_messages(handler, monkeypatch):
+    """Test that loading a session shows its last five non-system messages"""
+    roles = ["system"] + ["user", "assistant"] * 3 + ["system"]
+    messages = [Mock(role=role, content=str(i)) for i, role in enumerate(roles)]
+    session = Mock(messages=messages)
+    session.name = "chat"
+    handler.session_manager = Mock(active_session=None)
+    handler.session_manager.load_session.return_value = session
+    handler.console.select_session.return_value = "abc"
+    monkeypatch.setattr(handler, "get_provider_display_info", lambda _: ("p", "m"))
+
+    assert handler._handle_load() is True
+    shown = [call.args for call in handler.console.display_message.call_args_list]
+    assert shown == [(msg.role, msg.content) for msg in messages[2:7]]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "answer, expected",
+    [("1", "gpt-4o"), ("2", "gpt-4o-mini"), ("3", "3"), ("0", "0"), ("o1", "o1")],
+)
+def test_select_model_by_number_or_name(handler, monkeypatch, answer, expected):
+    """Test that a listed number picks that model and anything else is a name"""
+    monkeypatch.setattr("looplm.chat.control.Prompt.ask", lambda *a, **kw: answer)
+
+    models = ["gpt-4o", "gpt-4o-mini"]
+    assert handler._select_model(models, "Models:") == expected
+    handler.console.display_info.assert_called_once_with(
+        "\nModels:\n  1. gpt-4o\n  2. gpt-4o-mini"
+    )
+
+
+@pytest.mark.unit
+def test_select_model_without_models_asks_for_name(handler, monkeypatch):
+    """Test that a provider with no listed models asks for a model name"""
+    monkeypatch.setattr("looplm.chat.control.Prompt.ask", lambda *a, **kw: "custom")
+
+    assert handler._select_model([], "Models:") == "custom"
+    handler.console.display_info.assert_not_called()
+
+
+@pytest.mark.unit
+def test_prompts_table_rebuilt_only_when_prompts_change(handler, tmp_path):
+    """Test that the /system prompts table is reused until prompts are saved"""
+    from looplm.utils.prompts import PromptsManager
+
+    manager = PromptsManager.__new__(PromptsManager)
+    manager.prompts_file = tmp_path / "prompts.json"
+    manager.save_prompts({"default": "short", "long": "x" * 60})
+    handler.prompts_manager = manager
+
+    prompts, table = handler._get_prompts_table()
+    assert handler._get_prompts_table()[1] is table
+    assert list(table.columns[1].cells) == ["short", "x" * 50 + "..."]
+
+    manager.save_prompt("new", "prompt")
+    stat = manager.prompts_file.stat()
+    os.utime(manager.prompts_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    prompts, table = handler._get_prompts_table()
+    assert "new" in prompts
+    assert table.row_count == 3
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "line, default, choices, expected",
+    [
+        (" 2 ", "5", ("1", "2"), "2"),
+        ("", "5", ("1", "2"), "5"),
+        ("9", "5", ("1", "2"), "5"),
+        (EOFError, "n", None, "n"),
+        ("gpt-4o", None, None, "gpt-4o"),
+        (EOFError, None, None, ""),
+    ],
+)
+def test_ask_reads_plain_line_without_tty(
+    handler, monkeypatch, line, default, choices, expected
+):
+    """Test that prompts read a bare line and fall back to defaults off a TTY"""
+
+    prompts = []
+
+    def fake_input(prompt):
+        prompts.append(prompt)
+        if line is EOFError:
+            raise EOFError
+        return line
+
+    monkeypatch.setattr("builtins.input", fake_input)
+    monkeypatch.setattr(
+        "looplm.chat.control.Prompt.ask", Mock(side_effect=AssertionError)
+    )
+    handler._interactive = False
+
+    assert handler._ask("Question", default=default, choices=choices) == expected
+    assert prompts[0].startswith("Question")
+    if default is not None:
+        assert prompts[0].endswith(f"({default}): ")
+    if choices:
+        assert "[1/2]" in prompts[0]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("line, deleted", [("y", True), ("Yes", True), ("", False)])
+def test_delete_prompts_read_plain_lines_without_tty(
+    handler, monkeypatch, line, deleted
+):
+    """Test that /delete selects and confirms through plain input off a TTY"""
+    from io import StringIO
+
+    from rich.console import Console
+
+    from looplm.chat.console import ChatConsole
+
+    answers = iter(["abc", line])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    monkeypatch.setattr(
+        "looplm.chat.console.Prompt.ask", Mock(side_effect=AssertionError)
+    )
+    handler._interactive = False
+    handler.console.select_session = ChatConsole(
+        Console(file=StringIO())
+    ).select_session
+    handler.session_manager = Mock()
+    handler.session_manager.get_session_list.return_value = [
+        {
+            "id": "abc123",
+            "name": "Chat",
+            "updated_at": "2025-01-01T00:00:00",
+            "message_count": 2,
+            "total_tokens": 10,
+        }
+    ]
+
+    assert handler._handle_delete() is True
+    handler.console.confirm_action.assert_not_called()
+    if deleted:
+        handler.session_manager.delete_session.assert_called_once_with("abc123")
+    else:
+        handler.session_manager.delete_session.assert_not_called()
+
+
+@pytest.mark.unit
+def test_ask_uses_rich_prompt_on_tty(handler, monkeypatch):
+    """Test that interactive prompts go through Rich with the given options"""
+    ask = Mock(return_value="1")
+    monkeypatch.setattr("looplm.chat.control.Prompt.ask", ask)
+
+    assert handler._ask("Question", default="5", choices=("1", "5")) == "1"
+    assert handler._ask("Name") == "1"
+    assert ask.call_args_list[0].args == ("Question",)
+    # Prompts render on the chat's own console
+    chat_console = handler.console.console
+    assert ask.call_args_list[0].kwargs == {
+        "choices": ("1", "5"),
+        "console": chat_console,
+        "default": "5",
+    }
+    assert ask.call_args_list[1].kwargs == {"choices": None, "console": chat_console}
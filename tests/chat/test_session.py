@@ -0,0 +1,251 @@
+from datetime import datetime
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from rich.console import Console
+
+import looplm.chat.session as session_module
+from looplm.chat.session import (
+    BlockInterner,
+    ChatSession,
+    Message,
+    TokenUsage,
+    _dedup_messages,
+)
+from looplm.config.providers import ProviderType
+
+CODE = "```python\nfrom fastapi import FastAPI\n\napp = FastAPI()\n```"
+
+
+def make_session():
+    session = ChatSession()
+    session.set_system_prompt("You are LoopLM, a helpful assistant.")
+    session.messages.append(
+        Message("user", f"Why does this fail?\n{CODE}", timestamp=datetime.now())
+    )
+    session.messages.append(
+        Message(
+            "assistant", f"Your code:\n{CODE}\nlooks fine.", timestamp=datetime.now()
+        )
+    )
+    return session
+
+
+def stream_chunk(content=None, usage=None):
+    delta = SimpleNamespace(content=content, tool_calls=None)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=usage)
+
+
+def stream_reply(monkeypatch, texts):
+    """Make completion calls stream back texts, then a usage chunk"""
+    usage = SimpleNamespace(prompt_tokens=3, completion_tokens=2)
+    chunks = [stream_chunk()] + [stream_chunk(text) for text in texts]
+    chunks.append(stream_chunk(usage=usage))
+    monkeypatch.setattr(session_module, "completion", lambda **kw: iter(chunks))
+    monkeypatch.setattr(session_module, "completion_cost", lambda chunk: 0.5)
+
+
+@pytest.fixture
+def streaming_session(monkeypatch):
+    """A session whose completion call streams back "Hello world" """
+    session = make_session()
+    session.console = Console(file=StringIO(), width=60)
+    session.config_manager = Mock()
+    session.provider = ProviderType.OPENAI
+    session.model = "gpt-4o"
+    stream_reply(monkeypatch, ["Hello", " world"])
+    return session
+
+
+def test_dedup_messages_replaces_repeated_blocks():
+    msgs = [
+        {"role": "user", "content": f"a\n{CODE}"},
+        {"role": "assistant", "content": f"b\n{CODE}"},
+    ]
+
+    msgs, saved = _dedup_messages(msgs)
+
+    assert msgs[0]["content"] == f"a\n{CODE}"
+    assert msgs[1]["content"] == "b\n```<ref msg0 block0>```"
+    assert saved > 0
+
+
+def test_dedup_messages_skips_structured_content():
+    content = [{"type": "text", "text": CODE}]
+    msgs = [
+        {"role": "user", "content": CODE},
+        {"role": "user", "content": content},
+    ]
+
+    msgs, saved = _dedup_messages(msgs)
+
+    assert msgs[1]["content"] is content
+    assert saved == 0
+
+
+def test_get_messages_for_api_dedup_toggle(monkeypatch):
+    session = make_session()
+
+    monkeypatch.delenv("LOOPLM_DEDUP", raising=False)
+    assert CODE in session.get_messages_for_api()[2]["content"]
+
+    monkeypatch.setenv("LOOPLM_DEDUP", "1")
+    msgs = session.get_messages_for_api()
+    assert CODE not in msgs[2]["content"]
+    assert "<ref msg1 block0>" in msgs[2]["content"]
+    assert session.dedup_savings > 0
+    # Stored history is untouched
+    assert CODE in session.messages[2].content
+
+
+def test_message_content_is_shared():
+    session = make_session()
+    text = "".join(["from fastapi import FastAPI\n"] * 4)
+
+    session.add_message(Message("tool", text))
+    session.add_message(
+        Message.from_dict(
+            {"role": "tool", "content": "".join(list(text)), "timestamp": "2025-01-01"}
+        )
+    )
+
+    assert session.messages[-1].content is session.messages[-2].content
+    # The table belongs to the session, not the process
+    assert ChatSession()._interner is not session._interner
+
+
+def test_loaded_session_content_is_shared():
+    text = "".join(["from fastapi import FastAPI\n"] * 4)
+    data = make_session().to_dict()
+    data["messages"] = [
+        {"role": "tool", "content": "".join(list(text)), "timestamp": "2025-01-01"}
+        for _ in range(2)
+    ]
+
+    loaded = ChatSession.from_dict(data)
+
+    assert loaded.messages[1].content is loaded.messages[0].content
+
+
+def test_block_interner_resets_when_full():
+    interner = BlockInterner(max_chars=10, min_length=1)
+
+    interner.intern("abcdef")
+    interner.intern("ghijkl")
+
+    assert len(interner) == 1
+    assert interner.intern("short") == "short"
+
+
+def test_message_uses_slots():
+    """Test that messages carry no per-instance __dict__."""
+    msg = Message("user", "hello")
+    assert not hasattr(msg, "__dict__")
+    with pytest.raises(AttributeError):
+        msg.unexpected = True
+
+
+def test_format_number_needs_no_instance():
+    """Test that token counts can be formatted without a TokenUsage."""
+    assert TokenUsage.format_number(950) == "950"
+    assert TokenUsage.format_number(12_345) == "12.3K"
+    assert TokenUsage.format_number(2_500_000) == "2.5M"
+
+
+def test_api_messages_with_tools_after_compact():
+    """Test that compacted tool histories keep tool fields and one system prompt."""
+    session = make_session()
+    session.set_compact_summary("Summary.")
+    session.messages.append(
+        Message("assistant", "", tool_calls=[{"id": "call_1", "type": "function"}])
+    )
+    session.messages.append(
+        Message("tool", "42", tool_call_id="call_1", name="calculator")
+    )
+
+    msgs = session.get_messages_for_api_with_tools()
+
+    assert [m["role"] for m in msgs] == ["system", "assistant", "assistant", "tool"]
+    assert msgs[1]["content"] == "Summary."
+    assert msgs[2]["tool_calls"] == [{"id": "call_1", "type": "function"}]
+    assert msgs[3] == {
+        "role": "tool",
+        "content": "42",
+        "tool_call_id": "call_1",
+        "name": "calculator",
+    }
+
+
+@pytest.mark.parametrize("count, expected", [(1, 1), (5, 2), (0, 0)])
+def test_clear_last_messages_keeps_system_prompt(count, expected):
+    session = make_session()
+    user, assistant = session.messages[1:]
+
+    assert session.clear_last_messages(count) == expected
+    assert [msg.role for msg in session.messages][0] == "system"
+    assert session.messages[1:] == [user, assistant][: 2 - expected]
+
+
+def test_send_message_streams_through_display(streaming_session):
+    """Test that replies are handed to the display as they arrive"""
+    streamed = []
+
+    def display(role, chunks, timestamp):
+        for chunk in chunks:
+            streamed.append(chunk)
+        return "".join(streamed)
+
+    reply = streaming_session.send_message("Hi", display=display)
+
+    assert streamed == ["Hello", " world"]
+    assert reply == streaming_session.latest_response == "Hello world"
+    last = streaming_session.messages[-1]
+    assert (last.role, last.content) == ("assistant", "Hello world")
+    assert last.token_usage.total_tokens == 5
+    assert streaming_session.total_usage.cost == 0.5
+    # The display draws the reply; nothing prints it a second time
+    assert "Hello world" not in streaming_session.console.file.getvalue()
+
+
+def test_send_message_streams_markdown_blocks_once(streaming_session, monkeypatch):
+    """Test that a streamed reply renders each finished block once"""
+    import looplm.chat.console as console_module
+
+    monkeypatch.setattr(console_module, "STREAM_REFRESH_SECONDS", 0)
+    markdown = Mock(wraps=console_module.Markdown)
+    monkeypatch.setattr(console_module, "Markdown", markdown)
+    stream_reply(monkeypatch, ["# Title\n", "\nSome ", "text\n\n", "End."])
+
+    reply = streaming_session.send_message("Hi")
+
+    assert reply == "# Title\n\nSome text\n\nEnd."
+    output = streaming_session.console.file.getvalue()
+    assert "Title" in output and "Some text" in output and "End." in output
+    # Finished blocks are printed once above the live area; only the
+    # growing tail is rendered again
+    assert [c.args[0] for c in markdown.call_args_list] == [
+        "# Title\n",
+        "# Title\n\n",
+        "Some ",
+        "Some text\n\n",
+        "End.",
+        "End.",
+    ]
+
+
+def test_send_message_reports_command_errors(streaming_session, monkeypatch):
+    """Test that a failed @ command is reported and nothing is sent"""
+    sent = Mock()
+    monkeypatch.setattr(session_module, "completion", sent)
+    before = list(streaming_session.messages)
+
+    reply = streaming_session.send_message("read @file(missing-file.txt)")
+
+    assert reply == ""
+    sent.assert_not_called()
+    assert streaming_session.messages == before
+    output = streaming_session.console.file.getvalue()
+    assert "Command processing failed" in output
+    assert "missing-file.txt" in output
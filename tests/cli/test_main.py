@@ -29,7 +29,9 @@ def mock_config_manager():
 @pytest.fixture
 def mock_conversation_handler():
     """Mock the ConversationHandler."""
-    with patch("looplm.cli.main.ConversationHandler", autospec=True) as mock:
+    with patch(
+        "looplm.conversation.handler.ConversationHandler", autospec=True
+    ) as mock:
         handler = MagicMock()
         mock.return_value = handler
         yield handler
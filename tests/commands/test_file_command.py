@@ -0,0 +1,254 @@
+"""Tests for the @file and @folder command processors."""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from looplm.commands.file_command import FileProcessor
+from looplm.commands.folder_command import FolderProcessor
+
+
+@pytest.fixture
+def project_dir(tmp_path):
+    """Create a small directory tree for completion tests."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "setup.py").write_text("")
+    (tmp_path / "README.md").write_text("")
+    (tmp_path / "src" / "main.py").write_text("print('hi')")
+    return tmp_path
+
+
+@pytest.mark.unit
+def test_file_completions_match_prefix(project_dir):
+    """Test that file completions list files and folders matching the prefix."""
+    processor = FileProcessor(base_path=project_dir)
+
+    completions = processor.get_completions(f"{project_dir}/s")
+
+    assert [c[0] for c in completions] == [
+        f"{project_dir}/setup.py",
+        f"{project_dir}/src",
+    ]
+    assert " D " in completions[1][1]
+    assert " F " in completions[0][1]
+
+
+@pytest.mark.unit
+def test_file_completions_trailing_slash(project_dir):
+    """Test that a trailing slash lists the directory contents."""
+    processor = FileProcessor(base_path=project_dir)
+
+    completions = processor.get_completions(f"{project_dir}/src/")
+
+    assert [c[0] for c in completions] == [f"{project_dir}/src/main.py"]
+
+
+@pytest.mark.unit
+def test_folder_completions_only_dirs(project_dir):
+    """Test that folder completions skip regular files."""
+    processor = FolderProcessor(base_path=project_dir)
+
+    completions = processor.get_completions(f"{project_dir}/s")
+
+    assert [c[0] for c in completions] == [f"{project_dir}/src"]
+
+
+@pytest.mark.unit
+def test_file_validate_urls_and_paths(project_dir):
+    """Test validation of URLs and local paths."""
+    processor = FileProcessor(base_path=project_dir)
+
+    assert processor.validate("https://example.com/a.txt")
+    assert not processor.validate("ftp://example.com/a.txt")
+    assert processor.validate("setup.py")
+    assert not processor.validate("missing.py")
+
+
+@pytest.mark.unit
+def test_file_resolve_path_finds_new_files(project_dir):
+    """Test that a missing file is found once it has been created."""
+    processor = FileProcessor(base_path=project_dir)
+
+    with pytest.raises(FileNotFoundError):
+        processor._resolve_path("later.py")
+
+    (project_dir / "later.py").write_text("")
+
+    assert processor._resolve_path("later.py") == (
+        False,
+        str((project_dir / "later.py").resolve()),
+    )
+
+
+@pytest.mark.unit
+def test_file_resolve_path_rechecks_cached_lookups(project_dir, monkeypatch):
+    """Test that repeated lookups see deleted files and new files in the cwd."""
+    cwd = project_dir / "cwd"
+    cwd.mkdir()
+    monkeypatch.chdir(cwd)
+    processor = FileProcessor(base_path=project_dir)
+
+    assert processor._resolve_path("setup.py") == (
+        False,
+        str((project_dir / "setup.py").resolve()),
+    )
+
+    # A file in the current directory takes precedence over the base path
+    (cwd / "setup.py").write_text("")
+    assert processor._resolve_path("setup.py") == (
+        False,
+        str((cwd / "setup.py").resolve()),
+    )
+
+    (cwd / "setup.py").unlink()
+    (project_dir / "setup.py").unlink()
+    assert not processor.validate("setup.py")
+
+
+@pytest.mark.asyncio
+async def test_file_http_session_is_shared():
+    """Test that URL fetches reuse one HTTP session per event loop."""
+    try:
+        first = await FileProcessor._get_session()
+        second = await FileProcessor._get_session()
+        assert first is second
+    finally:
+        await FileProcessor.close_session()
+
+    assert FileProcessor._session is None
+
+
+@pytest.mark.parametrize("close_first_loop", [False, True])
+def test_file_http_session_closed_when_loop_changes(close_first_loop):
+    """Test that a session from an earlier event loop is closed on replacement."""
+    loops = [asyncio.new_event_loop() for _ in range(2)]
+    try:
+        first = loops[0].run_until_complete(FileProcessor._get_session())
+        if close_first_loop:
+            loops[0].close()
+        second = loops[1].run_until_complete(FileProcessor._get_session())
+
+        assert second is not first
+        assert first.closed
+        assert not second.closed
+    finally:
+        loops[1].run_until_complete(FileProcessor.close_session())
+        for loop in loops:
+            loop.close()
+
+
+@pytest.mark.asyncio
+async def test_file_process_reads_local_file(project_dir):
+    """Test that local text files are read and wrapped in a tag."""
+    processor = FileProcessor(base_path=project_dir)
+
+    result = await processor.process(str(project_dir / "src" / "main.py"))
+
+    assert result.error is None
+    assert result.content == "<main.py>\nprint('hi')\n</main.py>\n"
+
+
+@pytest.mark.asyncio
+async def test_file_process_rejects_large_file(project_dir, monkeypatch):
+    """Test that files over the size limit are rejected before reading."""
+    monkeypatch.setattr("looplm.commands.file_command.MAX_FILE_BYTES", 4)
+    processor = FileProcessor(base_path=project_dir)
+
+    result = await processor.process(str(project_dir / "src" / "main.py"))
+
+    assert result.content == ""
+    assert "File too large" in result.error
+
+
+@pytest_asyncio.fixture
+async def text_server():
+    """Serve a small text body from a local aiohttp server."""
+    from aiohttp import web
+
+    async def handler(request):
+        return web.Response(text="hello " * 100, content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/notes.txt", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}/notes.txt"
+    finally:
+        await FileProcessor.close_session()
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_file_url_streams_body(text_server, monkeypatch, tmp_path):
+    """Test that URL bodies are streamed and capped at the size limit."""
+    processor = FileProcessor(base_path=tmp_path)
+
+    result = await processor.process(text_server)
+    assert result.error is None
+    assert result.content.startswith("<notes.txt>\nhello hello")
+
+    monkeypatch.setattr("looplm.commands.file_command.MAX_URL_BYTES", 100)
+    result = await processor.process(text_server)
+    assert result.content == ""
+    assert "URL body too large" in result.error
+
+
+@pytest.mark.unit
+def test_folder_validate_and_resolve(project_dir):
+    """Test folder validation and resolution relative to the base path."""
+    (project_dir / "fixtures_only_here").mkdir()
+    processor = FolderProcessor(base_path=project_dir)
+
+    assert processor.validate("fixtures_only_here")
+    assert processor.validate(str(project_dir / "src"))
+    assert not processor.validate(str(project_dir / "setup.py"))
+    assert not processor.validate("missing")
+    assert processor._resolve_path("fixtures_only_here") == str(
+        (project_dir / "fixtures_only_here").resolve()
+    )
+
+    with pytest.raises(FileNotFoundError):
+        processor._resolve_path(str(project_dir / "setup.py"))
+
+
+@pytest.mark.unit
+def test_ext_for_content_type():
+    """Test extension lookup ignores Content-Type parameters."""
+    from looplm.commands.file_command import _ext_for
+
+    assert _ext_for("application/json; charset=utf-8") == ".json"
+    assert _ext_for("") == ""
+
+
+@pytest.mark.asyncio
+async def test_folder_ingest_is_cached_until_change(project_dir, monkeypatch):
+    """Test that unchanged folders are not re-ingested."""
+    from looplm.commands import folder_command
+
+    calls = []
+
+    def fake_ingest(path):
+        calls.append(path)
+        return "summary", "tree", f"content {len(calls)}"
+
+    monkeypatch.setattr(folder_command, "ingest", fake_ingest)
+    folder_command._ingest_cached.cache_clear()
+    processor = FolderProcessor(base_path=project_dir)
+    folder = str(project_dir / "src")
+
+    first = await processor.process(folder)
+    second = await processor.process(folder)
+    assert len(calls) == 1
+    assert first.content == second.content
+
+    (project_dir / "src" / "extra.py").write_text("x = 1")
+    third = await processor.process(folder)
+    assert len(calls) == 2
+    assert "content 2" in third.content
+    # Stale ingests of large folders are not kept around
+    assert folder_command._ingest_cached.cache_info().maxsize == 4
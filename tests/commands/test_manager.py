@@ -6,7 +6,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from looplm.commands.manager import CommandManager
-from looplm.commands.processor import CommandProcessor
+from looplm.commands.processor import CommandProcessor, ProcessedText
 
 
 class MockProcessor(CommandProcessor):
@@ -130,3 +130,17 @@ def test_process_text_sync_new_loop(manager, mock_registry):
         result = manager.process_text_sync("test")
         assert result == ("processed", [])
         mock_registry.process_text.assert_called_once_with("test")
+
+
+@pytest.mark.unit
+def test_process_text_result_sync(manager, mock_registry):
+    """Test that the synchronous result wrapper returns errors without raising."""
+    result = ProcessedText("text", errors=["@file error: not found"])
+
+    async def mock_process():
+        return result
+
+    mock_registry.process_text_result.return_value = mock_process()
+
+    assert manager.process_text_result_sync("text") is result
+    mock_registry.process_text_result.assert_called_once_with("text")
@@ -0,0 +1,173 @@
+"""Tests for the command registry."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from looplm.commands.file_command import FileProcessor
+from looplm.commands.folder_command import FolderProcessor
+from looplm.commands.processor import ProcessingResult
+from looplm.commands.registry import CommandRegistry, _clean_arg
+
+
+@pytest.fixture
+def registry(tmp_path):
+    """Create a registry with file and folder processors."""
+    registry = CommandRegistry(base_path=tmp_path)
+    registry.register(FileProcessor)
+    registry.register(FolderProcessor)
+    return registry
+
+
+@pytest.mark.unit
+def test_command_pattern_is_cached(registry):
+    """Test that the command pattern is compiled once and reused."""
+    pattern = registry._get_command_pattern()
+    assert registry._get_command_pattern() is pattern
+
+    matches = [
+        m.group("shell", "cmd", "arg")
+        for m in pattern.finditer("$(ls) @file(a.py) and @folder(src)")
+    ]
+    assert matches == [
+        ("ls", None, None),
+        (None, "file", "a.py"),
+        (None, "folder", "src"),
+    ]
+
+
+@pytest.mark.unit
+def test_command_pattern_rebuilt_on_register(tmp_path):
+    """Test that registering a processor invalidates the cached pattern."""
+    registry = CommandRegistry(base_path=tmp_path)
+    assert registry._get_command_pattern().search("@file(a.py)") is None
+
+    registry.register(FileProcessor)
+    assert registry._get_command_pattern().search("@file(a.py)") is not None
+
+
+@pytest.mark.unit
+def test_completions(registry):
+    """Test command name completions and unknown commands."""
+    assert list(registry.get_completions("hello")) == ["@file", "@folder"]
+    assert list(registry.get_completions("@unknown(")) == []
+
+    completions = registry.get_completions("")
+    assert next(completions) == "@file"
+
+
+@pytest.mark.asyncio
+async def test_process_text_shell_and_commands(registry, tmp_path):
+    """Test that shell and @ commands are processed in one pass."""
+    (tmp_path / "a.py").write_text("x = 1")
+    (tmp_path / "b.py").write_text("y = 2")
+    registry.shell_processor.process = AsyncMock(
+        return_value=ProcessingResult(content="<shell output>")
+    )
+    text = "see @file(a.py) then $(ls) and @file(b.py) done"
+
+    result, media = await registry.process_text(text)
+
+    registry.shell_processor.process.assert_awaited_once_with("ls")
+    prompt, outputs = result.split("\n\n", 1)
+    assert prompt == "see a.py then $(ls) and b.py done"
+    assert (
+        outputs == "<shell output>\n<a.py>\nx = 1\n</a.py>\n\n<b.py>\ny = 2\n</b.py>\n"
+    )
+    assert media == []
+
+
+@pytest.mark.asyncio
+async def test_process_text_collects_errors(registry):
+    """Test that command errors are raised together."""
+    with pytest.raises(Exception) as exc_info:
+        await registry.process_text("$( ) and @file(missing.txt)")
+
+    message = str(exc_info.value)
+    assert "Empty shell command in $()" in message
+    assert "@file error: Invalid argument for @file: missing.txt" in message
+
+
+@pytest.mark.asyncio
+async def test_process_text_runs_commands_concurrently(registry):
+    """Test that independent commands are awaited together."""
+    running = 0
+    peak = 0
+
+    async def slow_shell(command):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return ProcessingResult(content=f"<{command}>")
+
+    registry.shell_processor.process = slow_shell
+
+    result, _ = await registry.process_text("$(one) $(two) $(three)")
+
+    assert peak == 3
+    assert result.endswith("\n\n<one>\n<two>\n<three>")
+
+
+@pytest.mark.asyncio
+async def test_process_text_without_commands(registry):
+    """Test that text without command markers is returned unchanged."""
+    registry._command_pattern = None
+
+    assert await registry.process_text("just a question") == ("just a question", [])
+    assert registry._command_pattern is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "arg", ["a.py", " a.py ", '"a.py"', "'a.py'", " 'a.py' ", '"a.py']
+)
+async def test_process_command_cleans_argument(registry, tmp_path, arg):
+    """Test that whitespace and surrounding quotes are removed from arguments."""
+    (tmp_path / "a.py").write_text("x = 1")
+
+    result = await registry.process_command("file", arg)
+
+    assert result.error is None
+    assert result.content.startswith("<a.py>")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("arg", ["", "  ", '""', "''"])
+async def test_process_command_empty_argument(registry, arg):
+    """Test that blank or empty quoted arguments are rejected."""
+    result = await registry.process_command("file", arg)
+
+    assert result.error == "No argument provided for @file"
+
+
+@pytest.mark.asyncio
+async def test_process_text_result_returns_errors(registry):
+    """Test that command errors are returned without raising."""
+    result = await registry.process_text_result("read @file(missing.txt)")
+
+    assert result.text == "read @file(missing.txt)"
+    assert result.media_metadata == []
+    assert result.errors == ["@file error: Invalid argument for @file: missing.txt"]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "raw, cleaned",
+    [("a.py", "a.py"), ('  "a.py" ', "a.py"), ("'a.py", "a.py"), ("", ""), ("''", "")],
+)
+def test_clean_arg(raw, cleaned):
+    """Test that argument cleaning strips whitespace and quotes."""
+    assert _clean_arg(raw) == cleaned
+
+
+@pytest.mark.asyncio
+async def test_process_text_without_output_is_unchanged(registry):
+    """Test that commands producing no output add no trailing separator."""
+    registry.shell_processor.process = AsyncMock(return_value=ProcessingResult(""))
+
+    result, _ = await registry.process_text("price is $(empty)")
+
+    assert result == "price is $(empty)"
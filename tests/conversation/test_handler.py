@@ -6,6 +6,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 from rich.console import Console
 
+from looplm.commands.processor import ProcessedText
 from looplm.config.providers import ProviderType
 from looplm.conversation.handler import ConversationHandler
 
@@ -113,10 +114,20 @@ def test_get_provider_and_model_without_provider(handler, mock_config_manager):
 def test_handle_prompt_debug_mode(handler, mock_command_manager):
     """Test handling prompt in debug mode."""
     handler.debug = True
-    mock_command_manager.process_text_sync.return_value = (
-        "processed content",
-        [{"type": "image", "url": "test.jpg"}],
+    mock_command_manager.process_text_result_sync.return_value = ProcessedText(
+        "processed content", [{"type": "image", "url": "test.jpg"}]
     )
 
     handler.handle_prompt("test prompt")
-    mock_command_manager.process_text_sync.assert_called_once_with("test prompt")
+    mock_command_manager.process_text_result_sync.assert_called_once_with("test prompt")
+
+
+@pytest.mark.unit
+def test_handle_prompt_command_error(handler, mock_command_manager):
+    """Test that a failed command stops the prompt before anything is sent."""
+    mock_command_manager.process_text_result_sync.return_value = ProcessedText(
+        "read @file(missing.txt)", errors=["@file error: not found"]
+    )
+
+    with pytest.raises(ValueError, match="@file error: not found"):
+        handler.handle_prompt("read @file(missing.txt)")
@@ -84,3 +84,15 @@ def test_persistence():
     msgs = loaded.get_messages_for_api()
     assert msgs[-1]["role"] == "user"
     assert "Another question" in msgs[-1]["content"]
+
+
+def test_persistence_keeps_segments():
+    session = make_session()
+    session.set_compact_summary("first")
+    session.messages.append(Message("user", "q", timestamp=datetime.now()))
+    session.add_compact_segment("second")
+
+    loaded = ChatSession.from_dict(session.to_dict())
+
+    assert loaded.compact_segments == ["first", "second"]
+    assert loaded.compact_summary == "first\n\nsecond"
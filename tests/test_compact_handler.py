@@ -1,14 +1,27 @@
 from datetime import datetime
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
 import pytest
 from rich.console import Console
 
-from looplm.chat.compact_handler import CompactError, CompactHandler
+from looplm.chat.compact_handler import (
+    EARLIER_SUMMARY_LABEL,
+    NEW_SEGMENT_INSTRUCTION,
+    CompactError,
+    CompactHandler,
+)
 from looplm.chat.prompt_manager import PromptManager
 from looplm.chat.session import ChatSession, Message
 
 
+def llm_response(content):
+    """Build a completion response shaped like litellm's, without Mock overhead"""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+    )
+
+
 @pytest.fixture
 def mock_console():
     console = Mock()
@@ -112,6 +125,26 @@ class TestCompactHandler:
         model_name = compact_handler._resolve_model_name(sample_session)
         assert model_name == "custom/custom-model"
 
+    def test_resolve_model_name_is_cached(self, compact_handler, sample_session):
+        from looplm.config.providers import ProviderType
+
+        sample_session.provider = ProviderType.BEDROCK
+        sample_session.model = "anthropic.claude-3-haiku"
+
+        with patch.object(
+            CompactHandler,
+            "_build_model_name",
+            wraps=CompactHandler._build_model_name,
+        ) as build:
+            first = compact_handler._resolve_model_name(sample_session)
+            second = compact_handler._resolve_model_name(sample_session)
+            sample_session.model = "anthropic.claude-3-sonnet"
+            third = compact_handler._resolve_model_name(sample_session)
+
+        assert first == second == "bedrock/anthropic.claude-3-haiku"
+        assert third == "bedrock/anthropic.claude-3-sonnet"
+        assert build.call_count == 2
+
     def test_prepare_compact_messages(
         self, compact_handler, sample_session, mock_prompt_manager
     ):
@@ -131,11 +164,7 @@ class TestCompactHandler:
     def test_compact_session_success(
         self, mock_completion, compact_handler, sample_session, mock_console
     ):
-        # Mock LLM response
-        mock_response = Mock()
-        mock_response.choices = [Mock()]
-        mock_response.choices[0].message.content = "This is a test summary."
-        mock_completion.return_value = mock_response
+        mock_completion.return_value = llm_response("This is a test summary.")
 
         result = compact_handler.compact_session(sample_session, show_progress=False)
 
@@ -201,6 +230,7 @@ class TestCompactHandler:
         calls = mock_console.console.print.call_args_list
         assert any("Compact Information" in str(call) for call in calls)
         assert any("Not compacted" in str(call) for call in calls)
+        assert any("4 in 2 conversation turns" in str(call) for call in calls)
 
     def test_show_compact_info_compacted_session(
         self, compact_handler, sample_session, mock_console
@@ -220,10 +250,7 @@ class TestCompactHandler:
 
     def test_call_llm_for_summary_success(self, compact_handler):
         with patch("looplm.chat.compact_handler.completion") as mock_completion:
-            mock_response = Mock()
-            mock_response.choices = [Mock()]
-            mock_response.choices[0].message.content = "Test summary"
-            mock_completion.return_value = mock_response
+            mock_completion.return_value = llm_response("Test summary")
 
             result = compact_handler._call_llm_for_summary("test-model", [])
 
@@ -231,9 +258,7 @@ class TestCompactHandler:
 
     def test_call_llm_for_summary_empty_response(self, compact_handler):
         with patch("looplm.chat.compact_handler.completion") as mock_completion:
-            mock_response = Mock()
-            mock_response.choices = []
-            mock_completion.return_value = mock_response
+            mock_completion.return_value = SimpleNamespace(choices=[])
 
             with pytest.raises(CompactError, match="Empty response from LLM"):
                 compact_handler._call_llm_for_summary("test-model", [])
@@ -242,5 +267,213 @@ class TestCompactHandler:
         with patch("looplm.chat.compact_handler.completion") as mock_completion:
             mock_completion.side_effect = Exception("Network error")
 
-            with pytest.raises(CompactError, match="LLM call failed"):
+            with pytest.raises(CompactError, match="LLM call failed") as exc_info:
                 compact_handler._call_llm_for_summary("test-model", [])
+            assert str(exc_info.value.__cause__) == "Network error"
+
+    def test_compact_session_with_local_compressor(
+        self, compact_handler, sample_session
+    ):
+        mock_compressor = Mock()
+        mock_compressor.return_value.compress_prompt.side_effect = (
+            lambda prompts, **kw: {"compressed_prompt": prompts[0][:10]}
+        )
+
+        with patch("looplm.chat.compact_handler.PromptCompressor", mock_compressor):
+            with patch("looplm.chat.compact_handler.completion") as mock_completion:
+                result = compact_handler.compact_session(
+                    sample_session, show_progress=False
+                )
+
+        assert result is True
+        mock_completion.assert_not_called()
+        assert sample_session.compact_summary.startswith("user: How do I u")
+        # Compressor is created once and called for each non-system message
+        mock_compressor.assert_called_once()
+        assert mock_compressor.return_value.compress_prompt.call_count == 4
+
+    def test_compress_messages_uses_cache(self, compact_handler, sample_session):
+        mock_compressor = Mock()
+        mock_compressor.return_value.compress_prompt.return_value = {
+            "compressed_prompt": "short"
+        }
+
+        with patch("looplm.chat.compact_handler.PromptCompressor", mock_compressor):
+            compact_handler._compress_messages(sample_session)
+            compact_handler._compress_messages(sample_session)
+
+        assert mock_compressor.return_value.compress_prompt.call_count == 4
+
+    def test_compressed_cache_is_bounded(self, compact_handler, sample_session):
+        mock_compressor = Mock()
+        mock_compressor.return_value.compress_prompt.return_value = {
+            "compressed_prompt": "short"
+        }
+
+        with patch("looplm.chat.compact_handler.PromptCompressor", mock_compressor):
+            with patch("looplm.chat.compact_handler.COMPRESSED_CACHE_SIZE", 2):
+                compact_handler._compress_messages(sample_session)
+
+        assert len(compact_handler._compressed_cache) == 2
+
+    def test_compact_local_opt_out(self, compact_handler, sample_session, monkeypatch):
+        monkeypatch.setenv("LOOPLM_COMPACT_LOCAL", "0")
+        mock_compressor = Mock()
+
+        with patch("looplm.chat.compact_handler.PromptCompressor", mock_compressor):
+            with patch.object(
+                compact_handler, "_call_llm_for_summary", return_value="Summary"
+            ) as call_llm:
+                summary = compact_handler._generate_summary(sample_session)
+
+        assert summary == "Summary"
+        call_llm.assert_called_once()
+        mock_compressor.assert_not_called()
+
+    def test_get_compact_stats_structured_content(self, compact_handler):
+        session = ChatSession()
+        session.messages.append(
+            Message(
+                "user",
+                [
+                    {"type": "text", "text": "x" * 40},
+                    {"type": "image_url", "image_url": {"url": "data:..."}},
+                ],
+            )
+        )
+        session.messages.append(Message("assistant", "y" * 20))
+
+        stats = compact_handler.get_compact_stats(session)
+
+        assert stats["estimated_current_tokens"] == 15
+
+    @patch("looplm.chat.compact_handler.completion")
+    def test_compact_session_adds_segment(
+        self, mock_completion, compact_handler, sample_session
+    ):
+        mock_completion.return_value = llm_response("Second summary.")
+
+        sample_session.set_compact_summary("First summary.")
+        sample_session.messages.append(Message("user", "And auth?"))
+        sample_session.messages.append(Message("assistant", "Use a token."))
+
+        can_compact, _ = compact_handler.can_compact(sample_session)
+        assert can_compact is True
+        assert compact_handler.get_compact_stats(sample_session)["segments"] == 1
+
+        result = compact_handler.compact_session(sample_session, show_progress=False)
+
+        assert result is True
+        # Only the new messages are sent, with the earlier summary as context
+        sent = mock_completion.call_args.kwargs["messages"]
+        assert sent[1] == {
+            "role": "user",
+            "content": f"{EARLIER_SUMMARY_LABEL}\n\nFirst summary.",
+        }
+        assert [m["content"] for m in sent[2:4]] == ["And auth?", "Use a token."]
+        assert sent[-1]["content"].endswith(NEW_SEGMENT_INSTRUCTION)
+        assert sample_session.compact_segments == ["First summary.", "Second summary."]
+        assert sample_session.compact_summary == "First summary.\n\nSecond summary."
+        assert sample_session.compact_index == len(sample_session.messages)
+
+    def test_repeated_compacts_summarize_only_new_messages(
+        self, compact_handler, sample_session, monkeypatch
+    ):
+        monkeypatch.setenv("LOOPLM_COMPACT_LOCAL", "0")
+
+        def summarize(model, messages, **kwargs):
+            # Stands in for a model that follows the compact prompt: it
+            # summarizes the conversation turns it is asked to cover
+            turns = [
+                m["content"]
+                for m in messages[1:-1]
+                if not m["content"].startswith(EARLIER_SUMMARY_LABEL)
+            ]
+            return llm_response("Covers: " + " | ".join(turns))
+
+        with patch("looplm.chat.compact_handler.completion", side_effect=summarize):
+            assert compact_handler.compact_session(sample_session, show_progress=False)
+            first = sample_session.compact_summary
+            sample_session.messages.append(Message("user", "And auth?"))
+            sample_session.messages.append(Message("assistant", "Use a token."))
+            assert compact_handler.compact_session(sample_session, show_progress=False)
+
+        assert sample_session.compact_segments == [
+            first,
+            "Covers: And auth? | Use a token.",
+        ]
+        assert sample_session.compact_summary.count(first) == 1
+
+    def test_extract_summary_content(self, compact_handler):
+        raw = "<analysis>notes</analysis>\n<SUMMARY>\n  The summary.\n</SUMMARY>"
+        assert compact_handler._extract_summary_content(raw) == "The summary."
+
+        fallback = "<analysis>notes</analysis>\nPlain summary."
+        assert compact_handler._extract_summary_content(fallback) == "Plain summary."
+
+        with patch("looplm.chat.compact_handler._ANALYSIS_RE") as analysis:
+            result = compact_handler._extract_summary_content("  Just text.  ")
+        assert result == "Just text."
+        analysis.sub.assert_not_called()
+
+    def test_extract_summary_content_warns_on_stray_tags(self, compact_handler):
+        with patch("looplm.chat.compact_handler.logger") as log:
+            result = compact_handler._extract_summary_content("Text </Summary>")
+        assert result == "Text </Summary>"
+        log.warning.assert_called_once()
+
+        with patch("looplm.chat.compact_handler.logger") as log:
+            compact_handler._extract_summary_content("No tags here")
+        log.warning.assert_not_called()
+
+    def test_get_compact_stats_caches_estimates(self, compact_handler, sample_session):
+        compact_handler.get_compact_stats(sample_session)
+
+        pending = compact_handler._pending_messages(sample_session)
+        assert all(msg._token_estimate is not None for msg in pending)
+
+        with patch("looplm.chat.compact_handler._estimate_tokens") as estimate:
+            stats = compact_handler.get_compact_stats(sample_session)
+        estimate.assert_not_called()
+        assert stats["estimated_current_tokens"] == sum(
+            msg._token_estimate for msg in pending
+        )
+
+    def test_compact_prompt_fallback(self, mock_console):
+        prompt_manager = Mock(spec=PromptManager)
+        prompt_manager.get_prompt.side_effect = KeyError("compact")
+
+        handler = CompactHandler(mock_console, prompt_manager)
+        session = ChatSession()
+        session.messages.append(Message("user", "Hi"))
+
+        messages = handler._prepare_compact_messages(session)
+        assert messages[-1]["content"] == (
+            "Please provide a comprehensive summary of this conversation."
+        )
+        prompt_manager.get_prompt.assert_called_once_with("compact")
+
+    @patch("looplm.chat.compact_handler.completion")
+    def test_compact_session_scans_messages_once(
+        self, mock_completion, compact_handler, sample_session
+    ):
+        mock_completion.return_value = llm_response("Summary.")
+
+        with patch.object(
+            compact_handler,
+            "_pending_messages",
+            wraps=compact_handler._pending_messages,
+        ) as pending:
+            assert compact_handler.compact_session(sample_session, show_progress=False)
+
+        assert pending.call_count == 1
+
+    def test_prepare_compact_messages_default_system_prompt(self, compact_handler):
+        from looplm.chat.compact_handler import DEFAULT_SYSTEM_PROMPT
+
+        session = ChatSession()
+        session.messages.append(Message("user", "Hi"))
+        session.messages.append(Message("assistant", "Hello"))
+
+        messages = compact_handler._prepare_compact_messages(session)
+        assert messages[0] == {"role": "system", "content": DEFAULT_SYSTEM_PROMPT}